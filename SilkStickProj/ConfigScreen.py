@@ -0,0 +1,264 @@
+"""Config editing screen, imported when the Config screen is first opened"""
+import terminalio
+from adafruit_display_text import label
+import displayio
+from Menu import Screen, WHT, BLK, GRY, GRN, RED
+from Utilities import PolyFit
+
+
+class Config(Screen):
+    def __init__(self, screenName, config, defaultColor_text=GRY, defaultColor_bg=BLK,
+                 highlightColor_text=BLK, highlightColor_bg=WHT):
+        super().__init__(screenName)
+        self._config = dict(config)  # Working copy of the editable values, the caller commits it on save
+        self._config.setdefault('Cal_Pts', [])  # Config files written before the calibration table
+        self._config.setdefault('Fit_Order', 0)
+        self.fit = None  # PolyFit of the working calibration table, points are added as they are captured
+        self._loadFit()
+        self.selectIndex = 0
+        self.defaultColor_text = defaultColor_text
+        self.defaultColor_bg = defaultColor_bg
+        self.highlightColor_text = highlightColor_text
+        self.highlightColor_bg = highlightColor_bg
+        self.static_offset = 13
+        self._calTarget = 0.0  # Engineering value assigned to the next polled calibration point
+        self._address = {}  # Display rows of the config keys, filled by the build
+
+    def _initDisplay(self):
+        self._updateNavHighlight()
+
+    def _buildDisplay(self):
+        self.displayItems = displayio.Group()
+        y = 3  # Top of screen start point
+        _y = 16  # Spacing, tight enough for the six value rows above Cancel and the help line
+        # Calibration table and fit order rows follow the scaling values
+        keys = list(sorted(k for k in self._config.keys() if k != 'Cal_Pts' and k != 'Fit_Order'))
+        self._address = {}
+        # Build out the display text and graphics for initialization
+        """0"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=keys[0],
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y),
+                                             background_color=BLK, color=GRY, padding_left=1))
+        """1"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self._config[keys[0]]),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[0].text] = 1
+        """2"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=keys[1],
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 1)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        """3"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self._config[keys[1]]),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 1)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[2].text] = 3
+
+        """4"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=keys[2],
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 2)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        """5"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self._config[keys[2]]),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 2)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[4].text] = 5
+
+        """6"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=keys[3],
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 3)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        """7"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self._config[keys[3]]),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 3)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[6].text] = 7
+
+        """8"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Cal_Pts',
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 4)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        """9"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=self._calText(),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 4)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[8].text] = 9
+
+        """10"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Fit_Order',
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 5)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        """11"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self._config['Fit_Order']),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 5)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[10].text] = 11
+
+        """12"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Cancel',
+                                             scale=2, anchor_point=(0.5, 0.0), anchored_position=(120, y + (_y * 6)),
+                                             background_color=BLK, color=RED, padding_left=0, padding_bottom=1))
+        """13"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Press = Select || Hold = Save & Exit',
+                                             scale=1, anchor_point=(0.5, 1.0), anchored_position=(120, 130),
+                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
+
+        self.selectableItems = len(self.displayItems) - 2  # get a length of the group list that is navigable
+        self.helpLabelIndex = len(self.displayItems) - 1  # Get the index of the quick help label
+
+    def _updateNavHighlight(self):
+        # Reset all backgrounds to default
+        for i in range(len(self.displayItems)):
+            if i != self.helpLabelIndex:
+                if self.displayItems[i].color != self.defaultColor_text:
+                    self.displayItems[i].color = self.defaultColor_text
+                    self.displayItems[i].background_color = self.defaultColor_bg
+        # Highlight selected index menu item
+        self.displayItems[self.selectIndex].color = self.highlightColor_text
+        self.displayItems[self.selectIndex].background_color = self.highlightColor_bg
+
+    def navCCW(self, steps=1):
+        # navigate index by evens only
+        for _ in range(steps):
+            if self.selectIndex >= self.selectableItems:
+                self.selectIndex = 0  # Loop back to first selectable item
+            else:
+                self.selectIndex = self.selectIndex + 2
+        self._updateNavHighlight()
+
+    def navCW(self, steps=1):
+        # navigate index by evens only
+        for _ in range(steps):
+            if self.selectIndex >= 2:
+                self.selectIndex = self.selectIndex - 2
+            else:
+                self.selectIndex = self.selectableItems  # Loop back to last selectable item
+        self._updateNavHighlight()
+
+    def setEdit(self, flag):
+        # selectIndex in this function should always be the character edit
+        if flag:
+            self.displayItems[self.selectIndex].background_color = GRY
+            self.displayItems[self.selectIndex].color = GRN
+            self.displayItems[self.selectIndex + 1].background_color = GRY
+            self.displayItems[self.selectIndex + 1].color = GRN
+            key = self.displayItems[self.selectIndex].text
+            if key == 'Raw_Upr' or key == 'Raw_Lwr' or key == 'Cal_Pts':
+                self.displayItems[self.helpLabelIndex].text = 'Press = Save & Exit || Hold = Poll Sensor'
+            else:
+                self.displayItems[self.helpLabelIndex].text = 'Press = Save & Exit'
+            if key == 'Cal_Pts':  # Show the engineering value the next polled point is assigned
+                self.displayItems[self._address[key]].text = self._calText(edit=True)
+
+        else:
+            self._updateNavHighlight()
+            self.displayItems[self.helpLabelIndex].text = 'Press = Select || Hold = Save & Exit'
+            self._updateDisplay('Cal_Pts')
+
+    def editCW(self, steps=1):  # Function looks to selected option and increments on a fixed value per step
+        key = self.displayItems[self.selectIndex].text
+        if key == 'Cal_Pts':
+            self._calTarget = self._calTarget + .125 * steps  # Calibration point height increments by 1/8
+            self.displayItems[self._address[key]].text = self._calText(edit=True)
+            return
+        if key == 'Fit_Order':
+            self._setOrder(self._config[key] + steps)
+            return
+        if key == 'Eng_Upr' or key == 'Eng_Lwr':
+            self._config[key] = self._config[key] + .125 * steps  # Engineering units increment by 1/8
+        else:
+            self._config[key] = self._config[key] + steps  # Raw units increment by 1
+
+        self._updateDisplay(key)
+
+    def editCCW(self, steps=1):  # Function looks to selected option and increments on a fixed value per step
+        key = self.displayItems[self.selectIndex].text
+        if key == 'Cal_Pts':
+            if self._calTarget >= 0:  # Stepping below zero arms clearing the table
+                self._calTarget = max(-.125, self._calTarget - .125 * steps)
+            self.displayItems[self._address[key]].text = self._calText(edit=True)
+            return
+        if key == 'Fit_Order':
+            self._setOrder(self._config[key] - steps)
+            return
+        if key == 'Eng_Upr' or key == 'Eng_Lwr':
+            self._config[key] = self._config[key] - .125 * steps  # Engineering units increment by 1/8
+        else:
+            self._config[key] = self._config[key] - steps  # Raw units increment by 1
+
+        self._updateDisplay(key)
+
+    def recordVal(self, value):  # Function looks to selected option and records the sent value if valid
+        key = self.displayItems[self.selectIndex].text
+        if key == 'Raw_Upr' or key == 'Raw_Lwr':
+            self._config[key] = value
+        elif key == 'Cal_Pts':
+            if self._calTarget < 0:  # Clear the table
+                self._config[key] = []
+                self.fit.clear()
+                self._calTarget = 0.0
+            else:
+                # Build a new table rather than mutate, the list is shared with the saved config until saved
+                points = []
+                for p in self._config[key]:
+                    if p[0] == value:  # Captured again at the same raw reading, the new height replaces it
+                        self.fit.removePoint(p[0], p[1])
+                    else:
+                        points.append(p)
+                points.append([value, self._calTarget])
+                points.sort()
+                self.fit.addPoint(value, self._calTarget)
+                self._config[key] = points
+            self.displayItems[self._address[key]].text = self._calText(edit=True)
+            return
+
+        self._updateDisplay(key)
+
+    def _setOrder(self, order):
+        order = min(max(order, 0), PolyFit.MAX_ORDER)  # 0 turns the fit off
+        self._config['Fit_Order'] = order
+        self.fit.order = order
+        self._updateDisplay('Fit_Order')
+
+    def _loadFit(self):
+        # Accumulate the saved table once, captures then update the fit point by point
+        self.fit = PolyFit(self._config['Fit_Order'])
+        for raw, eng in self._config['Cal_Pts']:
+            self.fit.addPoint(raw, eng)
+
+    def _calText(self, edit=False):
+        count = len(self._config['Cal_Pts'])
+        if not edit:
+            return str(count)
+        if self._calTarget < 0:
+            return f'{count} @Clear'
+        return f'{count} @{self._calTarget}'
+
+    def _updateDisplay(self, key):
+        if key not in self._address:  # Config value without a display row
+            return
+        if key == 'Cal_Pts':
+            self.displayItems[self._address[key]].text = self._calText()
+        else:
+            self.displayItems[self._address[key]].text = str(self._config[key])
+
+    def getSelected(self):
+        return self.displayItems[self.selectIndex].text
+
+    @property
+    def config(self):
+        return self._config
+
+    @config.setter
+    def config(self, d):
+        # Discard unsaved edits and reload the working copy from the saved config
+        if not isinstance(d, dict):
+            raise TypeError('passed data must be of type dictionary')
+        reload = False
+        for key in d:
+            if self._config.get(key) != d[key]:
+                self._config[key] = d[key]
+                self._updateDisplay(key)
+                reload = reload or key == 'Cal_Pts' or key == 'Fit_Order'
+        if reload:
+            self._loadFit()
@@ -1,7 +1,7 @@
+import gc
 import terminalio
 from adafruit_display_text import label, scrolling_label
 import displayio
-from GPS import GPSParser
 
 WHT = 0xFFFFFF
 BLK = 0x000000
@@ -17,13 +17,111 @@ RED = 0xFF0000
 '''
 
 
-class SplashScreen:
-    def __init__(self, screenName, defaultTextColor=WHT, defaultBackgroundColor=BLK, ack=True):
+class Screen:
+    """Base of the screens. The display group is built on first use instead of at import, and release() frees it
+    while keeping the text and colors of every label so the next use rebuilds the screen as it was left.
+    Subclasses create their labels in _buildDisplay(), style a newly built screen in _initDisplay() and reapply state
+    that can change while released in _syncDisplay()"""
+    LABEL_BYTES = 1024  # Heap estimate per label where gc.mem_alloc() is not available
+
+    def __init__(self, screenName):
         self.screenName = screenName
+        self.groupSize = 0  # Heap bytes of the display group when last built
+        self.builds = 0
+        self._group = None
+        self._labels = None  # (text, color, background_color) of each label while released
+
+    @property
+    def built(self):
+        return self._group is not None
+
+    @property
+    def displayItems(self):
+        if self._group is None:
+            self._build()
+        return self._group
+
+    @displayItems.setter
+    def displayItems(self, group):
+        self._group = group
+
+    def _build(self):
+        memAlloc = getattr(gc, 'mem_alloc', None)
+        start = memAlloc() if memAlloc is not None else 0
+        self._buildDisplay()
+        if self._labels is None:
+            self._initDisplay()
+        else:
+            for item, saved in zip(self._group, self._labels):
+                item.text, item.color, item.background_color = saved
+            self._labels = None
+        self._syncDisplay()
+        size = memAlloc() - start if memAlloc is not None else 0
+        # A collection during the build spoils the count
+        self.groupSize = size if size > 0 else len(self._group) * self.LABEL_BYTES
+        self.builds += 1
+
+    def _initDisplay(self):
+        pass
+
+    def _syncDisplay(self):
+        pass
+
+    def release(self):
+        """Free the display group, the labels are rebuilt as they were on the next use"""
+        if self._group is not None:
+            self._labels = [(item.text, item.color, item.background_color) for item in self._group]
+            self._group = None
+
+    def getDisplayGroup(self):
+        # Function returns the DisplayGroup for the Board.Display.show() function
+        return self.displayItems
+
+
+class ScreenManager:
+    """Shows screens on the display and keeps the display groups of the most recently shown within a heap budget.
+    Once the built groups exceed the budget the least recently shown screens are released, they rebuild with their
+    state intact when used again. The screen on the display is never released"""
+
+    def __init__(self, display, budget=24576):
+        self.display = display
+        self.budget = budget  # Heap bytes of display groups kept built
+        self.current = None
+        self.releases = 0
+        self._recent = []  # Built screens in the order last shown, least recent first
+
+    @property
+    def size(self):
+        """Heap bytes of the display groups kept built"""
+        return sum(screen.groupSize for screen in self._recent if screen.built)
+
+    def show(self, screen):
+        group = screen.getDisplayGroup()
+        for shown in self._recent:
+            if shown is screen or shown.screenName == screen.screenName:  # A screen replaced by a new instance drops
+                self._recent.remove(shown)
+                break
+        self._recent.append(screen)
+        self.current = screen
+        self.display.show(group)
+        self._trim()
+
+    def _trim(self):
+        while len(self._recent) > 1 and self.size > self.budget:  # The last is the current screen
+            self._recent.pop(0).release()
+            self.releases += 1
+
+    def __str__(self):
+        return f'Screens built: {", ".join(screen.screenName for screen in self._recent if screen.built)} ' \
+               f'{self.size}/{self.budget}B, releases: {self.releases}'
+
+
+class SplashScreen(Screen):
+    def __init__(self, screenName, defaultTextColor=WHT, defaultBackgroundColor=BLK, ack=True):
+        super().__init__(screenName)
         self.defaultTextColor = defaultTextColor
         self.defaultBackgroundColor = defaultBackgroundColor
         self.ack = ack
-        self._buildDisplay()
 
     def _buildDisplay(self):
         self.displayItems = displayio.Group()
@@ -76,24 +174,19 @@ class SplashScreen:
         self.displayItems[0].bgcolor, self.displayItems[1].bgcolor, self.displayItems[2].bgcolor, \
         self.displayItems[3].bgcolor = bgcolor, bgcolor, bgcolor, bgcolor
 
-    def getDisplayGroup(self):
-        return self.displayItems
-
 
-class MenuScreen:
-    def __init__(self, screenName, navList, selectIndex=0, defaultTextColor=WHT, defaultBackgroundColor=BLK):
-        self.screenName = screenName
+class MenuScreen(Screen):
+    def __init__(self, screenName, navList, selectIndex=0, defaultTextColor=WHT, defaultBackgroundColor=BLK,
+                 badges=()):
+        super().__init__(screenName)
         self.navList = navList
         self.selectIndex = selectIndex
         self.defaultTextColor = defaultTextColor
         self.defaultBackgroundColor = defaultBackgroundColor
-        # Build menu display
-        self._buildDisplay()
-        self.updateMenu()
+        self._badges = [[name, GRY] for name in badges]  # Device readiness badges, name and color
 
-    def getDisplayGroup(self):
-        # Function returns the DisplayGroup for the Board.Display.show() function
-        return self.displayItems
+    def _initDisplay(self):
+        self.updateMenu()
 
     def updateMenu(self):
         self.displayItems[0].text = self.navList[self.selectIndex - 1] if self.selectIndex != 0 else ''
@@ -101,21 +194,21 @@ class MenuScreen:
         self.displayItems[2].text = self.navList[self.selectIndex + 1] if self.selectIndex <= len(
             self.navList) - 2 else ''
 
-    def navCCW(self):
+    def navCCW(self, steps=1):
         index = self.selectIndex
-        if self.selectIndex > 0:
-            self.selectIndex = self.selectIndex - 1
+        if self.selectIndex > steps:
+            self.selectIndex = self.selectIndex - steps
         else:
             self.selectIndex = 0
         if index != self.selectIndex:
             self.updateMenu()
 
-    def navCW(self):
+    def navCW(self, steps=1):
         index = self.selectIndex
-        if self.selectIndex >= len(self.navList) - 1:
+        if self.selectIndex + steps >= len(self.navList) - 1:
             self.selectIndex = len(self.navList) - 1
         else:
-            self.selectIndex = self.selectIndex + 1
+            self.selectIndex = self.selectIndex + steps
         if index != self.selectIndex:
             self.updateMenu()
 
@@ -138,328 +231,33 @@ class MenuScreen:
                                              anchor_point=(0.0, 1.0), anchored_position=(2, 135),
                                              background_color=BLK, color=WHT, padding_left=2,
                                              padding_right=1))
-
-
-class NewLog:
-    def __init__(self, screenName, charCount=15, defaultColor_text=WHT, defaultColor_bg=BLK,
-                 highlightColor_text=BLK, highlightColor_bg=WHT):
-        self.screenName = screenName
-        self.selectIndex = 3
-        self.defaultColor_text = defaultColor_text
-        self.defaultColor_bg = defaultColor_bg
-        self.highlightColor_text = highlightColor_text
-        self.highlightColor_bg = highlightColor_bg
-        self.static_offset = 13
-        self.charCount = charCount
-        # Build menu display
-        self.fileString = ''
-        self._buildDisplay()
-        self._updateNavHighlight()
-
-    def _buildDisplay(self):
-        self.displayItems = displayio.Group()
-        # Insert the display string into the group first so it is always index 0
-        """0"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=self.fileString + '.txt',
-                                             scale=2, anchor_point=(0.5, 0.5), anchored_position=(120, 35),
-                                             background_color=BLK, color=YEL))
-        """1"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='File Name...',
-                                             scale=2, anchor_point=(0.5, 0.5),
-                                             background_color=BLK, color=GRY, anchored_position=(120, 10)))
-        """2"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Edit->',
-                                             scale=2, anchor_point=(1.0, 0.5),
-                                             background_color=BLK, color=GRY, anchored_position=(100, 80)))
-        """3"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='0',
-                                             scale=2, anchor_point=(0.5, 0.5),
-                                             background_color=GRY, color=BLK, anchored_position=(120, 80),
-                                             padding_right=1, padding_left=2))
-        """4"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='<-Bcksp',
-                                             scale=2, anchor_point=(1.0, 0.5),
-                                             background_color=GRY, color=BLK, anchored_position=(240, 80),
-                                             padding_left=1))
-        """5"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Save',
-                                             scale=2, anchor_point=(1.0, 1.0),
-                                             background_color=GRY, color=BLK, anchored_position=(240, 135),
-                                             padding_left=1))
-        """6"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Ins',
-                                             scale=2, anchor_point=(0.5, 1.0),
-                                             background_color=GRY, color=BLK, anchored_position=(120, 135),
-                                             padding_left=1))
-        """7"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Esc',
-                                             scale=2, anchor_point=(0.0, 1.0),
-                                             background_color=GRY, color=BLK, anchored_position=(2, 135),
-                                             padding_left=2))
-
-    def getDisplayGroup(self):
-        # Function returns the DisplayGroup for the Board.Display.show() function
-        return self.displayItems
-
-    def navCW(self):
-        if self.selectIndex >= len(self.displayItems) - 1:
-            self.selectIndex = 3  # Loop back to first selectable item
-        else:
-            self.selectIndex = self.selectIndex + 1
-        self._updateNavHighlight()
-
-    def navCCW(self):
-        if self.selectIndex > 3:
-            self.selectIndex = self.selectIndex - 1
-        else:
-            self.selectIndex = 7  # Loop back to last selectable item
-        self._updateNavHighlight()
-
-    def _updateNavHighlight(self):
-        for i in range(len(self.displayItems)):
-            if i >= 3:
-                self.displayItems[i].background_color = GRY
-        self.displayItems[self.selectIndex].background_color = WHT
-
-    def getNavItem(self):
-        # Return the current highlighted navigation text
-        return self.displayItems[self.selectIndex].text
-
-    def getFileName(self):
-        # Return the fileString with .txt appended
-        return self.fileString + '.txt'
-
-    def setEdit(self, flag):
-        # selectIndex in this function should always be the character edit
-        if flag:
-            self.displayItems[self.selectIndex].background_color = GRN
-        else:
-            self._updateNavHighlight()
-
-    def editCW(self):
-        # function called when editing characters of the selected string encoder input CW
-        # inverse selection index to count from right of string.
-        newchar = self._charUpdate(self.displayItems[3].text, 1)
-        self.displayItems[3].text = newchar
-        self.displayItems[0].text = self.fileString + newchar + '.txt'
-
-    def editCCW(self):
-        newchar = self._charUpdate(self.displayItems[3].text, -1)
-        self.displayItems[3].text = newchar
-        self.displayItems[0].text = self.fileString + newchar + '.txt'
-
-    def _charUpdate(self, character, step):
-        # Return the next allowed ASII character
-        num = ord(character) + step
-        if num < 32:  # Wrap to a space
-            num = 122
-        elif 32 < num < 48:  # Skip ASCII characters 33 - 47
-            num = 48 if step == 1 else 32
-        elif 57 < num < 65:  # Skip ASCII characters 58 - 64
-            num = 65 if step == 1 else 57
-        elif 90 < num < 95:  # Skip ASCII characters 91 - 94
-            num = 95 if step == 1 else 90
-        elif 95 < num < 97:  # Skip ASCII characters 58 - 64
-            num = 97 if step == 1 else 95
-        elif num > 122:  # Wrap to a space
-            num = 32
-        return chr(num)
-
-    def addChar(self):
-        # fileString = str(self.displayItems[0].text).replace('.txt', '')
-        fileString = self.fileString
-        newchar = self._charUpdate(self.displayItems[3].text, 0)
-        self.displayItems[0].text = fileString + newchar + '.txt'
-        self.fileString = fileString + newchar
-        print('Added Character...')
-
-    def addStr(self, insert):
-        fileString = str(self.displayItems[0].text).replace('.txt', '')
-        self.displayItems[0].text = fileString + insert + '.txt'
-        self.fileString = fileString + insert
-
-    def subtractChar(self):
-        fileString = str(self.displayItems[0].text).replace('.txt', '')[:-1]
-        self.displayItems[0].text = fileString + '.txt'
-        self.fileString = fileString
-
-    def Debug(self, str):
-        print(f'{self.__class__} - {str} called.')
-
-
-class Config:
-    def __init__(self, screenName, config, defaultColor_text=GRY, defaultColor_bg=BLK,
-                 highlightColor_text=BLK, highlightColor_bg=WHT):
-        self.screenName = screenName
-        self._config = config  # Config should be dict passed of vales editable in this screen
-        self.selectIndex = 0
-        self.defaultColor_text = defaultColor_text
-        self.defaultColor_bg = defaultColor_bg
-        self.highlightColor_text = highlightColor_text
-        self.highlightColor_bg = highlightColor_bg
-        self.static_offset = 13
-        # Build menu display
-        self._buildDisplay()
-        self._updateNavHighlight()
-
-    def _buildDisplay(self):
-        self.displayItems = displayio.Group()
-        y = 5  # Top of screen start point
-        _y = 22  # Spacing
-        keys = list(sorted(self._config.keys()))
-        self._address = {}
-        # Build out the display text and graphics for initialization
-        """0"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=keys[0],
-                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y),
-                                             background_color=BLK, color=GRY, padding_left=1))
-        """1"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self._config[keys[0]]),
-                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        self._address[self.displayItems[0].text] = 1
-        """2"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=keys[1],
-                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 1)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        """3"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self._config[keys[1]]),
-                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 1)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        self._address[self.displayItems[2].text] = 3
-
-        """4"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=keys[2],
-                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 2)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        """5"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self._config[keys[2]]),
-                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 2)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        self._address[self.displayItems[4].text] = 5
-
-        """6"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=keys[3],
-                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 3)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        """7"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self._config[keys[3]]),
-                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 3)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        self._address[self.displayItems[6].text] = 7
-
-        """8"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Cancel',
-                                             scale=2, anchor_point=(0.5, 0.0), anchored_position=(120, y + (_y * 4)),
-                                             background_color=BLK, color=RED, padding_left=0, padding_bottom=1))
-        """9"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Press = Select || Hold = Save & Exit',
-                                             scale=1, anchor_point=(0.5, 1.0), anchored_position=(120, 130),
-                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
-
-        self.selectableItems = len(self.displayItems) - 2  # get a length of the group list that is navigable
-        self.helpLabelIndex = len(self.displayItems) - 1  # Get the index of the quick help label
-
-    def _updateNavHighlight(self):
-        # Reset all backgrounds to default
-        for i in range(len(self.displayItems)):
-            if i != self.helpLabelIndex:
-                if self.displayItems[i].color != self.defaultColor_text:
-                    self.displayItems[i].color = self.defaultColor_text
-                    self.displayItems[i].background_color = self.defaultColor_bg
-        # Highlight selected index menu item
-        self.displayItems[self.selectIndex].color = self.highlightColor_text
-        self.displayItems[self.selectIndex].background_color = self.highlightColor_bg
-
-    def getDisplayGroup(self):
-        # Function returns the DisplayGroup for the Board.Display.show() function
-        return self.displayItems
-
-    def navCCW(self):
-        # navigate index by evens only
-        if self.selectIndex >= self.selectableItems:
-            self.selectIndex = 0  # Loop back to first selectable item
-        else:
-            self.selectIndex = self.selectIndex + 2
-        self._updateNavHighlight()
-
-    def navCW(self):
-        # navigate index by evens only
-        if self.selectIndex >= 2:
-            self.selectIndex = self.selectIndex - 2
-        else:
-            self.selectIndex = self.selectableItems  # Loop back to last selectable item
-        self._updateNavHighlight()
-
-    def setEdit(self, flag):
-        # selectIndex in this function should always be the character edit
-        if flag:
-            self.displayItems[self.selectIndex].background_color = GRY
-            self.displayItems[self.selectIndex].color = GRN
-            self.displayItems[self.selectIndex + 1].background_color = GRY
-            self.displayItems[self.selectIndex + 1].color = GRN
-            key = self.displayItems[self.selectIndex].text
-            if key == 'Raw_Upr' or key == 'Raw_Lwr':
-                self.displayItems[self.helpLabelIndex].text = 'Press = Save & Exit || Hold = Poll Sensor'
-            else:
-                self.displayItems[self.helpLabelIndex].text = 'Press = Save & Exit'
-
-        else:
-            self._updateNavHighlight()
-            self.displayItems[self.helpLabelIndex].text = 'Press = Select || Hold = Save & Exit'
-
-    def editCW(self):  # Function looks to selected option and increments on a fixed value
-        key = self.displayItems[self.selectIndex].text
-        if key == 'Eng_Upr' or key == 'Eng_Lwr':
-            self._config[key] = self._config[key] + .125  # Engineering units increment by 1/8
-        else:
-            self._config[key] = self._config[key] + 1  # Raw units increment by 1
-
-        self._updateDisplay(key)
-
-    def editCCW(self):  # Function looks to selected option and increments on a fixed value
-        key = self.displayItems[self.selectIndex].text
-        if key == 'Eng_Upr' or key == 'Eng_Lwr':
-            self._config[key] = self._config[key] - .125  # Engineering units increment by 1/8
-        else:
-            self._config[key] = self._config[key] - 1  # Raw units increment by 1
-
-        self._updateDisplay(key)
-
-    def recordVal(self, value):  # Function looks to selected option and records the sent value if valid
-        key = self.displayItems[self.selectIndex].text
-        if key == 'Raw_Upr' or key == 'Raw_Lwr':
-            self._config[key] = value
-
-        self._updateDisplay(key)
-
-    def _updateDisplay(self, key):
-        self.displayItems[self._address[key]].text = str(self._config[key])
-
-    def getSelected(self):
-        return self.displayItems[self.selectIndex].text
-
-    @property
-    def config(self):
-        return self._config
-
-    @config.setter
-    def config(self, d):
-        if not isinstance(d, dict):
-            raise TypeError('passed data must be of type dictionary')
-        for key in d:
-            if self._config[key] != d[key]:
-                self._config[key] = d[key]
-                self._updateDisplay(key)
-
-
-class Runtime:
+        # Badges are stacked in the top right corner after the three nav labels
+        for i, badge in enumerate(self._badges):
+            self.displayItems.append(label.Label(font=terminalio.FONT, text=badge[0], scale=1,
+                                                 anchor_point=(1.0, 0.0), anchored_position=(238, 2 + 12 * i),
+                                                 background_color=BLK, color=badge[1], padding_left=1))
+
+    def setBadge(self, name, color):
+        # Color a readiness badge, GRY while starting, GRN ready and RED not detected. A released screen is not rebuilt
+        for i, badge in enumerate(self._badges):
+            if badge[0] == name:
+                badge[1] = color
+                if self.built:
+                    self.displayItems[3 + i].color = color
+
+    def _syncDisplay(self):
+        for i, badge in enumerate(self._badges):
+            self.displayItems[3 + i].color = badge[1]
+
+
+class Runtime(Screen):
     def __init__(self, screenName, defaultColor_text=YEL, defaultColor_bg=BLK,
                  highlightColor_text=BLK, highlightColor_bg=WHT):
-        self.screenName = screenName
+        super().__init__(screenName)
         """Static Definition for the dictionary displayed"""
         """Dictionaries return no particular order, declaring labels must be done statically"""
-        self._items = {'Lat': '', 'Lon': '', 'File': 'example.txt', 'Row': 0, 'Rng': 0, 'Entry': 0, 'GPS': ''}
+        self._items = {'Lat': '', 'Lon': '', 'File': 'example.txt', 'Row': 0, 'Rng': 0, 'Entry': 0, 'GPS': '',
+                       'Auto': 'Off'}
         """Address book for display items in order to access the displayGroups to update values"""
         self._address = {}  # Built dynamically in the screen config
         self.selectIndex = 6
@@ -468,8 +266,8 @@ class Runtime:
         self.highlightColor_text = highlightColor_text
         self.highlightColor_bg = highlightColor_bg
         self.static_offset = 13  # spacing for display items
-        # Build menu display
-        self._buildDisplay()
+
+    def _initDisplay(self):
         self._updateNavHighlight()
 
     @property
@@ -492,7 +290,7 @@ class Runtime:
         self.displayItems = displayio.Group()
         self._address = {}
         y = 5  # Top of screen start point
-        _y = 22  # Spacing
+        _y = 19  # Spacing
         # Build out the display text and graphics for initialization
         """0"""
         self.displayItems.append(label.Label(font=terminalio.FONT, text='File:',
@@ -547,11 +345,21 @@ class Runtime:
                         background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
         self._address[self.displayItems[8].text[:-1]] = 9
         """10"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Auto:',
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 5)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        """11"""
+        self.displayItems.append(
+            label.Label(font=terminalio.FONT, text=str(self._items[self.displayItems[10].text[:-1]]),
+                        scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 5)),
+                        background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[10].text[:-1]] = 11
+        """12"""
         self.displayItems.append(label.Label(font=terminalio.FONT, text='Press = Select || Hold = Exit',
                                              scale=1, anchor_point=(0.5, 1.0), anchored_position=(120, 130),
                                              background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
 
-        self.selectableItems = (4, 8)  # tuple indicates selectable limits
+        self.selectableItems = (4, 10)  # tuple indicates selectable limits
         self.helpLabelIndex = len(self.displayItems) - 1  # Get the index of the quick help label
 
     def _updateNavHighlight(self):
@@ -565,27 +373,23 @@ class Runtime:
         self.displayItems[self.selectIndex].color = self.highlightColor_text
         self.displayItems[self.selectIndex].background_color = self.highlightColor_bg
 
-    def getDisplayGroup(self):
-        # Function returns the DisplayGroup for the Board.Display.show() function
-        return self.displayItems
-
     def getSelected(self):
         return self.displayItems[self.selectIndex].text[:-1]
 
-    def navCCW(self):
+    def navCCW(self, steps=1):
         # navigate index by evens only
-        if self.selectIndex >= self.selectableItems[1]:
+        if self.selectIndex + 2 * steps >= self.selectableItems[1]:
             self.selectIndex = self.selectableItems[1]
         else:
-            self.selectIndex = self.selectIndex + 2
+            self.selectIndex = self.selectIndex + 2 * steps
         self._updateNavHighlight()
 
-    def navCW(self):
+    def navCW(self, steps=1):
         # navigate index by evens only
-        if self.selectIndex <= self.selectableItems[0]:
+        if self.selectIndex - 2 * steps <= self.selectableItems[0]:
             self.selectIndex = self.selectableItems[0]
         else:
-            self.selectIndex = self.selectIndex - 2
+            self.selectIndex = self.selectIndex - 2 * steps
         self._updateNavHighlight()
 
     def setEdit(self, flag):
@@ -603,101 +407,58 @@ class Runtime:
             self._updateNavHighlight()
             self.displayItems[self.helpLabelIndex].text = 'Press = Select || Hold = Exit'
 
-    def editCW(self):
+    def editCW(self, steps=1):
         key = self.displayItems[self.selectIndex].text[:-1]  # Ensure to strip ':' character from the label
-        self._items[key] = self._items[key] + 1  # Raw units increment by 1
+        self._items[key] = self._items[key] + steps  # Raw units increment by 1 per step
 
         self.displayItems[self.selectIndex + 1].text = str(self._items[key])
 
-    def editCCW(self):
+    def editCCW(self, steps=1):
         key = self.displayItems[self.selectIndex].text[:-1]  # Ensure to strip ':' character from the label
-        if self._items[key] >= 1:
-            self._items[key] = self._items[key] - 1  # Raw units increment by 1
+        self._items[key] = max(0, self._items[key] - steps)  # Raw units decrement by 1 per step, floor of 0
 
         self.displayItems[self.selectIndex + 1].text = str(self._items[key])
 
 
-class GPSDetails:
+class Diagnostics(Screen):
     def __init__(self, screenName):
-        self.screenName = screenName
-        self.static_offset = 13  # spacing for display items
-        self.items = {'Lat': '', 'Lon': '', 'Fix': '', 'Msg Count': 0, 'Time': ''}
-        # Build menu display
-        self._buildDisplay()
+        super().__init__(screenName)
+        self.items = {'Profile': 'Off', 'Scan': '', 'Worst': '', 'Overruns': '', 'Slow State': '', 'Enc I2C': '',
+                      'Heap Block': 'Off'}
 
     def _buildDisplay(self):
         self.displayItems = displayio.Group()
-        y = 5  # Top of screen start point
-        _y = 22  # Spacing
+        y = 3  # Top of screen start point
+        _y = 16  # Spacing
         self._address = {}
-        # Build out the display text and graphics for initialization
-        """0"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Lat:',
-                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y),
-                                             background_color=BLK, color=WHT, padding_left=1))
-        """1"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[0].text[:-1]]),
-                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        self._address[self.displayItems[0].text[:-1]] = 1
-
-        """2"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Lon:',
-                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 1)),
-                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
-        """3"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[2].text[:-1]]),
-                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 1)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        self._address[self.displayItems[2].text[:-1]] = 3
-
-        """4"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Fix:',
-                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 2)),
-                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
-        """5"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[4].text[:-1]]),
-                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 2)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        self._address[self.displayItems[4].text[:-1]] = 5
-        """6"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Msg Count:',
-                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 3)),
-                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
-        """7"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[6].text[:-1]]),
-                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 3)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        self._address[self.displayItems[6].text[:-1]] = 7
-        """8"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Time:',
-                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 4)),
-                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
-        """9"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[8].text[:-1]]),
-                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 4)),
-                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
-        self._address[self.displayItems[8].text[:-1]] = 9
+        # Build out the display text and graphics for initialization, a name and value label per row
+        for row, key in enumerate(self.items):
+            self.displayItems.append(label.Label(font=terminalio.FONT, text=key + ':',
+                                                 scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + _y * row),
+                                                 background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
+            self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[key]),
+                                                 scale=2, anchor_point=(1.0, 0.0),
+                                                 anchored_position=(238, y + _y * row),
+                                                 background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+            self._address[key] = len(self.displayItems) - 1
 
-        """10"""
-        self.displayItems.append(label.Label(font=terminalio.FONT, text='Press = Exit',
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Press = Exit   Hold = Profile On/Off',
                                              scale=1, anchor_point=(0.5, 1.0), anchored_position=(120, 130),
                                              background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
-
-        self.selectableItems = [4, 8]  # tuple indicates selectable limits
         self.helpLabelIndex = len(self.displayItems) - 1  # Get the index of the quick help label
 
-    def getDisplayGroup(self):
-        # Function returns the DisplayGroup for the Board.Display.show() function
-        return self.displayItems
-
-    def updateDisplay(self, gps):
-        if isinstance(gps, GPSParser):
-            self.displayItems[self._address['Lat']].text = gps.latitude
-            self.displayItems[self._address['Lon']].text = gps.longitude
-            self.displayItems[self._address['Fix']].text = gps.fix_stat
-            self.displayItems[self._address['Msg Count']].text = str(gps.parsed_sentences)
-            self.displayItems[self._address['Time']].text = gps.timestamp[0] + ':' + gps.timestamp[1] + ':' + \
-                                                            gps.timestamp[2]
-        else:
-            raise TypeError('Object type passed to screen must be type "GPSParser"')
+    def updateDisplay(self, profiler, wheel=None, heap=None):
+        # Takes a Utilities.ScanProfiler and shows its cycle summary, plus the I2C transactions per scan of a SelectWheel
+        # and the largest free block probed by a Utilities.HeapMonitor
+        cycle = profiler.cycle
+        self.displayItems[self._address['Profile']].text = 'On' if profiler.enabled else 'Off'
+        self.displayItems[self._address['Scan']].text = f'{cycle.mean:.1f}ms'
+        self.displayItems[self._address['Worst']].text = f'{cycle.worst / 1000:.1f}ms'
+        self.displayItems[self._address['Overruns']].text = f'{cycle.overruns}/{cycle.count}'
+        worst = profiler.worstState
+        self.displayItems[self._address['Slow State']].text = '-' if worst is None else str(worst)  # Nothing timed yet
+        if wheel is not None and wheel.scans:
+            self.displayItems[self._address['Enc I2C']].text = f'{wheel.totalTransactions / wheel.scans:.2f}/scan'
+        if heap is not None:
+            block = 'Off' if not heap.probe else '-' if heap.largest is None else f'{heap.largest // 1024}KiB'
+            self.displayItems[self._address['Heap Block']].text = block
@@ -3,10 +3,14 @@ class GPSParser(object):
     In an order to streamline the size and speed of the library for running on the ESP32 M5 Stack device,
     functionality has been reduced and GPS coordinates will remain as ASCII strings due to the ESP32's Double precision
     float limits
+
+    Sentences are collected into a preallocated buffer and the parsed fields are kept as raw bytes, so feeding the
+    parser allocates nothing. The string values are only built when a property is read.
     """
     # Max Number of Characters a valid sentence can be (based on GGA sentence)
     SENTENCE_LIMIT = 90
-    __HEMISPHERES = ('N', 'S', 'E', 'W')
+    MAX_SEGMENTS = 20
+    __HEMISPHERES = b'NSEW'
     __NO_FIX = 1
     __FIX_2D = 2
     __FIX_3D = 3
@@ -22,8 +26,12 @@ class GPSParser(object):
         self.sentence_active = False
         self.active_segment = 0
         self.process_crc = False
-        self.gps_segments = ['', '', '', '', '', '', '', '', '', '', '', '', '', '', '']
+        self._sentence = bytearray(self.SENTENCE_LIMIT)  # Sentence characters without the separators
+        self._length = 0
+        self._starts = bytearray(self.MAX_SEGMENTS + 1)  # Offset of each segment in the sentence buffer
         self.crc_xor = 0
+        self._crc = 0  # Checksum received after the '*'
+        self._crcDigits = 0
         self.char_count = 0
         self.fix_time = 0
 
@@ -34,58 +42,89 @@ class GPSParser(object):
         self.parsed_sentences = 0
 
         #####################
-        # Data From Sentences
+        # Data From Sentences, raw field bytes with the length in the first byte
         # Time
-        self._timestamp = ['', '', '']
-        self._datestamp = ['', '', '']
-        self.utc_string = ''
+        self._utc = bytearray(12)
+        self._day = bytearray(3)
+        self._month = bytearray(3)
+        self._year = bytearray(5)
+        self._timeSet = False
+        self._dateSet = False
 
         # Position/Motion
-        self._latitude = ['', '', '']
-        self._longitude = ['', '', '']
-        self.altitude = 0.0
-        self.geoid_height = 0.0
+        self._lat = bytearray(14)
+        self._latHemi = bytearray(2)
+        self._lon = bytearray(14)
+        self._lonHemi = bytearray(2)
+        self._altitude = bytearray(10)
+        self._geoid = bytearray(10)
 
         # GPS Info
         self.satellites_in_view = 0
         self.satellites_in_use = 0
-        self.hdop = ''
+        self._hdop = bytearray(8)
         self.pdop = ''
         self.vdop = ''
         self.valid = False
         self._fix_stat = 0
         self.fix_type = 1
 
+    @staticmethod
+    def _text(field, start=0, end=None):
+        """String of a stored field, optionally sliced"""
+        length = field[0]
+        end = length if end is None or end > length else end
+        return str(field[1 + start:1 + end], 'ascii') if start < end else ''
+
     @property
     def latitude(self):
         """Format Latitude Data Correctly"""
         """Return as ASCII string only due to ESP32 limit"""
-
-        return self._latitude[0] + ' ' + self._latitude[1] + ' ' + self._latitude[2]
+        latitude = self.latitude_list
+        return latitude[0] + ' ' + latitude[1] + ' ' + latitude[2]
 
     @property
     def latitude_list(self):
-        return [self._latitude[0], self._latitude[1], self._latitude[2]]
+        return [self._text(self._lat, 0, 2), self._text(self._lat, 2), self._text(self._latHemi)]
 
     @property
     def longitude(self):
         """Format Longitude Data Correctly"""
         """Return as ASCII string only due to ESP32 limit"""
-        return self._longitude[0] + ' ' + self._longitude[1] + ' ' + self._longitude[2]
+        longitude = self.longitude_list
+        return longitude[0] + ' ' + longitude[1] + ' ' + longitude[2]
 
     @property
     def longitude_list(self):
-        return [self._longitude[0], self._longitude[1], self._longitude[2]]
+        return [self._text(self._lon, 0, 3), self._text(self._lon, 3), self._text(self._lonHemi)]
 
     @property
     def timestamp(self):
         """Hour, Min, Sec"""
-        return self._timestamp
+        if not self._timeSet:
+            return ['', '', '']
+        if not self._utc[0]:  # Receiver doesn't have a time yet
+            return ['0', '0', '0.0']
+        return [self._text(self._utc, 0, 2), self._text(self._utc, 2, 4), self._text(self._utc, 4)]
 
     @property
     def datestamp(self):
         """Day, Month , Year"""
-        return self._datestamp
+        if not self._dateSet:
+            return ['', '', '']
+        return [self._text(self._day), self._text(self._month), self._text(self._year)]
+
+    @property
+    def hdop(self):
+        return self._text(self._hdop)
+
+    @property
+    def altitude(self):
+        return self._text(self._altitude) if self._altitude[0] else 0.0
+
+    @property
+    def geoid_height(self):
+        return self._text(self._geoid) if self._geoid[0] else 0.0
 
     @property
     def fix_stat(self):
@@ -110,174 +149,183 @@ class GPSParser(object):
         else:
             self._fix_stat = i
 
-    @staticmethod
-    def unsupported():
-        return False
+    """------Segment access------"""
+
+    # Segment offsets are returned separately, a returned tuple would be allocated
+    def _start(self, index):
+        """Offset of a segment in the sentence buffer"""
+        return self._starts[index] if index <= self.active_segment else 0
+
+    def _end(self, index):
+        """Offset after the last character of a segment"""
+        if index > self.active_segment:
+            return 0
+        return self._starts[index + 1] if index < self.active_segment else self._length
+
+    def _store(self, index, field):
+        """Copy a segment into a field, truncated to the field size"""
+        start = self._start(index)
+        end = self._end(index)
+        length = min(end - start, len(field) - 1)
+        field[0] = length
+        for i in range(length):
+            field[1 + i] = self._sentence[start + i]
+
+    def _number(self, index):
+        """Integer value of a segment, None when empty or not a number"""
+        start = self._start(index)
+        end = self._end(index)
+        if start == end:
+            return None
+        value = 0
+        for i in range(start, end):
+            digit = self._sentence[i] - 48
+            if not 0 <= digit <= 9:
+                return None
+            value = value * 10 + digit
+        return value
+
+    def _hemisphere(self, index):
+        start = self._start(index)
+        end = self._end(index)
+        return end - start == 1 and self._sentence[start] in self.__HEMISPHERES
+
+    def _matches(self, index, name):
+        """True when a segment holds the bytes of name"""
+        start = self._start(index)
+        end = self._end(index)
+        if end - start != len(name):
+            return False
+        for i in range(end - start):
+            if self._sentence[start + i] != name[i]:
+                return False
+        return True
+
+    """------Sentences------"""
 
     def gpgga(self):
 
         """Parse Global Positioning System Fix Data (GGA) Sentence. Updates UTC timestamp, latitude, longitude,
         fix status, satellites in use, Horizontal Dilution of Precision (HDOP), altitude, geoid height and fix status"""
 
-        try:
-            # UTC Timestamp
-            utc_string = self.gps_segments[1]
-
-            # Skip timestamp if receiver doesn't have one yet
-            if utc_string:
-                hours = (str(utc_string[0:2]))
-                minutes = str(utc_string[2:4])
-                seconds = str(utc_string[4:])
-            else:
-                hours = '0'
-                minutes = '0'
-                seconds = '0.0'
+        # Number of Satellites in Use
+        satellites_in_use = self._number(7)
 
-            # Number of Satellites in Use
-            satellites_in_use = int(self.gps_segments[7])
+        # Get Fix Status
+        fix_stat = self._number(6)
 
-            # Get Fix Status
-            fix_stat = int(self.gps_segments[6])
-
-        except (ValueError, IndexError):
+        if satellites_in_use is None or fix_stat is None:
             return False
 
-        try:
-            # Horizontal Dilution of Precision
-            hdop = str(self.gps_segments[8])
-        except (ValueError, IndexError):
-            hdop = ''
-
         # Process Location and Speed Data if Fix is GOOD
         if fix_stat:
 
-            # Longitude / Latitude
-            try:
-                # Latitude
-                l_string = self.gps_segments[2]
-                lat_degs = l_string[0:2]
-                lat_mins = l_string[2:]
-                lat_hemi = self.gps_segments[3]
-
-                # Longitude
-                l_string = self.gps_segments[4]
-                lon_degs = l_string[0:3]
-                lon_mins = l_string[3:]
-                lon_hemi = self.gps_segments[5]
-            except ValueError:
+            if not self._hemisphere(3):
                 return False
 
-            if lat_hemi not in self.__HEMISPHERES:
+            if not self._hemisphere(5):
                 return False
 
-            if lon_hemi not in self.__HEMISPHERES:
-                return False
-
-            # Altitude / Height Above Geoid
-            try:
-                altitude = self.gps_segments[9]
-                geoid_height = self.gps_segments[11]
-            except ValueError:
-                altitude = 0
-                geoid_height = 0
-
             # Update Object Data
-            self._latitude = [lat_degs, lat_mins, lat_hemi]
-            self._longitude = [lon_degs, lon_mins, lon_hemi]
-            self.altitude = altitude
-            self.geoid_height = geoid_height
-
-        # Update Object Data
-        self._timestamp = [hours, minutes, seconds]
+            self._store(2, self._lat)
+            self._store(3, self._latHemi)
+            self._store(4, self._lon)
+            self._store(5, self._lonHemi)
+            self._store(9, self._altitude)
+            self._store(11, self._geoid)
+
+        # Update Object Data, a missing timestamp is stored empty
+        self._store(1, self._utc)
+        self._timeSet = True
         self.satellites_in_use = satellites_in_use
-        self.hdop = hdop
+        self._store(8, self._hdop)
         self._fix_stat = fix_stat
         return True
 
     def gpzda(self):
-        try:
-            # UTC Timestamp
-            utc_string = self.gps_segments[1]
-
-            # Skip timestamp if receiver doesn't have one yet
-            if utc_string:
-                hours = (str(utc_string[0:2]))
-                minutes = str(utc_string[2:4])
-                seconds = str(utc_string[4:])
-            else:
-                hours = '0'
-                minutes = '0'
-                seconds = '0.0'
-
-            day = self.gps_segments[2]
-            month = self.gps_segments[3]
-            year = self.gps_segments[4]
-
-        except (ValueError, IndexError):
-            print('Failed to Parse ZDA')
-            return False
-
-        self._timestamp = [hours, minutes, seconds]
-        self._datestamp = [day, month, year]
+        # UTC Timestamp and date
+        self._store(1, self._utc)
+        self._store(2, self._day)
+        self._store(3, self._month)
+        self._store(4, self._year)
+        self._timeSet = True
+        self._dateSet = True
         return True
 
     def new_sentence(self):
         """Adjust Object Flags in Preparation for a New Sentence"""
-        self.gps_segments = ['', '', '', '', '', '', '', '', '', '', '', '', '', '', '']
+        self._length = 0
         self.active_segment = 0
         self.crc_xor = 0
+        self._crc = 0
+        self._crcDigits = 0
         self.sentence_active = True
         self.process_crc = True
         self.char_count = 0
 
+    def _nextSegment(self):
+        if self.active_segment >= self.MAX_SEGMENTS:
+            self.sentence_active = False  # Too many fields to be a supported sentence
+            return
+        self.active_segment += 1
+        self._starts[self.active_segment] = self._length
+
     def update(self, new_char):
         """Process a new input char and updates GPS object if necessary based on special characters ('$', ',', '*')
-        Function builds a list of received string that are validated by CRC prior to parsing by the appropriate
-        sentence function. Returns sentence type on successful parse, None otherwise"""
+        new_char is a received byte or a one character string. Characters are collected into the sentence buffer and
+        the sentence is validated by CRC prior to parsing by the appropriate sentence function.
+        Returns sentence type on successful parse, None otherwise"""
 
         valid_sentence = False
 
         # Validate new_char is a printable char
-        ascii_char = ord(new_char)
+        ascii_char = new_char if isinstance(new_char, int) else ord(new_char)
 
         if 10 <= ascii_char <= 126:
             self.char_count += 1
             # Check if a new string is starting ($)
-            if new_char == '$':
+            if ascii_char == 36:  # '$'
                 self.new_sentence()
                 return None
 
             elif self.sentence_active:
 
                 # Check if sentence is ending (*)
-                if new_char == '*':
+                if ascii_char == 42:  # '*'
                     self.process_crc = False
-                    self.active_segment += 1
-                    # self.gps_segments.append('')
+                    self._nextSegment()
                     return None
 
-                # Check if a section is ended (,), Create a new substring to feed
-                # characters to
-                elif new_char == ',':
-                    self.active_segment += 1
-                    self.gps_segments.append('')
+                # Check if a section is ended (,), start the next segment
+                elif ascii_char == 44:  # ','
+                    self._nextSegment()
 
                 # Store All Other printable character and check CRC when ready
-                else:
-                    self.gps_segments[self.active_segment] += str(new_char)
+                elif self.process_crc:
+                    if self._length < self.SENTENCE_LIMIT:
+                        self._sentence[self._length] = ascii_char
+                        self._length += 1
 
-                    # When CRC input is disabled, sentence is nearly complete
-                    if not self.process_crc:
-
-                        if len(self.gps_segments[self.active_segment]) == 2:
-                            try:
-                                final_crc = int(self.gps_segments[self.active_segment], 16)
-                                if self.crc_xor == final_crc:
-                                    valid_sentence = True
-                                else:
-                                    self.crc_fails += 1
-                            except ValueError:
-                                pass  # CRC Value was deformed and could not have been correct
+                # When CRC input is disabled, sentence is nearly complete
+                else:
+                    if 48 <= ascii_char <= 57:
+                        digit = ascii_char - 48
+                    elif 65 <= ascii_char <= 70:
+                        digit = ascii_char - 55
+                    elif 97 <= ascii_char <= 102:
+                        digit = ascii_char - 87
+                    else:
+                        digit = None  # CRC Value was deformed and could not have been correct
+                    if digit is None:
+                        self.sentence_active = False
+                    else:
+                        self._crc = (self._crc << 4) | digit
+                        self._crcDigits += 1
+                        if self._crcDigits == 2:
+                            if self.crc_xor == self._crc:
+                                valid_sentence = True
+                            else:
+                                self.crc_fails += 1
 
                 # Update CRC
                 if self.process_crc:
@@ -286,14 +334,16 @@ class GPSParser(object):
                 # If a Valid Sentence Was received and it's a supported sentence, then parse it!!
                 if valid_sentence:
                     self.sentence_active = False  # Clear Active Processing Flag
+                    self.clean_sentences += 1
 
-                    if self.gps_segments[0] in self.supported_sentences:
-
-                        # parse the Sentence Based on the message type, return True if parse is clean
-                        if self.supported_sentences[self.gps_segments[0]](self):
-                            # Let host know that the GPS object was updated by returning parsed sentence type
-                            self.parsed_sentences += 1
-                            return self.gps_segments[0]
+                    for sentence, name, parser in self.supported_sentences:
+                        if self._matches(0, sentence):
+                            # parse the Sentence Based on the message type, return True if parse is clean
+                            if parser(self):
+                                # Let host know that the GPS object was updated by returning parsed sentence type
+                                self.parsed_sentences += 1
+                                return name
+                            break
 
                 # Check that the sentence buffer isn't filling up with Garbage waiting for the sentence to complete
                 if self.char_count > self.SENTENCE_LIMIT:
@@ -301,14 +351,7 @@ class GPSParser(object):
         # Tell Host no new sentence was parsed
         return None
 
-    supported_sentences = {'GPRMC': unsupported, 'GLRMC': unsupported,
-                           'GPGGA': gpgga, 'GLGGA': gpgga,
-                           'GPVTG': unsupported, 'GLVTG': unsupported,
-                           'GPGSA': unsupported, 'GLGSA': unsupported,
-                           'GPGSV': unsupported, 'GLGSV': unsupported,
-                           'GPGLL': unsupported, 'GLGLL': unsupported,
-                           'GNGGA': gpgga, 'GNRMC': unsupported,
-                           'GNVTG': unsupported, 'GNGLL': unsupported,
-                           'GNGSA': unsupported, 'GNZDA': gpzda,
-                           'GPZDA': gpzda, 'GLZDA': gpzda
-                           }
+    # Sentence type bytes, name returned from update and parser. Other sentences are ignored
+    supported_sentences = ((b'GNGGA', 'GNGGA', gpgga), (b'GNZDA', 'GNZDA', gpzda),
+                           (b'GPGGA', 'GPGGA', gpgga), (b'GLGGA', 'GLGGA', gpgga),
+                           (b'GPZDA', 'GPZDA', gpzda), (b'GLZDA', 'GLZDA', gpzda))
@@ -0,0 +1,86 @@
+"""GPS details screen, imported when the GPS details are first opened from Runtime"""
+import terminalio
+from adafruit_display_text import label
+import displayio
+from GPS import GPSParser
+from Menu import Screen, WHT, BLK, GRY
+
+
+class GPSDetails(Screen):
+    def __init__(self, screenName):
+        super().__init__(screenName)
+        self.static_offset = 13  # spacing for display items
+        self.items = {'Lat': '', 'Lon': '', 'Fix': '', 'Msg Count': 0, 'Time': ''}
+
+    def _buildDisplay(self):
+        self.displayItems = displayio.Group()
+        y = 5  # Top of screen start point
+        _y = 22  # Spacing
+        self._address = {}
+        # Build out the display text and graphics for initialization
+        """0"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Lat:',
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y),
+                                             background_color=BLK, color=WHT, padding_left=1))
+        """1"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[0].text[:-1]]),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[0].text[:-1]] = 1
+
+        """2"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Lon:',
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 1)),
+                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
+        """3"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[2].text[:-1]]),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 1)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[2].text[:-1]] = 3
+
+        """4"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Fix:',
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 2)),
+                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
+        """5"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[4].text[:-1]]),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 2)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[4].text[:-1]] = 5
+        """6"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Msg Count:',
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 3)),
+                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
+        """7"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[6].text[:-1]]),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 3)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[6].text[:-1]] = 7
+        """8"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Time:',
+                                             scale=2, anchor_point=(0.0, 0.0), anchored_position=(2, y + (_y * 4)),
+                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
+        """9"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=str(self.items[self.displayItems[8].text[:-1]]),
+                                             scale=2, anchor_point=(1.0, 0.0), anchored_position=(238, y + (_y * 4)),
+                                             background_color=BLK, color=GRY, padding_left=1, padding_bottom=1))
+        self._address[self.displayItems[8].text[:-1]] = 9
+
+        """10"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Press = Exit',
+                                             scale=1, anchor_point=(0.5, 1.0), anchored_position=(120, 130),
+                                             background_color=BLK, color=WHT, padding_left=1, padding_bottom=1))
+
+        self.selectableItems = [4, 8]  # tuple indicates selectable limits
+        self.helpLabelIndex = len(self.displayItems) - 1  # Get the index of the quick help label
+
+    def updateDisplay(self, gps):
+        if isinstance(gps, GPSParser):
+            self.displayItems[self._address['Lat']].text = gps.latitude
+            self.displayItems[self._address['Lon']].text = gps.longitude
+            self.displayItems[self._address['Fix']].text = gps.fix_stat
+            self.displayItems[self._address['Msg Count']].text = str(gps.parsed_sentences)
+            self.displayItems[self._address['Time']].text = gps.timestamp[0] + ':' + gps.timestamp[1] + ':' + \
+                                                            gps.timestamp[2]
+        else:
+            raise TypeError('Object type passed to screen must be type "GPSParser"')
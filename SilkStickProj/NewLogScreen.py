@@ -0,0 +1,154 @@
+"""New log file name entry screen, imported when the New Log screen is first opened"""
+import terminalio
+from adafruit_display_text import label
+import displayio
+from Menu import Screen, WHT, BLK, GRY, YEL, GRN
+
+
+class NewLog(Screen):
+    def __init__(self, screenName, charCount=15, defaultColor_text=WHT, defaultColor_bg=BLK,
+                 highlightColor_text=BLK, highlightColor_bg=WHT):
+        super().__init__(screenName)
+        self.selectIndex = 3
+        self.defaultColor_text = defaultColor_text
+        self.defaultColor_bg = defaultColor_bg
+        self.highlightColor_text = highlightColor_text
+        self.highlightColor_bg = highlightColor_bg
+        self.static_offset = 13
+        self.charCount = charCount
+        self.fileString = ''
+
+    def _initDisplay(self):
+        self._updateNavHighlight()
+
+    def _buildDisplay(self):
+        self.displayItems = displayio.Group()
+        # Insert the display string into the group first so it is always index 0
+        """0"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text=self.fileString + '.txt',
+                                             scale=2, anchor_point=(0.5, 0.5), anchored_position=(120, 35),
+                                             background_color=BLK, color=YEL))
+        """1"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='File Name...',
+                                             scale=2, anchor_point=(0.5, 0.5),
+                                             background_color=BLK, color=GRY, anchored_position=(120, 10)))
+        """2"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Edit->',
+                                             scale=2, anchor_point=(1.0, 0.5),
+                                             background_color=BLK, color=GRY, anchored_position=(100, 80)))
+        """3"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='0',
+                                             scale=2, anchor_point=(0.5, 0.5),
+                                             background_color=GRY, color=BLK, anchored_position=(120, 80),
+                                             padding_right=1, padding_left=2))
+        """4"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='<-Bcksp',
+                                             scale=2, anchor_point=(1.0, 0.5),
+                                             background_color=GRY, color=BLK, anchored_position=(240, 80),
+                                             padding_left=1))
+        """5"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Save',
+                                             scale=2, anchor_point=(1.0, 1.0),
+                                             background_color=GRY, color=BLK, anchored_position=(240, 135),
+                                             padding_left=1))
+        """6"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Ins',
+                                             scale=2, anchor_point=(0.5, 1.0),
+                                             background_color=GRY, color=BLK, anchored_position=(120, 135),
+                                             padding_left=1))
+        """7"""
+        self.displayItems.append(label.Label(font=terminalio.FONT, text='Esc',
+                                             scale=2, anchor_point=(0.0, 1.0),
+                                             background_color=GRY, color=BLK, anchored_position=(2, 135),
+                                             padding_left=2))
+
+    def navCW(self, steps=1):
+        for _ in range(steps):
+            if self.selectIndex >= len(self.displayItems) - 1:
+                self.selectIndex = 3  # Loop back to first selectable item
+            else:
+                self.selectIndex = self.selectIndex + 1
+        self._updateNavHighlight()
+
+    def navCCW(self, steps=1):
+        for _ in range(steps):
+            if self.selectIndex > 3:
+                self.selectIndex = self.selectIndex - 1
+            else:
+                self.selectIndex = 7  # Loop back to last selectable item
+        self._updateNavHighlight()
+
+    def _updateNavHighlight(self):
+        for i in range(len(self.displayItems)):
+            if i >= 3:
+                self.displayItems[i].background_color = GRY
+        self.displayItems[self.selectIndex].background_color = WHT
+
+    def getNavItem(self):
+        # Return the current highlighted navigation text
+        return self.displayItems[self.selectIndex].text
+
+    def getFileName(self):
+        # Return the fileString with .txt appended
+        return self.fileString + '.txt'
+
+    def setEdit(self, flag):
+        # selectIndex in this function should always be the character edit
+        if flag:
+            self.displayItems[self.selectIndex].background_color = GRN
+        else:
+            self._updateNavHighlight()
+
+    def editCW(self, steps=1):
+        # function called when editing characters of the selected string encoder input CW
+        # inverse selection index to count from right of string.
+        newchar = self.displayItems[3].text
+        for _ in range(steps):
+            newchar = self._charUpdate(newchar, 1)
+        self.displayItems[3].text = newchar
+        self.displayItems[0].text = self.fileString + newchar + '.txt'
+
+    def editCCW(self, steps=1):
+        newchar = self.displayItems[3].text
+        for _ in range(steps):
+            newchar = self._charUpdate(newchar, -1)
+        self.displayItems[3].text = newchar
+        self.displayItems[0].text = self.fileString + newchar + '.txt'
+
+    def _charUpdate(self, character, step):
+        # Return the next allowed ASII character
+        num = ord(character) + step
+        if num < 32:  # Wrap to a space
+            num = 122
+        elif 32 < num < 48:  # Skip ASCII characters 33 - 47
+            num = 48 if step == 1 else 32
+        elif 57 < num < 65:  # Skip ASCII characters 58 - 64
+            num = 65 if step == 1 else 57
+        elif 90 < num < 95:  # Skip ASCII characters 91 - 94
+            num = 95 if step == 1 else 90
+        elif 95 < num < 97:  # Skip ASCII characters 58 - 64
+            num = 97 if step == 1 else 95
+        elif num > 122:  # Wrap to a space
+            num = 32
+        return chr(num)
+
+    def addChar(self):
+        # fileString = str(self.displayItems[0].text).replace('.txt', '')
+        fileString = self.fileString
+        newchar = self._charUpdate(self.displayItems[3].text, 0)
+        self.displayItems[0].text = fileString + newchar + '.txt'
+        self.fileString = fileString + newchar
+        print('Added Character...')
+
+    def addStr(self, insert):
+        fileString = str(self.displayItems[0].text).replace('.txt', '')
+        self.displayItems[0].text = fileString + insert + '.txt'
+        self.fileString = fileString + insert
+
+    def subtractChar(self):
+        fileString = str(self.displayItems[0].text).replace('.txt', '')[:-1]
+        self.displayItems[0].text = fileString + '.txt'
+        self.fileString = fileString
+
+    def Debug(self, str):
+        print(f'{self.__class__} - {str} called.')
@@ -5,9 +5,17 @@ from adafruit_ht16k33 import ht16k33, segments
 import countio
 import analogio
 from digitalio import DigitalInOut, Direction, DriveMode, Pull
-import adafruit_ads1x15.ads1015 as ADS
-from adafruit_ads1x15.analog_in import AnalogIn
-from Utilities import Timer
+from Utilities import Timer, SampleBuffer
+
+ADS = None  # ADS1015 driver modules, imported by the first analog channel rather than at boot
+AnalogIn = None
+
+# Input event kinds posted to an InputQueue
+PRESS = 0
+RELEASE = 1
+SHORT = 2
+LONG = 3
+DETENT = 4
 
 
 class Beeper:
@@ -19,8 +27,8 @@ class Beeper:
         self._state = 0
         self._start = False
 
-    def __call__(self, *args, **kwargs):
-        self.scan(*args, **kwargs)
+    def __call__(self):
+        self.scan()
 
     def scan(self):
         self._timer()  # scan timer evaluation
@@ -76,185 +84,382 @@ class CharacterDisplay:
             self._display.show()
 
 
-class StringPot:
-    def __init__(self, i2c):
-        self._ADS = ADS.ADS1015(i2c)  # Default Address 0x40
-        self._ADS.mode = ADS.Mode.CONTINUOUS  # Set the ADS device to continuous sample
-        self._device = AnalogIn(self._ADS, ADS.P0)  # Analog Channel A0
+def _loadADS():
+    global ADS
+    global AnalogIn
+    if ADS is None:
+        import adafruit_ads1x15.ads1015 as ads1015
+        from adafruit_ads1x15.analog_in import AnalogIn as analogIn
+        ADS = ads1015
+        AnalogIn = analogIn
+
+
+class AnalogChannel:
+    """One ADS1015 input sampled on its own fixed rate grid with optional filtering, scaling and log column.
+    Sampling is done by the AnalogScanner the channel is added to."""
+
+    def __init__(self, channel=0, interval=0.0, sampleFilter=None, scaling=None, column=None, bufferSize=32):
+        _loadADS()
+        self.pin = (ADS.P0, ADS.P1, ADS.P2, ADS.P3)[channel]
+        self.scaling = scaling  # Utilities.Scaling to engineering units, None for raw only
+        self.column = column  # Log file column fed from this channel, None to not log
+        self._interval = interval  # Seconds between samples, 0 samples every scan
+        self._filter = sampleFilter  # Utilities.Filter instance or None for unfiltered
+        self._nextSample = 0.0
+        self.samples = SampleBuffer(bufferSize)  # Timestamped raw samples on the sample grid
+        self.missed = 0  # Sample slots skipped because the scan was late
+        self._device = None  # AnalogIn, only used by the two read mode
+        self._voltsPerCode = 0.0
         self._voltage = 0
+        self._raw = 0
         self._value = 0
 
-    def __call__(self, *args, **kwargs):
-        self.scan(*args, **kwargs)
+    def due(self, now):
+        return now >= self._nextSample
+
+    def _slot(self, now):
+        """Return the sample grid slot for a sample taken now and schedule the next one"""
+        if self._nextSample == 0.0 or now - self._nextSample > 1.0:  # First sample or stalled, restart the grid
+            slot = now
+        else:  # Stay locked to the grid, count any slots a late scan skipped
+            late = int((now - self._nextSample) / self._interval)
+            self.missed += late
+            slot = self._nextSample + late * self._interval
+        self._nextSample = slot + self._interval
+        return slot
+
+    def _store(self, slot, raw):
+        self._raw = raw
+        self.samples.append(slot, raw)
+        self._value = self._filter(raw) if self._filter is not None else raw
 
-    def scan(self):
-        self._voltage = self._device.voltage
-        self._value = self._device.value
+    @property
+    def sampleCount(self):
+        """Total samples taken, changes whenever a new sample is available"""
+        return self.samples.total
+
+    @property
+    def raw(self):
+        """Last unfiltered ADC reading"""
+        return self._raw
 
     @property
     def value(self):
+        """Filtered ADC reading"""
         return self._value
 
+    @property
+    def text(self):
+        """Filtered reading formatted for display and logging, in engineering units when scaled"""
+        if self.scaling is None:
+            return str(self._value)
+        return self.scaling.lookupText(self._value)
+
     @property
     def voltage(self):
+        if self._device is None:  # Derived on request so the scan never pays for it
+            return self._raw * self._voltsPerCode
         return self._voltage
 
 
-class Button:
-    def __init__(self, pin, pull=Pull.UP):
-        self.val = DigitalInOut(pin)
-        self.val.switch_to_input(pull)
+class AnalogScanner:
+    """Owns the ADS1015 and samples the added channels, each on its own rate.
+    The first channel added is the primary, the converter is left in continuous mode on it so a primary sample is a
+    single conversion register read. Secondary channels are converted round robin, at most one directly after each
+    primary sample, so the mux switch and settling time fall between primary sample slots."""
+    # Full scale voltage of the ADS1x15 programmable gain amplifier per gain setting
+    PGA_RANGE = {2 / 3: 6.144, 1: 4.096, 2: 2.048, 4: 1.024, 8: 0.512, 16: 0.256}
+
+    def __init__(self, i2c, dataRate=None, singleRead=True):
+        _loadADS()
+        self._ADS = ADS.ADS1015(i2c)  # Default Address 0x40
+        self._ADS.mode = ADS.Mode.CONTINUOUS  # Set the ADS device to continuous sample
+        if dataRate is not None:
+            self._ADS.data_rate = dataRate  # ADS1015 conversions per second
+        self._singleRead = singleRead  # Read the conversion register once and derive voltage from the code
+        self._shift = 16 - self._ADS.bits  # Left justify to match AnalogIn.value
+        self._voltsPerCode = self.PGA_RANGE[self._ADS.gain] / 32767
+        self.channels = []
+        self._rr = 0  # Round robin offset into the secondary channels
+
+    def __call__(self):
+        self.scan()
+
+    def addChannel(self, channel):
+        # Never sample faster than the conversion rate so each sample is a fresh conversion
+        channel._interval = max(channel._interval, 1 / self._ADS.data_rate)
+        channel._voltsPerCode = self._voltsPerCode
+        if not self._singleRead:
+            channel._device = AnalogIn(self._ADS, channel.pin)
+        self.channels.append(channel)
+        return channel
+
+    def scan(self):
+        """Sample the channels whose next grid slot is due.
+        Cheap when nothing is due, call from more than one point of the scan to hold the rate through slow states."""
+        if not self.channels:
+            return
+        now = time.monotonic()
+        if not self.channels[0].due(now):
+            return
+        self._read(self.channels[0], now)
+        n = len(self.channels) - 1  # Secondary channel count
+        for k in range(n):
+            idx = 1 + (self._rr + k) % n
+            if self.channels[idx].due(now):
+                self._read(self.channels[idx], now)
+                self._rr = idx % n  # Start after this channel next time
+                break
+
+    def _read(self, channel, now):
+        slot = channel._slot(now)
+        if channel._device is None:
+            # Continuous mode on an unchanged channel is a single conversion register read,
+            # a changed channel is reconfigured by the driver and waits for the conversion to settle
+            raw = self._ADS.read(channel.pin) << self._shift
+        else:
+            channel._voltage = channel._device.voltage  # Separate I2C read
+            raw = channel._device.value
+        channel._store(slot, raw)
+
+
+class InputQueue:
+    """Bounded FIFO of timestamped input events shared by the input devices.
+    Events are tuples of (source device, kind, monotonic time, delta, steps). For DETENT events delta is the signed
+    detent count and steps the same movement after velocity acceleration. When full the oldest event is dropped and
+    counted."""
+
+    def __init__(self, size=16):
+        self._size = size
+        self._buffer = [None] * size
+        self.dropped = 0  # Events lost to a full queue
+        self.clear()
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._head = 0  # Oldest event position
+        self._count = 0
+
+    def put(self, source, kind, delta=0, t=None, steps=None):
+        if self._count == self._size:  # Drop the oldest
+            self._head = (self._head + 1) % self._size
+            self._count -= 1
+            self.dropped += 1
+        self._buffer[(self._head + self._count) % self._size] = \
+            (source, kind, time.monotonic() if t is None else t, delta, delta if steps is None else steps)
+        self._count += 1
+
+    def get(self):
+        """Return the oldest event, None when empty"""
+        if self._count == 0:
+            return None
+        event = self._buffer[self._head]
+        self._buffer[self._head] = None
+        self._head = (self._head + 1) % self._size
+        self._count -= 1
+        return event
+
+
+class PressTracker:
+    """Press, held, release and long press state machine shared by the push button inputs.
+    Keeps the single scan flags of the scanning devices and posts the edges to an InputQueue."""
+
+    def __init__(self, source, events=None):
+        self._source = source  # Device reported as the event source
+        self._events = events
+        self.press = False
+        self.release = False
+        self.held = False
+        self.longPress = False
+        self.shortPress = False
+        self.holdCount = 0  # Monotonic time of the press
+        self._longSent = False  # Long press already posted for this hold
+
+    def update(self, btn, longPressTime, t=None):
+        """Evaluate the button level for this scan, t is the time of the edge when known"""
+        now = time.monotonic() if t is None else t
+        self.press = btn and not self.held
+        self.release = not btn and self.held
+        self.held = btn
+        self.shortPress = False
+        self.longPress = False
+
+        if self.press:  # Press Event
+            self.holdCount = now
+            self._post(PRESS, now)
+
+        if self.held and time.monotonic() - self.holdCount >= longPressTime:
+            if not self._longSent:  # Post once per hold
+                self._longSent = True
+                self._post(LONG, time.monotonic())
+            self.longPress = True  # Held past the time for as long as the button is held
+
+        if self.release:  # Press Released Event
+            self._post(RELEASE, now)
+            if not self._longSent:  # Decide on the hold duration, a slow scan may not have seen the long press
+                if now - self.holdCount < longPressTime:
+                    self.shortPress = True
+                    self._post(SHORT, now)
+                else:
+                    self.longPress = True
+                    self._post(LONG, now)
+            self.holdCount = 0
+
+        if not self.held:
+            self._longSent = False
 
-        self._press = False
-        self._release = False
-        self._held = False
-        self._longPress = False
-        self._shortPress = False
-        self.holdCount = 0
+    def _post(self, kind, t):
+        if self._events is not None:
+            self._events.put(self._source, kind, t=t)
 
-    def __call__(self, *args, **kwargs):
-        self.scan(*args, **kwargs)
+
+class Button:
+    """Discrete push button.
+    counted=True captures edges with a countio.Counter in hardware instead of polling the pin level, so a tap that
+    starts and ends between two scans is still reported. Edges are timestamped by the scan that collects them.
+    The counted button starts released and every edge toggles it, so a Pull.UP button reads as active low.
+    The counter is never reset, each scan takes the edges counted since the last one so none can be lost.
+    The counter has no edge times, so contact bounce is told from a tap by the scans around it: an even edge count
+    leaving the level unchanged is only a tap when no other edges are seen within debounce seconds either side of it,
+    otherwise the level is just kept. A tap is reported once the debounce window after it has passed quietly."""
+
+    def __init__(self, pin, pull=Pull.UP, events=None, counted=False, debounce=0.03):
+        self._tracker = PressTracker(self, events)
+        self._counter = None
+        self.val = None
+        self.debounce = debounce
+        if counted:
+            self._counter = countio.Counter(pin, edge=countio.Edge.RISE_AND_FALL, pull=pull)
+            self._counted = self._counter.count  # Running count at the last scan
+            self._level = False  # Pressed state tracked by edge parity, button assumed released at start
+            self._lastEdge = None  # Time of the last scan that collected edges
+            self._tap = None  # Time of a tap waiting out the debounce window
+        else:
+            self.val = DigitalInOut(pin)
+            self.val.switch_to_input(pull)
+
+    def __call__(self, longPressTime=0.5):
+        self.scan(longPressTime)
 
     def scan(self, longPressTime=0.5):
         # Button Pressed
-        btn = self.val.value
-
-        if btn and not self._press and not self._held:  # Press Event
-            self._press = True
-            self._held = True
-            self._release = False
-
-        elif btn and self._press:  # Press Event Over, still held
-            self._press = False
-            self._held = True
-            self._release = False
-
-        elif not btn and self._held:  # Press Released Event
-            self._press = False
-            self._held = False
-            self._release = True
-
-        elif not btn and not self._held:  # Press Release Over
-            self._press = False
-            self._held = False
-            self._release = False
-
-        if self._longPress:  # Ensure longPress is only on for a single scan event
-            self._longPress = False
-
-        if self._shortPress:  # Ensure longPress is only on for a single scan event
-            self._shortPress = False
-
-        if self._held and self.holdCount == 0:
-            self.holdCount = time.monotonic()
-
-        if self._held and self.holdCount != 0:
-            count = time.monotonic() - self.holdCount
-            if count >= longPressTime:
-                self._longPress = True
-
-        if self._release:  # release event resets hold counter
-            count = time.monotonic() - self.holdCount
-            if count < longPressTime:
-                self._shortPress = True
-            self.holdCount = 0
+        if self._counter is None:
+            self._tracker.update(self.val.value, longPressTime)
+            return
+        count = self._counter.count
+        edges = count - self._counted
+        self._counted = count
+        t = time.monotonic()
+        level = self._level ^ bool(edges & 1)  # An odd edge count toggles the level
+        if self._tap is not None:
+            if t - self._tap >= self.debounce:  # Quiet since, report the tap held back
+                self._tracker.update(not self._level, longPressTime, self._tap)
+                self._tracker.update(self._level, longPressTime, self._tap)
+                self._tap = None
+                if not edges:  # Leave the tap's release as this scan's state
+                    return
+            elif edges:  # More edges straight after, it was contact bounce
+                self._tap = None
+        if edges:
+            if edges >= 2 and level == self._level and (self._lastEdge is None or t - self._lastEdge >= self.debounce):
+                self._tap = t  # Pin returned to its level between scans, a tap unless more edges follow
+            self._lastEdge = t
+        self._level = level
+        self._tracker.update(level, longPressTime, t)
 
     @property
     def press(self):
-        return self._press
+        return self._tracker.press
 
     @property
     def release(self):
-        return self._release
+        return self._tracker.release
 
     @property
     def held(self):
-        return self._held
+        return self._tracker.held
 
     @property
     def shortPress(self):
-        return self._shortPress
+        return self._tracker.shortPress
 
     @property
     def longPress(self):
-        return self._longPress
+        return self._tracker.longPress
 
 
 class SelectWheel:
-    def __init__(self, i2c):
+    """Rotary encoder with push button.
+    Turns report the signed detent delta plus an accelerated step count: below accelRate detents/s steps match the
+    detents, faster spins multiply them by 1 + ((rate - accelRate) / accelRate)^2 up to accelMax.
+    The seesaw keeps the encoder and GPIO in separate modules so a full poll is two I2C reads. With intPin wired to
+    the breakout INT pin, both are only read after the seesaw flags a change and an idle scan costs no bus time.
+    Without intPin every scan still makes both reads, so the gating saves nothing until the pin is wired. report() gives
+    the transaction count either way."""
+
+    def __init__(self, i2c, events=None, accelRate=8.0, accelMax=200, intPin=None):
         self.rotaryEncoder = seesaw.Seesaw(i2c, addr=0x36)  # 0x36 is the default address for the rotary encoder
         self.rotaryEncoder.pin_mode(24,
                                     self.rotaryEncoder.INPUT_PULLUP)  # Set the pinmode for pin 24 on the Encoder backpack tied to the center 'push/click' of the encoder button.
         self._iEncoder_btn = digitalio.DigitalIO(self.rotaryEncoder, 24)  # assign a Digital IO class to the pin
         self._iEncoder_wheel = rotaryio.IncrementalEncoder(self.rotaryEncoder)
-        self.last_position = -self._iEncoder_wheel.position
+        self.last_position = self._iEncoder_wheel.position  # The seesaw keeps its count over a soft reload
+        self._events = events
+        self.accelRate = accelRate  # Detents per second where acceleration starts
+        self.accelMax = accelMax  # Largest step multiplier
+        self._lastTurn = 0.0
         self._up = False
         self._dwn = False
-        self._press = False
-        self._release = False
-        self._held = False
-        self._longPress = False
-        self._shortPress = False
-        self.holdCount = 0
-
-    def __call__(self, *args, **kwargs):
-        self.scan(*args, **kwargs)
+        self._delta = 0
+        self._steps = 0
+        self._tracker = PressTracker(self, events)
+        self._btn = False  # Last read button level
+        self.transactions = 0  # I2C transactions used by the last scan
+        self.totalTransactions = 0
+        self.scans = 0
+        self._int = None  # Stays None, polling every scan, until intPin is wired
+        if intPin is not None:
+            self.rotaryEncoder.enable_encoder_interrupt()
+            self.rotaryEncoder.set_GPIO_interrupts(1 << 24, True)
+            self._int = DigitalInOut(intPin)
+            self._int.switch_to_input(Pull.UP)  # INT is open drain, active low
+
+    def __call__(self, longPressTime=0.5):
+        self.scan(longPressTime)
 
     def scan(self, longPressTime=0.5):
-
-        position = self._iEncoder_wheel.position  # Invert encoder pos to make CW motion positive
-        if position != self.last_position:
-            if position > self.last_position:
-                self._up = True
-            if position < self.last_position:
-                self._dwn = True
+        self.transactions = 0
+        if self._int is None:
+            position = self._iEncoder_wheel.position
+            self._btn = not self._iEncoder_btn.value  # Button is active low
+            self.transactions = 2
+        elif not self._int.value:  # Seesaw flagged a change
+            # Reading the flags clears the GPIO interrupt, reading the position clears the encoder interrupt
+            if self.rotaryEncoder.get_GPIO_interrupt_flag() & (1 << 24):
+                self._btn = not self._iEncoder_btn.value
+                self.transactions += 1
+            position = self._iEncoder_wheel.position
+            self.transactions += 2
+        else:  # Nothing changed, hold the last readings
+            position = self.last_position
+        self.totalTransactions += self.transactions
+        self.scans += 1
+
+        self._delta = position - self.last_position
+        self._up = self._delta > 0
+        self._dwn = self._delta < 0
+        if self._delta:
             self.last_position = position
+            self._steps = self._accelerate(self._delta)
+            if self._events is not None:
+                self._events.put(self, DETENT, self._delta, steps=self._steps)
         else:
-            self._up = False
-            self._dwn = False
+            self._steps = 0
 
         # Button Pressed
-        btn = not self._iEncoder_btn.value  # Button is active low
-
-        if btn and not self._press and not self._held:  # Press Event
-            self._press = True
-            self._held = True
-            self._release = False
-
-        elif btn and self._press:  # Press Event Over, still held
-            self._press = False
-            self._held = True
-            self._release = False
-
-        elif not btn and self._held:  # Press Released Event
-            self._press = False
-            self._held = False
-            self._release = True
-
-        elif not btn and not self._held:  # Press Release Over
-            self._press = False
-            self._held = False
-            self._release = False
-
-        if self._longPress:  # Ensure longPress is only on for a single scan event
-            self._longPress = False
-
-        if self._shortPress:  # Ensure longPress is only on for a single scan event
-            self._shortPress = False
-
-        if self._held and self.holdCount == 0:
-            self.holdCount = time.monotonic()
-
-        if self._held and self.holdCount != 0:
-            count = time.monotonic() - self.holdCount
-            if count >= longPressTime:
-                self._longPress = True
-
-        if self._release:  # release event resets hold counter
-            count = time.monotonic() - self.holdCount
-            if count < longPressTime:
-                self._shortPress = True
-            self.holdCount = 0
+        self._tracker.update(self._btn, longPressTime)
 
     @property
     def up(self):
@@ -264,28 +469,50 @@ class SelectWheel:
     def dwn(self):
         return self._dwn
 
+    def report(self):
+        """Return a line of encoder I2C transactions, total and per scan"""
+        avg = self.totalTransactions / self.scans if self.scans else 0.0
+        gating = 'INT gated' if self._int is not None else 'polled, INT not wired'
+        return [f'Encoder I2C: {gating}, transactions {self.totalTransactions}, avg {avg:.2f}/scan']
+
+    def _accelerate(self, delta):
+        now = time.monotonic()
+        dt = now - self._lastTurn
+        self._lastTurn = now
+        if dt > 0.25:  # Turn after a pause always starts at 1:1
+            return delta
+        rate = abs(delta) / dt if dt > 0 else self.accelRate
+        if rate <= self.accelRate:
+            return delta
+        factor = min(self.accelMax, 1 + ((rate - self.accelRate) / self.accelRate) ** 2)
+        return int(delta * factor)
+
+    @property
+    def delta(self):
+        """Signed detent count moved this scan"""
+        return self._delta
+
+    @property
+    def steps(self):
+        """Signed step count moved this scan after velocity acceleration"""
+        return self._steps
+
     @property
     def press(self):
-        return self._press
+        return self._tracker.press
 
     @property
     def release(self):
-        return self._release
+        return self._tracker.release
 
     @property
     def held(self):
-        return self._held
+        return self._tracker.held
 
     @property
     def shortPress(self):
-        return self._shortPress
+        return self._tracker.shortPress
 
     @property
     def longPress(self):
-        return self._longPress
-
-
-
-
-
-
+        return self._tracker.longPress
@@ -15,442 +15,681 @@ Most variables will be globally scoped to the controller to maintain operations
 
 
 import time
-import adafruit_pcf8523
-import board
-import busio
-from adafruit_max1704x import MAX17048
-import Menu
-from Peripherals import SelectWheel, CharacterDisplay, Button, StringPot, Beeper
-from Menu import MenuScreen, NewLog, Config, Runtime, SplashScreen, GPSDetails
+bootStart = time.monotonic()  # Time to first interaction counts the imports
 import gc
-import sdcardio
-import storage
 import os
-import GPS
-from Utilities import LogFile, Timer, Scaling, printInline
-from digitalio import Pull
 
-import json
+importCosts = []  # (module, seconds, heap bytes allocated, imported after startup) of each timed import
+
+
+def timedImport(name, deferred=False):
+    """Import a module, recording its time and heap for the import report. Drivers probed by the boot steps and the
+    screens of rarely used subsystems are imported on first use with deferred=True, keeping them off the boot path"""
+    start = time.monotonic()
+    alloc = gc.mem_alloc()
+    module = __import__(name)
+    importCosts.append((name, time.monotonic() - start, gc.mem_alloc() - alloc, deferred))
+    return module
+
+
+def importReport():
+    """Return a line of the startup import time and a line per timed import"""
+    total = sum(cost[1] for cost in importCosts if not cost[3])
+    lines = [f'Imports: {total * 1000:.0f}ms at startup']
+    for name, seconds, alloc, deferred in importCosts:
+        lines.append(f'{name}: {seconds * 1000:.1f}ms, {alloc}B allocated' + (', on first use' if deferred else ''))
+    return lines
+
+
+board = timedImport('board')
+busio = timedImport('busio')
+timedImport('digitalio')
+timedImport('Utilities')
+GPS = timedImport('GPS')
+Menu = timedImport('Menu')
+timedImport('Peripherals')
+from digitalio import Pull
+from Utilities import LogFile, Timer, Scaling, Filter, SettleDetector, BurstCapture, BusScheduler, Clock, \
+    StateMachine, ScanProfiler, ScanScheduler, HeapMonitor, BootSequencer, printInline
+from Menu import MenuScreen, Runtime, SplashScreen, Diagnostics, ScreenManager
+from Peripherals import SelectWheel, CharacterDisplay, Button, AnalogScanner, AnalogChannel, Beeper, InputQueue
+from Peripherals import SHORT, LONG, DETENT
 
 # ---CONSTANTS---
 """------Global Variable Setup------"""
 SystemInitialized = False
 enableGPS = False
+gpsQuiet = False  # Last GPS poll found no received data, holds the GPS timeout timer between polls
 rtcSink = True
 circuitPy = None
-state = 0
+state = 0  # Initial state of the sequence state machine
+scanPeriod = 0.02  # Seconds per input, sequence, output cycle, the remainder of each period is slept
 state_return = 0
+inputEvents = InputQueue(size=16)  # Timestamped button and encoder events, consumed by the sequence
+event = None  # Input event taken by the sequence this scan
 selectedMenu = ''
 selectedFile = ''
 selectedString = ''
 gps_sentenceCount = None
-navList = ['New Log', 'Continue Log', 'Config', 'Battery']
+gpsProbe = False  # The GPS boot step is listening for sentences
+gpsProbeEnd = 0.0  # Time the GPS boot step gives up
+bootReported = False
+configError = ''  # Message for a config file on the SD card that could not be loaded, shown from the main menu
+navList = ['New Log', 'Continue Log', 'Config', 'Battery', 'Diagnostics']
+deviceNames = {'SD': 'SDCard', 'RTC': 'Real Time Clock', 'ADC': 'String-Pot ADC', 'GPS': 'GPS'}  # Boot step names
 quickStrings = ['file', 'row', 'range', 'field', 'Rng', 'Row', 'Eng', 'Exp']
-jsonConfig = {'Raw_Upr': 25500, 'Raw_Lwr': 2000, 'Eng_Upr': 10, 'Eng_Lwr': 42}
+jsonConfig = {'Raw_Upr': 25500, 'Raw_Lwr': 2000, 'Eng_Upr': 10, 'Eng_Lwr': 42, 'Cal_Pts': [], 'Fit_Order': 0}
 newFileName = ''
-logger = LogFile()
-loggingData = {'ymd': '', 'hms': '', 'Row': 0, 'Rng': 0, 'Lat': '', 'Lon': ''}
+
+"""------Additional Analog Channels------"""
+# Secondary ADS1015 inputs scanned behind the string pot on channel 0, each adds its column to the log file
+extraChannels = []
+"""
+battScaling = Scaling()
+battScaling.setup = {'Raw_Upr': 32767, 'Raw_Lwr': 0, 'Eng_Upr': 8.192, 'Eng_Lwr': 0}  # 4.096V PGA, 1:2 divider
+extraChannels = [AnalogChannel(1, interval=0.05, sampleFilter=Filter(Filter.MEDIAN, size=5), scaling=Scaling(),
+                               column='Height2'),
+                 AnalogChannel(3, interval=5.0, sampleFilter=Filter(Filter.AVG, size=4), scaling=battScaling,
+                               column='Batt_V')]
+"""
+"""------"""
+
+logger = LogFile(extraFields=[channel.column for channel in extraChannels if channel.column is not None])
+loggingData = {'ymd': '', 'hms': '', 'Row': 0, 'Rng': 0, 'Lat': '', 'Lon': '', 'Height': '', 'Spread': ''}
+for channel in extraChannels:
+    if channel.column is not None:
+        loggingData[channel.column] = ''
 
 """------Screen Setups------"""
-scrnMainMenu = MenuScreen('Main', navList)
+# Labels are only built when a screen is first used, the screen manager releases the least recently shown
+scrnMainMenu = MenuScreen('Main', navList, badges=('SD', 'RTC', 'ADC', 'GPS'))
 scrnDirList = None
-scrnNewLog = NewLog('New Log')
-scrnStrInsert = MenuScreen('String Insert', quickStrings)
-scrnConfig = Config('Config', jsonConfig)
+scrnNewLog = None  # Rarely used screens are created with their module on first entry
+scrnStrInsert = None
+scrnConfig = None
 scrnRuntime = Runtime('Runtime')
 scrnSplashScreen = SplashScreen('SplashScreen')
-scrnSplashNoAck = SplashScreen('Splash No Ack', ack=False)
-scrnGPSDetails = GPSDetails('GPS Details')
+scrnGPSDetails = None
+scrnDiagnostics = Diagnostics('Diagnostics')
 """------"""
 
 tmrStandby = Timer()  # Create Timers globally to allow input and sequence usage
-tmrdisplayDelay = Timer()
 tmrGPSTimeout = Timer()
 tmrGPSDetailUpdate = Timer()
+tmrDiagnosticsUpdate = Timer()
+profiler = ScanProfiler(period=scanPeriod, enabled=False)  # Scan cycle timing, toggled from the Diagnostics screen
+heap = HeapMonitor(collectAfter=16384, lowWater=32768)  # Heap use per state, collects in the scan's idle slack
 scaling = Scaling()  # Instantiate the scaling block
+scaling.enableTable(text=True)  # Height and display text tables, built a slice per scan after each setup
+autoCapture = SettleDetector(size=16, tolerance=48, settleTime=1.0)  # Runtime hands free logging on a steady reading
+burstCapture = BurstCapture(size=9, timeout=0.3)  # Median height of a burst of samples per logged entry, ~0.18s
 
 
 """------I2C Setup------"""
+# Only the display and encoder come up before the first scan, the other devices are boot steps run in the scan
 # seesaw is the pre-made firmware running the SAMD09U microcontroller used as the backbone for the rotary encoder board
 i2c = board.STEMMA_I2C()  # Use STEMMA or standard I2C if switching to the GPIO pins
 display = board.DISPLAY  # Integral TFT display 240 x 135
+screens = ScreenManager(display, budget=24576)  # Display groups of recent screens kept built, older ones are released
 try:
-    selectWheel = SelectWheel(i2c)
+    # INT is not wired on this build, so the wheel polls both seesaw modules every scan and the INT gating does
+    # nothing. Pass intPin=<board pin> once the encoder breakout INT pin is wired to skip polling an idle encoder
+    selectWheel = SelectWheel(i2c, events=inputEvents, intPin=None)
 except ValueError:
     raise ValueError('Rotory Encoder Selection Wheel is not detected or address error has occurred.')
-try:
-    rtc = adafruit_pcf8523.PCF8523(i2c)
-except ValueError:
-    raise ValueError('Real Time Clock device is not detected or address error has occurred.')
-try:
-    stringPot = StringPot(i2c)
-except ValueError:
-    raise ValueError('ADC String-Pot device is not detected or address error has occurred.')
 try:
     display2 = CharacterDisplay(i2c)
 except ValueError:
     raise ValueError('7 segment character display device is not detected or address error has occurred.')
+rtc = None  # Set by the boot steps
+clock = None
+adc = None
+stringPot = None
+sdcard = None
 """------"""
 """
-battery_monitor = MAX17048(i2c)
+battery_monitor = None  # Created with its driver on first use from the Battery menu
 """
 
 """------UART Setup------"""
-uart = busio.UART(board.TX, board.RX, baudrate=115200, timeout=0.1)
+uart = busio.UART(board.TX, board.RX, baudrate=115200, timeout=0, receiver_buffer_size=512)  # Holds NMEA between polls
+uartData = bytearray(512)  # Preallocated read buffer, a poll reads at most the receive buffer size
 gps = GPS.GPSParser()
 """------"""
 
-btnGreen = Button(board.A2, pull=Pull.DOWN)
-btnRed = Button(board.A3, pull=Pull.DOWN)
+btnGreen = Button(board.A2, pull=Pull.DOWN, events=inputEvents, counted=True)  # Edges captured in hardware
+btnRed = Button(board.A3, pull=Pull.DOWN, events=inputEvents, counted=True)
 beeper = Beeper(board.A0)
 
-"""------Single Scan Startup Logic------"""
-"""------SD Card------"""
-try:
-    sdcard = sdcardio.SDCard(board.SPI(), board.D10)
-    vfs = storage.VfsFat(sdcard)
-    storage.mount(vfs, '/sd')
-    print(f'Mounting SD... {os.listdir("/sd")}')
-except OSError:
-    print("No SD Card on SPI Bus...")
-    sdcard = None
-"""-------JSON Config File------"""
-if sdcard is not None:
+"""------Boot Steps------"""
+# Probed one per scan after the main menu is up, each returns True when ready, False when missing or None to wait
+
+
+def bootSD():
+    """Mount the SD card and load the config from the first .json file on it"""
+    global sdcard
+    global jsonConfig
+    global configError
+    sdcardio = timedImport('sdcardio', deferred=True)
+    storage = timedImport('storage', deferred=True)
+    json = timedImport('json', deferred=True)
+    try:
+        card = sdcardio.SDCard(board.SPI(), board.D10)
+        vfs = storage.VfsFat(card)
+        storage.mount(vfs, '/sd')
+        print(f'Mounting SD... {os.listdir("/sd")}')
+    except OSError:
+        print("No SD Card on SPI Bus...")
+        return False
+    """-------JSON Config File------"""
     dir = os.listdir('/sd')
     dir = list(filter(lambda i: i.endswith('.json'), dir))  # filter out files not ending '.json'
     print(f'Json Files: {dir}')
     if len(dir) > 0:
         with open(f'/sd/{dir[0]}', 'r') as config:
-            jsonConfig = json.load(config)
-            scaling.setup = jsonConfig
-            print(f'Loading Config...{jsonConfig}')
+            try:
+                loaded = json.load(config)
+                scaling.setup = loaded
+                jsonConfig = loaded
+                print(f'Loading Config...{jsonConfig}')
+            except (ValueError, KeyError, TypeError) as e:  # Not json, or not a dict of the scaling keys
+                # The card itself is fine, keep logging on the default config and leave the file to be fixed
+                print(f'Bad config file {dir[0]}: {e}')
+                scaling.setup = jsonConfig
+                configError = f'Bad config file {dir[0]}, using defaults'
     else:
         with open('/sd/config.json', 'w') as file:
             json.dump(jsonConfig, file)
+    sdcard = card
+    return True
+
+
+def bootRTC():
+    global rtc
+    global clock
+    adafruit_pcf8523 = timedImport('adafruit_pcf8523', deferred=True)
+    try:
+        rtc = adafruit_pcf8523.PCF8523(i2c)
+        clock = Clock(rtc, resync=60.0)  # Read once a minute, interpolated in between
+    except ValueError:
+        print('Real Time Clock device is not detected or address error has occurred.')
+        return False
+    busScheduler.register('RTC', clock, period=1.0, priority=2, budget=0.005)  # Bus read only on a due resync
+    return True
+
+
+def bootADC():
+    global adc
+    global stringPot
+    try:
+        scanner = AnalogScanner(i2c, dataRate=1600)
+        channel = scanner.addChannel(AnalogChannel(0, interval=0.02, sampleFilter=Filter(Filter.MEDIAN, size=5),
+                                                   scaling=scaling))
+        for extra in extraChannels:
+            scanner.addChannel(extra)
+    except ValueError:
+        print('ADC String-Pot device is not detected or address error has occurred.')
+        return False
+    adc = scanner
+    stringPot = channel
+    busScheduler.register('ADC', adc, period=0.0, priority=0, budget=0.005)  # Channels keep their own sample grid
+    busScheduler.register('Display', pollDisplay, period=0.1, priority=1, budget=0.005)
+    return True
+
+
+def bootGPS():
+    """The GPS is found once a sentence parses, it is missing after 6s without one"""
+    global gpsProbe
+    global gpsProbeEnd
+    global gps_sentenceCount
+    if not gpsProbe:
+        gpsProbe = True  # pollGPS reads the receiver while probing
+        gpsProbeEnd = time.monotonic() + 6.0
+        gps_sentenceCount = gps.parsed_sentences
+        return None
+    if gps.parsed_sentences != gps_sentenceCount:
+        gpsProbe = False
+        return True
+    if time.monotonic() >= gpsProbeEnd:
+        print('No GPS packets detected...')
+        gpsProbe = False
+        return False
+    return None
+
+
+def bootChanged(name, status):
+    """Show the step status on its main menu badge, print the boot timing once every step has first finished"""
+    global bootReported
+    scrnMainMenu.setBadge(name, (Menu.GRY, Menu.GRN, Menu.RED)[status])
+    if boot.done and not bootReported:
+        print('\n'.join(boot.report() + importReport()))
+        bootReported = True
+
+
+boot = BootSequencer(start=bootStart)
+boot.add('SD', bootSD)
+boot.add('RTC', bootRTC)
+boot.add('ADC', bootADC)
+boot.add('GPS', bootGPS)
+boot.onChange = bootChanged
 """-------"""
 
 
 def outputs():
     """Output Routine used for any cyclical output peripheral updates."""
     global beeper
+    global adc
     beeper()
+    if adc is not None:
+        adc()  # Second sample point per scan holds the sample rate through long sequence states, outside the bus budget
 
 
-def inputs():
-    """Input routine used for any cyclical scanning of I/O"""
-    """Declare Global references below"""
+def pollEncoder():
+    """Bus task: Rotary encoder position and push button"""
     global selectWheel
+    selectWheel(longPressTime=0.5)
+
+
+def pollDisplay():
+    """Bus task: Update the 7 segment display and logged values with the latest analog readings.
+    Height is left to the burst of each entry so a display update can not overwrite it before it is logged"""
     global display2
-    global btnGreen
-    global btnRed
-    global gps
+    global stringPot
+    global extraChannels
     global loggingData
+    try:
+        displayText = stringPot.text  # Shared string from the scaling text table
+        if displayText != display2.message:  # Only print and write the display when the reading changes
+            printInline(displayText)
+            display2.message = displayText  # Update lcd display to the string pot display
+        for channel in extraChannels:
+            if channel.column is not None:
+                loggingData[channel.column] = channel.text
+
+    except ValueError:
+        display2.message = (99.99, 2)
+
+
+def pollGPS():
+    """Scan task: Parse the NMEA sentences received since the last poll"""
+    global gps
     global uart
-    global rtc
+    global uartData
+    global clock
     global rtcSink
     global enableGPS
+    global gpsQuiet
+    global gpsProbe
+    gpsQuiet = False  # Data received, the timeout timer resets
+    if enableGPS or gpsProbe:
+        count = uart.readinto(uartData) if uart.in_waiting else None
+        if count:
+            "Parse GPS data until a new message is complete"
+            for i in range(count):
+                result = gps.update(uartData[i])  # Bytes are fed as integers, nothing is allocated
+                if result is not None and result == 'GNZDA':
+                    "Update rtc clock on the first good GPS ZDA timestamp after bootup"
+                    if rtcSink and clock is not None:
+                        # year, mon, date, hour, min, sec, wday, yday, isdst
+                        clock.set(time.struct_time((int(gps.datestamp[2]), int(gps.datestamp[1]),
+                                                         int(gps.datestamp[0]), int(gps.timestamp[0]),
+                                                         int(gps.timestamp[1]), int(gps.timestamp[2][:2]), 0, -1, -1)))
+                        rtcSink = False
+        else:
+            gpsQuiet = True  # Times out after 3s without data, see inputs()
+
+
+def inputs():
+    """Input routine used for any cyclical scanning of I/O"""
+    """Declare Global references below"""
+    global scanScheduler
+    global btnGreen
+    global btnRed
     global tmrStandby
-    global tmrdisplayDelay
     global stringPot
     global tmrGPSTimeout
+    global gpsQuiet
     global tmrGPSDetailUpdate
+    global tmrDiagnosticsUpdate
+    global autoCapture
+    global burstCapture
     """-------"""
 
     """------Timers------"""
+    if gpsQuiet:  # A timer only times while enabled every scan, the GPS is polled every few scans
+        tmrGPSTimeout.PRE = 3.0
+        tmrGPSTimeout.EN = True
     tmrStandby()  # Cyclically scanned - Interface with .EN and .PRE similar to PLC
-    tmrdisplayDelay()
     tmrGPSTimeout()
     tmrGPSDetailUpdate()
+    tmrDiagnosticsUpdate()
 
     """------Discrete Inputs------"""
     # Calling instance as a function defaults to an internal cyclical scan function
-    selectWheel(longPressTime=0.5)
     btnGreen(longPressTime=0.4)
     btnRed(longPressTime=0.8)
 
-    """------I2C Analog Inputs------"""
-    stringPot()  # Cyclical update of internal vars
-    if not tmrdisplayDelay.EN:
-        tmrdisplayDelay.PRE = 0.1
-        tmrdisplayDelay.EN = True
-    if tmrdisplayDelay.EN and tmrdisplayDelay.DN:
-        try:
-            displayVal = round(scaling(stringPot.value), 2)
-            printInline(str(displayVal))
-            display2.message = f'{displayVal:.2f}'  # Update lcd display to the string pot display
-            loggingData['Height'] = f'{displayVal:.2f}'
-
-        except ValueError:
-            display2.message = (99.99, 2)
-        tmrdisplayDelay.EN = False
-
-    """------Gps Receiver Input------"""
-    if enableGPS:
-        uartData = uart.read(16)
-        if uartData is not None:
-            tmrGPSTimeout.EN = False # reset timer
-            uartData = ''.join([chr(b) for b in uartData])
-            "Parse GPS data until a new message is complete"
-            for char in uartData:
-                result = gps.update(char)
-                if result is not None and result == 'GNZDA':
-                    "Update rtc clock on the first good GPS ZDA timestamp after bootup"
-                    if rtcSink:
-                        # year, mon, date, hour, min, sec, wday, yday, isdst
-                        rtc.datetime = time.struct_time((int(gps.datestamp[2]), int(gps.datestamp[1]),
-                                                         int(gps.datestamp[0]), int(gps.timestamp[0]),
-                                                         int(gps.timestamp[1]), int(gps.timestamp[2][:2]), 0, -1, -1))
-                        rtcSink = False
-        else:
-            tmrGPSTimeout.PRE = 3.0
-            tmrGPSTimeout.EN = True
-
+    """------I2C Devices and GPS Receiver------"""
+    scanScheduler()  # I2C bus devices, the GPS receiver and the boot steps polled on their own periods
+    if stringPot is not None:
+        autoCapture(stringPot.value, stringPot.sampleCount)  # Watch the filtered reading for a settled pole
+        burstCapture(stringPot.raw, stringPot.sampleCount)  # Collect raw samples while a burst is requested
     """------"""
 
-    "Update the Dictionaries logger Info"
-    t = rtc.datetime
-    loggingData['ymd'] = f'{t.tm_year}:{t.tm_mon}:{t.tm_mday}'
-    loggingData['hms'] = f'{t.tm_hour}:{t.tm_min}:{t.tm_sec}'
-    loggingData['Lat'] = gps.latitude if enableGPS else ''
-    loggingData['Lon'] = gps.longitude if enableGPS else ''
-    loggingData['Lat_Maj'] = gps.latitude_list[0] if enableGPS else ''
-    loggingData['Lat_Min'] = gps.latitude_list[1] if enableGPS else ''
-    loggingData['Lon_Maj'] = gps.longitude_list[0] if enableGPS else ''
-    loggingData['Lon_Min'] = gps.longitude_list[1] if enableGPS else ''
 
-
-def sequence():
-    """ Main sequence logic utilizes state based logic to manage flow through program and displays """
-    " Alias local vars to global scope "
-    global state
-    global state_return
-    global btnGreen
-    global btnRed
-    global selectWheel
-    global scrnMainMenu
-    global scrnDirList
-    global scrnNewLog
-    global scrnStrInsert
-    global scrnSplashScreen
-    global scrnSplashNoAck
-    global display
-    global selectedMenu
-    global selectedFile
-    global selectedString
-    global newFileName
-    global logger
-    global loggingData
-    global tmrStandby
-    global tmrGPSDetailUpdate
+def stampEntry():
+    """Fill the time and position fields of loggingData, only called when an entry is written"""
+    global clock
+    global gps
     global enableGPS
-    global gps_sentenceCount
-    global jsonConfig
-    global beeper
-    #global battery_monitor
+    global loggingData
+    clock.stamp(loggingData)
+    position = enableGPS and boot.ready('GPS')  # No position while the receiver is missing or being searched for
+    loggingData['Lat'] = gps.latitude if position else ''
+    loggingData['Lon'] = gps.longitude if position else ''
+    loggingData['Lat_Maj'] = gps.latitude_list[0] if position else ''
+    loggingData['Lat_Min'] = gps.latitude_list[1] if position else ''
+    loggingData['Lon_Maj'] = gps.longitude_list[0] if position else ''
+    loggingData['Lon_Min'] = gps.longitude_list[1] if position else ''
 
-    # Start State Logic Control
 
-    """Main Menu Logic Start"""
-    if state == 0:
-        " Display Main Menu "
-        gc.collect()  # Run Garbage collection on memory
-        display.show(scrnMainMenu.getDisplayGroup())
-        enableGPS = False
-        state = 10
-        # -___-___-___-___-
+def pressed(source, kind):
+    """True when the input event taken this scan is a 'kind' event from the 'source' device"""
+    return event is not None and event[0] is source and event[1] == kind
 
-    elif state == 10:
-        " Monitor selection Wheel for inputs "
-        if selectWheel.up:  # Encoder CW
-            scrnMainMenu.navCCW()
-        elif selectWheel.dwn:  # Encoder CCW
-            scrnMainMenu.navCW()
-        if selectWheel.shortPress:  # Encoder Pressed
-            selectedMenu = scrnMainMenu.getSelected()
-            state = 20
-        # -___-___-___-___-
 
-    elif state == 20:
-        " Branch to the new selected screen state "
-        if selectedMenu == 'New Log':  # New Log
-            state = 1000
+def turned(source, accel=False):
+    """Signed detent count of the input event taken this scan, 0 unless it is a turn of the 'source' encoder.
+    accel returns the velocity accelerated step count used for editing values."""
+    if event is not None and event[0] is source and event[1] == DETENT:
+        return event[4] if accel else event[3]
+    return 0
 
-        elif selectedMenu == 'Continue Log':  # Continue Log
-            if sdcard is None:
-                scrnSplashScreen.setDisplayText('No SDCard Detected', Menu.YEL)
-                state_return = 0
-                state = 9000
-            else:
-                state = 1500
 
-        elif selectedMenu == 'No Log':  # No Log
-            state = 2000
+def sequence():
+    """ Main sequence logic, dispatches the handler of the active state from the state table """
+    global event
+    # Take one queued input per scan while monitoring input, nothing is lost while a state is busy or a scan runs long
+    event = inputEvents.get() if machine.takesInput else None
+    if boot.firstInput is None:
+        if event is not None:
+            boot.markInput()
+        if machine.takesInput:
+            boot.markInteractive()
+    machine()
 
-        elif selectedMenu == 'Config':  # Config
-            state = 3000
 
-        elif selectedMenu == 'Battery':  # Get Battery Info
-            state = 30
-        # -___-___-___-___-
+"""###### Main Menu Logic Start ######"""
+
 
-        if state == 30:
-            " Set to Display Battery Info on Splash Screen "
+def enterMainMenu():
+    " Display Main Menu "
+    global enableGPS
+    heap.requestCollect()  # Run Garbage collection on memory in the next idle slack
+    screens.show(scrnMainMenu)
+    enableGPS = False
 
-            #displaytext1 = "Battery Percent: {:.2f} %".format(battery_monitor.cell_percent)
-            #displaytext2 = "Battery Voltage: {:.2f} V".format(battery_monitor.cell_voltage)
-            #scrnSplashScreen.setDisplayText(displaytext1 + '\n' + displaytext2, Menu.YEL)
 
-            scrnSplashScreen.setDisplayText('Feature is currently unavailable...', Menu.YEL)
+def mainMenuNav():
+    " Monitor selection Wheel for inputs "
+    global selectedMenu
+    global configError
+    global state_return
+    if configError:  # Reported once, while the main menu is idle
+        scrnSplashScreen.setDisplayText(configError, Menu.YEL)
+        configError = ''
+        state_return = 0
+        return 9000
+    delta = turned(selectWheel)
+    if delta > 0:  # Encoder CW
+        scrnMainMenu.navCCW(delta)
+    elif delta < 0:  # Encoder CCW
+        scrnMainMenu.navCW(-delta)
+    if pressed(selectWheel, SHORT):  # Encoder Pressed
+        selectedMenu = scrnMainMenu.getSelected()
+        return 20
+
+
+def notReady(devices):
+    " Set the splash message for the first boot step in devices that is not ready, True when there is one "
+    global state_return
+    for name in devices:
+        if not boot.ready(name):
+            device = deviceNames[name]
+            if boot.failed(name):
+                scrnSplashScreen.setDisplayText(f'No {device} Detected', Menu.YEL)
+            else:
+                scrnSplashScreen.setDisplayText(f'{device} is still starting...', Menu.YEL)
             state_return = 0
-            state = 9000
-            # -___-___-___-___-
-        """###### Main Menu Logic END ######"""
+            return True
+    return False
 
-        """--------------------------------------"""
 
-        """###### New_Log Screen Logic Start ######"""
-    elif state == 1000:
-        " Set the display screen "
-        display.show(scrnNewLog.getDisplayGroup())
-        state = 1010
-        # -___-___-___-___-
+def mainMenuBranch():
+    " Branch to the new selected screen state "
+    global state_return
+    if selectedMenu == 'New Log':  # New Log
+        if notReady(('SD', 'RTC', 'ADC')):  # Logging needs the card, time stamps and the string pot
+            return 9000
+        return 1000
+
+    elif selectedMenu == 'Continue Log':  # Continue Log
+        if notReady(('SD', 'RTC', 'ADC')):
+            return 9000
+        return 1500
+
+    elif selectedMenu == 'Config':  # Config
+        if notReady(('ADC',)):  # Calibration polls the string pot
+            return 9000
+        return 3000
+
+    elif selectedMenu == 'Battery':  # Get Battery Info
+        " Set to Display Battery Info on Splash Screen "
+
+        #global battery_monitor
+        #if battery_monitor is None:
+        #    battery_monitor = timedImport('adafruit_max1704x', deferred=True).MAX17048(i2c)
+        #displaytext1 = "Battery Percent: {:.2f} %".format(battery_monitor.cell_percent)
+        #displaytext2 = "Battery Voltage: {:.2f} V".format(battery_monitor.cell_voltage)
+        #scrnSplashScreen.setDisplayText(displaytext1 + '\n' + displaytext2, Menu.YEL)
+
+        scrnSplashScreen.setDisplayText('Feature is currently unavailable...', Menu.YEL)
+        state_return = 0
+        return 9000
+
+    elif selectedMenu == 'Diagnostics':  # Scan timing
+        return 40
+
+
+def enterDiagnostics():
+    " Show the scan profile summary "
+    scrnDiagnostics.updateDisplay(profiler, selectWheel, heap)
+    screens.show(scrnDiagnostics)
+
+
+def diagnostics():
+    " Refresh the scan profile summary, press dumps the full profile and heap log over serial and exits "
+    if not tmrDiagnosticsUpdate.DN:
+        tmrDiagnosticsUpdate.PRE = 1.0
+        tmrDiagnosticsUpdate.EN = True
+    else:
+        tmrDiagnosticsUpdate.EN = False
+        scrnDiagnostics.updateDisplay(profiler, selectWheel, heap)
+    if pressed(selectWheel, LONG):
+        profiler.enabled = not profiler.enabled
+        heap.probe = profiler.enabled  # Largest free block is probed in the idle slack after each state change
+        scrnDiagnostics.updateDisplay(profiler, selectWheel, heap)
+    if pressed(selectWheel, SHORT):
+        if profiler.enabled:
+            profiler.dump()
+        heap.dump()
+        print(screens)
+        print('\n'.join(boot.report() + importReport()))
+        return 0
 
-    elif state == 1010:
-        " Monitor selection Wheel for inputs "
-        if selectWheel.up:  # Encoder CW
-            scrnNewLog.navCW()
-        elif selectWheel.dwn:  # Encoder CCW
-            scrnNewLog.navCCW()
-        if selectWheel.shortPress:
-            item = scrnNewLog.getNavItem()
-            if item == 'Esc':  # Escape the screen
-                state = 0
-            elif item == '<-Bcksp':  # Backspace for file string
-                scrnNewLog.subtractChar()
-            elif item == 'Save':  # Save the file
-                newFileName = scrnNewLog.getFileName()
-                state = 1200
-            elif item == 'Ins':  # Quick Insert Strings
-                state = 1030
-            else:  # character edit
-                state = 1020
-        # -___-___-___-___-
 
-    elif state == 1020:
-        """ Set the screen to edit mode """
-        scrnNewLog.setEdit(True)
-        state = 1100
-        # -___-___-___-___-
+"""###### Main Menu Logic END ######"""
 
-    elif state == 1030:
-        """ Display the menu for quick string inserts """
-        display.show(scrnStrInsert.getDisplayGroup())
-        state = 1040
-        # -___-___-___-___-
+"""--------------------------------------"""
 
-    elif state == 1040:
-        """ Monitor the encoder wheel inputs for navigation """
-        if selectWheel.up:  # Encoder CCW
-            scrnStrInsert.navCCW()
-        elif selectWheel.dwn:  # Encoder CW
-            scrnStrInsert.navCW()
-        if selectWheel.shortPress:  # Encoder Pressed
-            scrnNewLog.addStr(scrnStrInsert.getSelected())
-            state = 1000
-
-    elif state == 1100:
-        """ Monitor the encoder wheel inputs for character selection """
-        if selectWheel.up:  # Encoder CW
-            scrnNewLog.editCW()
-        elif selectWheel.dwn:  # Encoder CCW
-            scrnNewLog.editCCW()
-        if selectWheel.shortPress:
-            state = 1120
-        if selectWheel.longPress:
-            state = 1110
-        # -___-___-___-___-
+"""###### New_Log Screen Logic Start ######"""
 
-    elif state == 1110:
-        """ Reset the screen out of edit mode """
-        scrnNewLog.setEdit(False)
-        state = 1010
-        # -___-___-___-___-
 
-    elif state == 1120:
-        """ Add selected character to the string"""
-        scrnNewLog.addChar()
-        state = 1100
-        # -___-___-___-___-
+def enterNewLog():
+    " Set the display screen "
+    global scrnNewLog
+    if scrnNewLog is None:
+        scrnNewLog = timedImport('NewLogScreen', deferred=True).NewLog('New Log')
+    screens.show(scrnNewLog)
 
-    elif state == 1200:
-        """ Save selected, check all for name interference"""
-        files = os.listdir("/sd")
-        state = 1300
-        for file in files:
-            if file == newFileName:  # check if filename exists
-                scrnSplashScreen.setDisplayText('Error: File Name Already Exists...')  # existing file found
-                state_return = 1000
-                state = 9000
-                break
-        # -___-___-___-___-
 
-    elif state == 1300:
-        """ Create new .txt file with proper headers for .csv interpretation """
-        if logger.CreateNewFile(newFileName):  # Returns True if successful
-            state = 4000
-        else:
-            scrnSplashScreen.setDisplayText('Failed to create ')  # existing file found
+def newLogNav():
+    " Monitor selection Wheel for inputs "
+    global newFileName
+    delta = turned(selectWheel)
+    if delta > 0:  # Encoder CW
+        scrnNewLog.navCW(delta)
+    elif delta < 0:  # Encoder CCW
+        scrnNewLog.navCCW(-delta)
+    if pressed(selectWheel, SHORT):
+        item = scrnNewLog.getNavItem()
+        if item == 'Esc':  # Escape the screen
+            return 0
+        elif item == '<-Bcksp':  # Backspace for file string
+            scrnNewLog.subtractChar()
+        elif item == 'Save':  # Save the file
+            newFileName = scrnNewLog.getFileName()
+            return 1200
+        elif item == 'Ins':  # Quick Insert Strings
+            return 1030
+        else:  # character edit
+            return 1020
+
+
+def newLogSetEdit():
+    """ Set the screen to edit mode """
+    scrnNewLog.setEdit(True)
+    return 1100
+
+
+def enterStrInsert():
+    """ Display the menu for quick string inserts """
+    global scrnStrInsert
+    if scrnStrInsert is None:
+        scrnStrInsert = MenuScreen('String Insert', quickStrings)
+    screens.show(scrnStrInsert)
+
+
+def strInsertNav():
+    """ Monitor the encoder wheel inputs for navigation """
+    delta = turned(selectWheel)
+    if delta > 0:  # Encoder CCW
+        scrnStrInsert.navCCW(delta)
+    elif delta < 0:  # Encoder CW
+        scrnStrInsert.navCW(-delta)
+    if pressed(selectWheel, SHORT):  # Encoder Pressed
+        scrnNewLog.addStr(scrnStrInsert.getSelected())
+        return 1000
+
+
+def newLogEdit():
+    """ Monitor the encoder wheel inputs for character selection """
+    nextState = None
+    delta = turned(selectWheel, accel=True)
+    if delta > 0:  # Encoder CW
+        scrnNewLog.editCW(delta)
+    elif delta < 0:  # Encoder CCW
+        scrnNewLog.editCCW(-delta)
+    if pressed(selectWheel, SHORT):
+        nextState = 1120
+    if pressed(selectWheel, LONG):
+        nextState = 1110
+    return nextState
+
+
+def newLogEditDone():
+    """ Reset the screen out of edit mode """
+    scrnNewLog.setEdit(False)
+    return 1010
+
+
+def newLogAddChar():
+    """ Add selected character to the string"""
+    scrnNewLog.addChar()
+    return 1100
+
+
+def newLogCheckName():
+    """ Save selected, check all for name interference"""
+    global state_return
+    files = os.listdir("/sd")
+    for file in files:
+        if file == newFileName:  # check if filename exists
+            scrnSplashScreen.setDisplayText('Error: File Name Already Exists...')  # existing file found
             state_return = 1000
-            state = 9000
-        # -___-___-___-___-
+            return 9000
+    return 1300
 
-        """###### New_Log Screen Logic End ######"""
 
-        """--------------------------------------"""
+def newLogCreate():
+    """ Create new .txt file with proper headers for .csv interpretation """
+    global state_return
+    if logger.CreateNewFile(newFileName):  # Returns True if successful
+        return 4000
+    scrnSplashScreen.setDisplayText('Failed to create ')  # existing file found
+    state_return = 1000
+    return 9000
 
-        """###### Continue_Log Screen Start ######"""
-    elif state == 1500:
-        "Collect list of .txt files on the SD card for display"
-        dir = os.listdir('/sd')
-        dir = list(filter(lambda i: i.endswith('.txt'), dir))  # filter out files not ending '.txt'
-        scrnDirList = MenuScreen('Directory List', dir)
-        display.show(scrnDirList.getDisplayGroup())
-        state = 1510
-        # -___-___-___-___-
 
-    elif state == 1510:
-        "Monitor Navigation Inputs"
-        if selectWheel.up:  # Encoder CCW
-            scrnDirList.navCCW()
-        elif selectWheel.dwn:  # Encoder CW
-            scrnDirList.navCW()
-        if selectWheel.shortPress:  # Encoder Pressed
-            selectedFile = scrnDirList.getSelected()
-            state = 1520
-        elif selectWheel.longPress:
-            state = 0
-        # -___-___-___-___-
+"""###### New_Log Screen Logic End ######"""
 
-    elif state == 1520:
-        logger.fileName = selectedFile
-        if logger.fileName == selectedFile:
-            state_return = 4000
-            state = 10000
-        else:
-            scrnSplashScreen.setDisplayText('Error occurred attempting to change the logger data...')
-            state_return = 0
-            state = 9000
-        # -___-___-___-___-
+"""--------------------------------------"""
 
-        """###### Continue_Log Screen END ######"""
+"""###### Continue_Log Screen Start ######"""
 
-        """--------------------------------------"""
 
-        """###### No_Log Screen Start ######"""
-        """REMOVED """
-        """
+def enterDirList():
+    "Collect list of .txt files on the SD card for display"
+    global scrnDirList
+    dir = os.listdir('/sd')
+    dir = list(filter(lambda i: i.endswith('.txt'), dir))  # filter out files not ending '.txt'
+    scrnDirList = MenuScreen('Directory List', dir)
+    screens.show(scrnDirList)
+
+
+def dirListNav():
+    "Monitor Navigation Inputs"
+    global selectedFile
+    delta = turned(selectWheel)
+    if delta > 0:  # Encoder CCW
+        scrnDirList.navCCW(delta)
+    elif delta < 0:  # Encoder CW
+        scrnDirList.navCW(-delta)
+    if pressed(selectWheel, SHORT):  # Encoder Pressed
+        selectedFile = scrnDirList.getSelected()
+        return 1520
+    elif pressed(selectWheel, LONG):
+        return 0
+
+
+def continueLogOpen():
+    global state_return
+    logger.fileName = selectedFile
+    if logger.fileName == selectedFile:
+        return 4000
+    scrnSplashScreen.setDisplayText('Error occurred attempting to change the logger data...')
+    state_return = 0
+    return 9000
+
+
+"""###### Continue_Log Screen END ######"""
+
+"""--------------------------------------"""
+
+"""###### No_Log Screen Start ######"""
+"""REMOVED
     elif state == 2000:
-        display.show(scrnRuntime.getDisplayGroup())
+        screens.show(scrnRuntime)
         gc.collect()  # Run Garbage collection on memory
         state = 2010
         # -___-___-___-___-
@@ -491,7 +730,7 @@ def sequence():
     elif state == 2040:
         " Bring up GPS Details Screen"
         gc.collect()
-        display.show(scrnRuntime.getDisplayGroup())
+        screens.show(scrnRuntime)
         state = 2050
         # -___-___-___-___-
 
@@ -505,260 +744,379 @@ def sequence():
         scrnRuntime.setEdit(False)
         state = 2010
         # -___-___-___-___-
-    """
-        """###### No_Log Screen END ######"""
+"""
+"""###### No_Log Screen END ######"""
+
+"""--------------------------------------"""
+
+"""###### Configuration Screen Start ######"""
+
+
+def enterConfig():
+    " Set the display screen "
+    global scrnConfig
+    if scrnConfig is None:
+        scrnConfig = timedImport('ConfigScreen', deferred=True).Config('Config', jsonConfig)
+    scrnConfig.config = jsonConfig  # Edits left by a cancel are reset
+    screens.show(scrnConfig)
+    heap.requestCollect()  # Run Garbage collection on memory in the next idle slack
+
+
+def configNav():
+    " Monitor the encoder wheel inputs for navigation "
+    nextState = None
+    delta = turned(selectWheel)
+    if delta > 0:  # Encoder CW
+        scrnConfig.navCW(delta)
+    elif delta < 0:  # Encoder CCW
+        scrnConfig.navCCW(-delta)
+    if pressed(selectWheel, SHORT):
+        if scrnConfig.getSelected() == 'Cancel':
+            nextState = 0
+        else:
+            nextState = 3020
+    if pressed(selectWheel, LONG):
+        nextState = 3200
+    return nextState
 
-        """--------------------------------------"""
 
-        """###### Configuration Screen Start ######"""
-    elif state == 3000:
-        " Set the display screen "
-        scrnConfig.config = jsonConfig
-        display.show(scrnConfig.getDisplayGroup())
-        gc.collect()  # Run Garbage collection on memory
-        state = 3010
-        # -___-___-___-___-
+def configSetEdit():
+    " Set the menu screen to highlight selection "
+    scrnConfig.setEdit(True)
+    return 3030
 
-    elif state == 3010:
-        " Monitor the encoder wheel inputs for navigation "
-        if selectWheel.up:  # Encoder CW
-            scrnConfig.navCW()
-        elif selectWheel.dwn:  # Encoder CCW
-            scrnConfig.navCCW()
-        if selectWheel.shortPress:
-            if scrnConfig.getSelected() == 'Cancel':
-                state = 0
-            else:
-                state = 3020
-        if selectWheel.longPress:
-            state = 3200
-        # -___-___-___-___-
 
-    elif state == 3020:
-        " Set the menu screen to highlight selection "
-        scrnConfig.setEdit(True)
-        state = 3030
-        # -___-___-___-___-
+def configEdit():
+    " Monitor the encoder wheel inputs for editing values "
+    nextState = None
+    delta = turned(selectWheel, accel=True)
+    if delta > 0:  # Encoder CW
+        scrnConfig.editCW(delta)
+    elif delta < 0:  # Encoder CCW
+        scrnConfig.editCCW(-delta)
+    if pressed(selectWheel, SHORT):
+        nextState = 3100
+    if pressed(selectWheel, LONG):
+        nextState = 3040
+    return nextState
 
-    elif state == 3030:
-        " Monitor the encoder wheel inputs for editing values "
-        if selectWheel.up:  # Encoder CW
-            scrnConfig.editCW()
-        elif selectWheel.dwn:  # Encoder CCW
-            scrnConfig.editCCW()
-        if selectWheel.shortPress:
-            state = 3100
-        if selectWheel.longPress:
-            state = 3040
-        # -___-___-___-___-
 
-    elif state == 3040:
-        " If selected items allows, record value from reading"
-        scrnConfig.recordVal(stringPot.value)
-        state = 3100
+def configRecord():
+    " If selected items allows, record value from reading"
+    scrnConfig.recordVal(stringPot.value)
+    return 3100
 
-    elif state == 3100:
-        " Set update Done "
-        scrnConfig.setEdit(False)
-        state = 3010
-        # -___-___-___-___-
 
-    elif state == 3200:
-        " Update JSON Config file "
-        jsonConfig = scrnConfig._config
-        state = 3300
-        # -___-___-___-___-
+def configEditDone():
+    " Set update Done "
+    scrnConfig.setEdit(False)
+    return 3010
 
-    elif state == 3300:
-        " Write new values to json file in SD card "
-        try:
-            with open('/sd/config.json', 'w') as file:
-                json.dump(jsonConfig, file)
-            state = 3310
-        except OSError:
-            state_return = 0
-            scrnSplashScreen.setDisplayText('Unable to write out new params to SD card.')
-            state = 9000
-        # -___-___-___-___-
 
-    elif state == 3310:
-        " update the scaling block "
-        scaling.setup = jsonConfig
-        state = 0
+def configUpdate():
+    " Update JSON Config file "
+    global jsonConfig
+    jsonConfig = dict(scrnConfig.config)  # Edits only reach the loaded config on save
+    scaling.useFit(scrnConfig.fit)  # Points were accumulated as they were captured, only the solve is left
+    return 3300
 
-    elif state == 4000:
-        """ Open up Running Log Display """
-        scrnRuntime.items = {'File': logger.fileName, 'Entry': logger.entryCount}  # Update FileName
-        display.show(scrnRuntime.getDisplayGroup())
-        enableGPS = True
-        gc.collect()
-        state = 4010
-        # -___-___-___-___-
 
-    elif state == 4010:
-        if not tmrGPSTimeout.DN:
-            "Cyclically update displayed Info"
-            if loggingData['Lat'] != scrnRuntime.items['Lat'] or loggingData['Lon'] != scrnRuntime.items['Lon']:
-                scrnRuntime.items = {'GPS': gps.fix_stat}
-            " Monitor the encoder wheel inputs for navigation "
-            " Monitor Record Buttons for info grabbing"
-            if selectWheel.up:  # Encoder CW
-                scrnRuntime.navCW()
-            elif selectWheel.dwn:  # Encoder CCW
-                scrnRuntime.navCCW()
-            if selectWheel.shortPress:
-                if scrnRuntime.getSelected() == 'GPS':
-                    state = 4040  # Go to GPS Detail Screen
-                else:
-                    state = 4020  # Go to Edit Mode
-            if selectWheel.longPress:
-                state = 0
-            if btnGreen.shortPress:
-                state = 4200
-            elif btnRed.longPress:
-                state = 4300
-        else:
-            gps.fix_stat = 0
-            state = 10000
-        # -___-___-___-___-
+def configWrite():
+    " Write new values to json file in SD card "
+    global state_return
+    import json  # Loaded by the SD boot step
+    try:
+        with open('/sd/config.json', 'w') as file:
+            json.dump(jsonConfig, file)
+        return 3310
+    except OSError:
+        state_return = 0
+        scrnSplashScreen.setDisplayText('Unable to write out new params to SD card.')
+        return 9000
 
-    elif state == 4020:
-        " Set the menu screen to highlight selection "
-        scrnRuntime.setEdit(True)
-        state = 4030
-        # -___-___-___-___-
 
-    elif state == 4030:
-        " Monitor the encoder wheel inputs for editing values "
-        if selectWheel.up:  # Encoder CW
-            scrnRuntime.editCW()
-        elif selectWheel.dwn:  # Encoder CCW
-            scrnRuntime.editCCW()
-        if selectWheel.shortPress:
-            state = 4100
-        if selectWheel.longPress:
-            pass
-        # -___-___-___-___-
+def configApply():
+    " update the scaling block "
+    global state_return
+    scaling.setup = jsonConfig
+    if scaling.residuals is not None:  # Report the quality of a polynomial calibration fit
+        scrnSplashScreen.setDisplayText(f'Fit RMS: {scaling.residuals[0]:.3f} Max: {scaling.residuals[1]:.3f}',
+                                        Menu.YEL)
+        state_return = 0
+        return 9000
+    return 0
 
-    elif state == 4040:
-        "Bring up Runtime screen"
-        gc.collect()
-        display.show(scrnGPSDetails.getDisplayGroup())
-        state = 4050
-        # -___-___-___-___-
 
-    elif state == 4050:
-        "Cyclically Update display info, monitor for input"
-        if not tmrGPSDetailUpdate.DN:
-            tmrGPSDetailUpdate.PRE = 1.0
-            tmrGPSDetailUpdate.EN = True
-        else:
-            tmrGPSDetailUpdate.EN = False
-            scrnGPSDetails.updateDisplay(gps)
-        if selectWheel.shortPress:
-            state = 4000
-        if selectWheel.longPress:
-            state = 4000
-        # -___-___-___-___-
+"""###### Configuration Screen END ######"""
 
-    elif state == 4100:
-        " Set update Done "
-        scrnRuntime.setEdit(False)
-        loggingData['Rng'] = scrnRuntime.items['Rng']
-        loggingData['Row'] = scrnRuntime.items['Row']
-        state = 4010
-        # -___-___-___-___-
+"""--------------------------------------"""
 
-    elif state == 4200:
-        " Sample the current entry "
-        if logger.addEntry(loggingData):
-            scrnRuntime.items = {'Entry': logger.entryCount}
-            state = 4210
+"""###### Runtime Screen Start ######"""
+
+
+def enterRuntime():
+    """ Open up Running Log Display """
+    global enableGPS
+    scrnRuntime.items = {'File': logger.fileName, 'Entry': logger.entryCount}  # Update FileName
+    screens.show(scrnRuntime)
+    enableGPS = True
+    heap.requestCollect()
+
+
+def gpsStatus():
+    " GPS item of the Runtime screen, the fix status once the GPS boot step has found the receiver "
+    if boot.ready('GPS'):
+        return gps.fix_stat
+    return 'NO GPS' if boot.failed('GPS') else 'SEARCH'
+
+
+def runtimeNav():
+    nextState = None
+    "Look for the GPS again in the background when it goes quiet, or when data returns after it was not found"
+    if tmrGPSTimeout.DN and boot.ready('GPS'):
+        gps.fix_stat = 0
+        boot.retry('GPS')
+    elif not tmrGPSTimeout.DN and boot.failed('GPS'):
+        boot.retry('GPS')
+    "Cyclically update displayed Info, only when the GPS status changes"
+    status = gpsStatus()
+    if status != scrnRuntime.items['GPS']:
+        scrnRuntime.items = {'GPS': status}
+    " Monitor the encoder wheel inputs for navigation "
+    " Monitor Record Buttons for info grabbing"
+    delta = turned(selectWheel)
+    if delta > 0:  # Encoder CW
+        scrnRuntime.navCW(delta)
+    elif delta < 0:  # Encoder CCW
+        scrnRuntime.navCCW(-delta)
+    if pressed(selectWheel, SHORT):
+        if scrnRuntime.getSelected() == 'GPS':
+            nextState = 4040  # Go to GPS Detail Screen
+        elif scrnRuntime.getSelected() == 'Auto':
+            nextState = 4060  # Toggle auto capture
         else:
-            scrnSplashScreen.setDisplayText('Error Occurred During Write to Log')
-            state_return = 4000
-            state = 9000
-        # -___-___-___-___-
+            nextState = 4020  # Go to Edit Mode
+    if pressed(selectWheel, LONG):
+        autoCapture.enabled = False
+        nextState = 0
+    if pressed(btnGreen, SHORT) or autoCapture.trigger:
+        nextState = 4200
+    elif pressed(btnRed, LONG):
+        nextState = 4300
+    return nextState
+
+
+def runtimeSetEdit():
+    " Set the menu screen to highlight selection "
+    scrnRuntime.setEdit(True)
+    return 4030
+
+
+def runtimeEdit():
+    " Monitor the encoder wheel inputs for editing values "
+    delta = turned(selectWheel, accel=True)
+    if delta > 0:  # Encoder CW
+        scrnRuntime.editCW(delta)
+    elif delta < 0:  # Encoder CCW
+        scrnRuntime.editCCW(-delta)
+    if pressed(selectWheel, SHORT):
+        return 4100
+
+
+def enterGPSDetails():
+    "Bring up Runtime screen"
+    global scrnGPSDetails
+    heap.requestCollect()
+    if scrnGPSDetails is None:
+        scrnGPSDetails = timedImport('GPSScreen', deferred=True).GPSDetails('GPS Details')
+    screens.show(scrnGPSDetails)
+
+
+def gpsDetails():
+    "Cyclically Update display info, monitor for input"
+    if not tmrGPSDetailUpdate.DN:
+        tmrGPSDetailUpdate.PRE = 1.0
+        tmrGPSDetailUpdate.EN = True
+    else:
+        tmrGPSDetailUpdate.EN = False
+        scrnGPSDetails.updateDisplay(gps)
+    if pressed(selectWheel, SHORT) or pressed(selectWheel, LONG):
+        return 4000
 
-    elif state == 4210:
-        " Short tone for confirmation "
-        beeper.beep(duration=0.10)  # beep...
-        state = 4010
-        # -___-___-___-___-
 
-    elif state == 4300:
-        logger.removeLastEntry()
-        state = 4310
+def runtimeToggleAuto():
+    " Toggle auto capture of settled readings "
+    autoCapture.enabled = not autoCapture.enabled
+    scrnRuntime.items = {'Auto': 'On' if autoCapture.enabled else 'Off'}
+    return 4010
 
-    elif state == 4310:
-        " Long tone for confirmation "
-        beeper.beep(duration=0.3)  # beeeeeep...
-        state = 4010
-        # -___-___-___-___-
 
-    elif state == 9000:
-        " Show Splash screen and message"
-        display.show(scrnSplashScreen.getDisplayGroup())
-        state = 9010
-        # -___-___-___-___-
+def runtimeEditDone():
+    " Set update Done "
+    scrnRuntime.setEdit(False)
+    loggingData['Rng'] = scrnRuntime.items['Rng']
+    loggingData['Row'] = scrnRuntime.items['Row']
+    return 4010
 
-    elif state == 9010:
-        " Monitor common inputs to move to next screen"
-        if selectWheel.shortPress or selectWheel.longPress:
-            state = state_return
-        if btnGreen.shortPress or btnRed.shortPress:
-            state = state_return
-        # -___-___-___-___-
 
-    elif state == 10000:
-        "Start into this state from a restart, check GPS and other inputs to ensure function"
-        print(f"Checking for GPS Device...")
-        enableGPS = True
-        gps_sentenceCount = gps.parsed_sentences
-        display.show(scrnSplashNoAck.getDisplayGroup())
-        state = 10010
-        # -___-___-___-___-
+def burstStart():
+    " Start a burst of samples for the current entry, the beep confirms the capture straight away "
+    # The burst is over well within the operator's reaction to the beep, the entry is written once it completes
+    burstCapture.start()
+    beeper.beep(duration=0.10)  # beep...
+    return 4202
 
-    elif state == 10010:
-        "Wait for serial log data to update"
-        tmrStandby.PRE = 6
-        tmrStandby.EN = True  # Hold Timer True to Time
-        """Check for GPS signals before the Timer1.DN turns on"""
-        printInline(f'Checking for GPS {tmrStandby.ACC:.2f}s/{tmrStandby.PRE}s')
-        scrnSplashNoAck.setDisplayText(f'Checking for GPS {tmrStandby.ACC:.2f}s/{tmrStandby.PRE}s')
-
-        if tmrStandby.DN:
-            """No GPS detected, Disable the scanning to avoid overhead and set flag"""
-            print('\nNo GPS packets detected, setting GPS state to OFF...')
-            enableGPS = False
-            scrnSplashScreen.setDisplayText('Warning! No GPS signals detected.')
-            state_return = 0
-            state = 9000
-        if gps.parsed_sentences != gps_sentenceCount:
-            """check to see if GPS is parsing sentences, if so maintain the GPS enabled"""
-            enableGPS = True
-            state = state_return
-        # -___-___-___-___-
+
+def burstWait():
+    " Wait for the burst, log its median height and spread "
+    if burstCapture.done:
+        loggingData['Spread'] = ''  # Never carry the spread of the previous entry over
+        try:
+            if burstCapture.count:
+                loggingData['Height'] = scaling.lookupText(burstCapture.median)
+                spread = abs(scaling.lookup(burstCapture.max) - scaling.lookup(burstCapture.min))
+                loggingData['Spread'] = f'{spread:.2f}'
+            else:  # Timed out without a new sample, log the filtered reading
+                loggingData['Height'] = stringPot.text
+        except ValueError:  # Scaling has no valid calibration
+            loggingData['Height'] = ''
+        return 4205
+
+
+def logEntry():
+    " Sample the current entry "
+    global state_return
+    stampEntry()
+    if logger.addEntry(loggingData):
+        scrnRuntime.items = {'Entry': logger.entryCount}
+        return 4010
+    scrnSplashScreen.setDisplayText('Error Occurred During Write to Log')
+    state_return = 4000
+    return 9000
+
+
+def removeEntry():
+    logger.removeLastEntry()
+    return 4310
+
+
+def removeBeep():
+    " Long tone for confirmation "
+    beeper.beep(duration=0.3)  # beeeeeep...
+    return 4010
+
+
+"""###### Runtime Screen END ######"""
+
+"""--------------------------------------"""
+
+"""###### Splash Start ######"""
+
+
+def enterSplash():
+    " Show Splash screen and message"
+    screens.show(scrnSplashScreen)
+
+
+def splashAck():
+    " Monitor common inputs to move to next screen"
+    if pressed(selectWheel, SHORT) or pressed(selectWheel, LONG):
+        return state_return
+    if pressed(btnGreen, SHORT) or pressed(btnRed, SHORT):
+        return state_return
+
+
+"""###### Splash END ######"""
+
+
+"""------State Table------"""
+# state, handler returning the next state or None to stay, entry/exit hooks, and whether the state takes input events
+machine = StateMachine(initial=state, trace=False)
+machine.add(0, lambda: 10, onEntry=enterMainMenu)
+machine.add(10, mainMenuNav, takesInput=True)
+machine.add(20, mainMenuBranch)
+machine.add(40, lambda: 50, onEntry=enterDiagnostics)
+machine.add(50, diagnostics, takesInput=True)
+machine.add(1000, lambda: 1010, onEntry=enterNewLog)
+machine.add(1010, newLogNav, takesInput=True)
+machine.add(1020, newLogSetEdit)
+machine.add(1030, lambda: 1040, onEntry=enterStrInsert)
+machine.add(1040, strInsertNav, takesInput=True)
+machine.add(1100, newLogEdit, takesInput=True)
+machine.add(1110, newLogEditDone)
+machine.add(1120, newLogAddChar)
+machine.add(1200, newLogCheckName)
+machine.add(1300, newLogCreate)
+machine.add(1500, lambda: 1510, onEntry=enterDirList)
+machine.add(1510, dirListNav, takesInput=True)
+machine.add(1520, continueLogOpen)
+machine.add(3000, lambda: 3010, onEntry=enterConfig)
+machine.add(3010, configNav, takesInput=True)
+machine.add(3020, configSetEdit)
+machine.add(3030, configEdit, takesInput=True)
+machine.add(3040, configRecord)
+machine.add(3100, configEditDone)
+machine.add(3200, configUpdate)
+machine.add(3300, configWrite)
+machine.add(3310, configApply)
+machine.add(4000, lambda: 4010, onEntry=enterRuntime)
+machine.add(4010, runtimeNav, takesInput=True)
+machine.add(4020, runtimeSetEdit)
+machine.add(4030, runtimeEdit, takesInput=True)
+machine.add(4040, lambda: 4050, onEntry=enterGPSDetails)
+machine.add(4050, gpsDetails, takesInput=True)
+machine.add(4060, runtimeToggleAuto)
+machine.add(4100, runtimeEditDone)
+machine.add(4200, burstStart)
+machine.add(4202, burstWait)
+machine.add(4205, logEntry)
+machine.add(4300, removeEntry)
+machine.add(4310, removeBeep)
+machine.add(9000, lambda: 9010, onEntry=enterSplash)
+machine.add(9010, splashAck, takesInput=True)
+"""------"""
+
+
+"""------I2C Bus Scheduler------"""
+busScheduler = BusScheduler(budget=0.04)
+busScheduler.register('Encoder', pollEncoder, period=0.0, priority=0, budget=0.02)  # Boot steps add the others
+"""------"""
+
+"""------Scan Scheduler------"""
+scanScheduler = ScanScheduler(period=scanPeriod)
+scanScheduler.onIdle = heap.collect  # Garbage collection only runs in the slack left at the end of a scan
+scanScheduler.register('I2C', busScheduler, period=0.0, priority=0, budget=scanPeriod)
+scanScheduler.register('GPS', pollGPS, period=0.1, priority=1, budget=0.005)
+scanScheduler.register('Boot', boot, period=0.0, priority=2, budget=0.1)  # One device probe per scan until all are up
+scanScheduler.register('Table', scaling.buildTable, period=0.0, priority=2, budget=0.005)  # Returns once built
+"""------"""
 
 
 def main():
-    global state
     global SystemInitialized
-    global stringPot
-    global scrnRuntime
 
     while True:
-        laststate = state
+        laststate = machine.state
+        profiler.begin(laststate)  # Each profiler call returns straight away while profiling is off
+        heap.begin(laststate)
         """INPUT -- SEQUENCE -- OUTPUT"""
         inputs()
+        profiler.mark()
         if SystemInitialized:
             sequence()
+        profiler.mark()
         outputs()
+        profiler.mark()
         """INPUT -- SEQUENCE -- OUTPUT"""
+        profiler.end()
+        heap.end(machine.state)
+        scanScheduler.wait()  # Sleep out the rest of the scan period
 
-        if state != laststate or not SystemInitialized:
-            print(f'Main State: {state}')
+        if machine.state != laststate or not SystemInitialized:
+            print(f'Main State: {machine.state}')
             print(str(gc.mem_free()) + 'bytes')
+            if machine.state == 0:  # Scan utilization and bus time per device on every return to the main menu
+                print('\n'.join(scanScheduler.report() + busScheduler.report() + selectWheel.report()))
         SystemInitialized = True
 
 
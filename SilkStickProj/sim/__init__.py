@@ -0,0 +1,18 @@
+"""
+Host simulator for the Silk Stick
+Overview: Runs silk_stick.py unmodified under CPython with the board, its I2C devices, buttons, GPS UART, SD card and
+displays replaced by simulated devices on a virtual clock, faster than real time. Used to benchmark and regression
+test whole workflows off the device.
+
+    from sim import Simulator, sine
+    sim = Simulator(sdDir='/tmp/sd', adc={0: sine(1.5, 0.5, 10.0)})
+    sim.turn(1.0, -1)  # Scripted operator input
+    sim.press('encoder', 1.5)
+    sim.run(60.0)
+    print('\\n'.join(sim.summary()))
+
+Run the demo logging session from SilkStickProj with: python -m sim --help
+"""
+from .clock import VirtualClock, SimulationDone
+from .devices import constant, ramp, sine, steps, noisy, fromRaw, NmeaSynth, NmeaReplay
+from .hal import Simulator
@@ -0,0 +1,51 @@
+"""Demo logging session on the simulator: continue a log from the main menu and record an entry every few seconds"""
+import argparse
+import os
+import tempfile
+
+from . import Simulator, NmeaReplay, noisy, sine, fromRaw
+
+
+def demoSession(sim, interval=2.0, duration=60.0):
+    """Script the operator: Continue Log, pick the first file, then press green every interval seconds"""
+    sim.turn(1.0, -1)  # Main menu down to 'Continue Log'
+    sim.press('encoder', 1.5)
+    sim.press('encoder', 2.5)  # First log file, then the GPS check leads to the runtime screen
+    t = 10.0
+    while t < duration - 1.0:
+        sim.press('green', t)
+        t += interval
+
+
+def prepareSD(sdDir, fileName='demo.txt'):
+    path = os.path.join(sdDir, fileName)
+    if not os.path.exists(path):
+        with open(path, 'w') as file:
+            file.write('yyyymmdd,hhmmss,Row,Rng,Lat,Lon,Height,Lat_Maj,Lat_Min,Lon_Maj,Lon_Min,Spread,\n')
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m sim', description=__doc__)
+    parser.add_argument('--duration', type=float, default=60.0, help='virtual seconds to run')
+    parser.add_argument('--interval', type=float, default=2.0, help='seconds between logged entries')
+    parser.add_argument('--sd', help='host directory used as the SD card, a temporary one by default')
+    parser.add_argument('--nmea', help='NMEA log to replay instead of the synthetic GPS')
+    parser.add_argument('--verbose', action='store_true', help='show the application output')
+    args = parser.parse_args()
+
+    sdDir = args.sd or tempfile.mkdtemp(prefix='silkstick_sd_')
+    logPath = prepareSD(sdDir)
+    nmea = NmeaReplay.fromFile(args.nmea) if args.nmea else True
+    # String pot swinging slowly through its range with a little noise
+    sim = Simulator(sdDir=sdDir, nmea=nmea, quiet=not args.verbose,
+                    adc={0: noisy(sine(fromRaw(14000), fromRaw(8000), 20.0), 0.002)})
+    demoSession(sim, args.interval, args.duration)
+    sim.run(args.duration)
+    print('\n'.join(sim.summary()))
+    with open(logPath) as file:
+        print(f'Log {logPath}: {sum(1 for _ in file) - 1} entries')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""Allocation check of the steady state Runtime scan on the simulator.
+Creates a log and waits in Runtime with the GPS streaming and the string pot held, then traces every scan and exits
+with an error if any line of the application allocates.
+
+Each instruction of the application is traced and a rise in tracemalloc's traced memory is charged to its source
+line. Integers above 256 and floats are boxed by CPython but are immediate values on the board, so a rise of up to
+one boxed number (32 bytes) is ignored, as are for loop headers since MicroPython iterates range() and the builtin
+sequences without allocating an iterator. The simulated devices stand in for firmware and drivers, so only what the
+application keeps from a call into them is charged. Tuples, lists and dicts reused from CPython's free lists are not
+seen.
+
+    python -m sim.allocs --duration 10"""
+import argparse
+import collections
+import linecache
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from . import Simulator
+from .bench import createLog
+
+
+class AllocationTracer:
+    """Charges heap growth to the application source line executing when it happens, per scan"""
+    SCALAR = 32  # Bytes of a boxed int or float
+
+    def __init__(self, projectDir):
+        self.projectDir = projectDir
+        self.simDir = os.path.dirname(os.path.abspath(__file__))
+        self.lines = collections.Counter()  # (file, line): bytes allocated
+        self.hits = collections.Counter()  # (file, line): scans the line allocated in
+        self.scans = 0
+        self.allocatingScans = 0
+        self._scan = collections.Counter()  # (file, line): bytes allocated in the current scan
+        self._apps = {}  # File name: True for application source
+        self._loops = {}  # (file, line): True for a for loop header
+        self._where = None
+        self._last = 0
+        self._warm = False  # The scan the tracer starts in is only partly traced and not counted
+        self._trace = self.trace  # Bound methods kept, each lookup of self.trace would allocate a new one
+        self._device = self.device
+
+    def _isApp(self, filename):
+        app = self._apps.get(filename)
+        if app is None:
+            # Frozen and generated code have names like '<frozen runpy>' rather than paths
+            app = self._apps[filename] = os.path.isabs(filename) and filename.startswith(self.projectDir) and \
+                not filename.startswith(self.simDir)
+        return app
+
+    def _isLoop(self, where):
+        loop = self._loops.get(where)
+        if loop is None:
+            loop = self._loops[where] = linecache.getline(*where).lstrip().startswith('for ')
+        return loop
+
+    def trace(self, frame, event, arg):
+        if event == 'call':
+            if not self._isApp(frame.f_code.co_filename):
+                if frame.f_back is None or not self._isApp(frame.f_back.f_code.co_filename):
+                    return None
+                frame.f_trace_lines = False  # Only the return of a device model called by the application is seen
+                return self._device
+            frame.f_trace_opcodes = True
+        else:
+            grown = tracemalloc.get_traced_memory()[0] - self._last
+            if grown > self.SCALAR and self._where is not None and not self._isLoop(self._where):
+                self._scan[self._where] += grown
+            del grown
+        self._where = (frame.f_code.co_filename, frame.f_lineno)
+        self._last = tracemalloc.get_traced_memory()[0]  # Read last so the tracer's own objects are not charged
+        return self._trace
+
+    def device(self, frame, event, arg):
+        if event == 'return':
+            # The models' own objects stand in for firmware and drivers, only what the application keeps is charged
+            self._last = tracemalloc.get_traced_memory()[0]
+        return self._device
+
+    def start(self):
+        """Trace the application frames already running and every call from now on"""
+        frame = sys._getframe(1)
+        while frame is not None:
+            if self._isApp(frame.f_code.co_filename):
+                frame.f_trace = self._trace
+                frame.f_trace_opcodes = True
+            frame = frame.f_back
+        sys.settrace(self._trace)
+        self._last = tracemalloc.get_traced_memory()[0]
+
+    def stop(self):
+        sys.settrace(None)
+
+    def endScan(self):
+        if self._warm:
+            self._count()
+        self._warm = True
+        self._scan.clear()
+        self._where = None
+        self._last = tracemalloc.get_traced_memory()[0]
+
+    def _count(self):
+        self.scans += 1
+        if self._scan:
+            self.allocatingScans += 1
+            for where, size in self._scan.items():
+                self.lines[where] += size
+                self.hits[where] += 1
+
+    def report(self, top=10):
+        lines = [f'Scans traced: {self.scans}, scans allocating: {self.allocatingScans}']
+        if not self.scans:
+            return lines
+        for (filename, lineno), size in self.lines.most_common(top):
+            source = linecache.getline(filename, lineno).strip()
+            lines.append(f'  {os.path.basename(filename)}:{lineno} {size / self.scans:.0f} bytes/scan in '
+                         f'{self.hits[(filename, lineno)]} scans: {source}')
+        return lines
+
+
+class SteadyWindow:
+    """onScan hook starting the tracer once the Runtime screen has settled and ending a traced scan every cycle"""
+    RUNTIME = 4010
+    RATE = 0.02  # Virtual seconds per host second while tracing, keeps traced scans inside the scan period
+
+    def __init__(self, sim, tracer, start):
+        self.sim = sim
+        self.tracer = tracer
+        self.start = start  # Virtual time the window opens
+        self.active = False
+
+    def __call__(self):
+        if self.active:
+            if self.sim.state != self.RUNTIME:  # Left Runtime, the rest of the run is not steady state
+                self.tracer.stop()
+                self.sim.clock.rate = 1.0
+                self.active = False
+                return
+            self.tracer.endScan()
+        elif self.tracer.scans == 0 and self.sim.clock.monotonic() >= self.start and self.sim.state == self.RUNTIME:
+            self.active = True
+            self.sim.clock.rate = self.RATE  # Traced scans run far slower than on the host
+            self.tracer.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m sim.allocs', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=4.0, help='seconds of Runtime scans to trace')
+    parser.add_argument('--settle', type=float, default=5.0, help='seconds in Runtime before tracing starts')
+    args = parser.parse_args()
+
+    sim = Simulator(sdDir=tempfile.mkdtemp(prefix='silkstick_allocs_'))
+    start = createLog(sim) + args.settle
+    tracer = AllocationTracer(sim.projectDir)
+    window = SteadyWindow(sim, tracer, start)
+    sim.onScan.append(window)
+
+    tracemalloc.start()
+    try:
+        sim.run(start + args.duration)
+    finally:
+        tracer.stop()
+        tracemalloc.stop()
+
+    print('\n'.join(tracer.report()))
+    if tracer.scans == 0:
+        print('FAIL: Runtime was never reached')
+        sys.exit(1)
+    if tracer.allocatingScans:
+        print('FAIL: the steady state Runtime scan allocates')
+        sys.exit(1)
+    print('OK: no allocations in the steady state Runtime scan')
+
+
+if __name__ == '__main__':
+    main()
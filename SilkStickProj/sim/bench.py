@@ -0,0 +1,178 @@
+"""End to end logging throughput benchmark on the simulator.
+Creates a log through the New Log screen, enters Runtime and records an entry on every green press with a red long
+press removing one every few entries, while the GPS replays NMEA. Reports entries per hour, scan time percentiles,
+green press to beep latency, SD write latency and peak heap.
+
+Scan and SD timings are host CPython timings plus the modelled SD latency, compare them between runs on the same
+machine rather than against the device.
+
+    python -m sim.bench --presses 2000"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from . import Simulator, NmeaReplay, NmeaSynth, noisy, sine, fromRaw
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    ordered = sorted(samples)
+    if not ordered:
+        return {point: 0.0 for point in points + (100,)}
+    result = {point: ordered[min(len(ordered) - 1, len(ordered) * point // 100)] for point in points}
+    result[100] = ordered[-1]
+    return result
+
+
+def msText(values):
+    return ', '.join(f'p{point} {value * 1000:.2f}ms' if point < 100 else f'max {value * 1000:.2f}ms'
+                     for point, value in values.items())
+
+
+class ScanTimer:
+    """onScan hook timing each cycle's busy time in host seconds, from the end of one scanScheduler.wait() to the
+    sleep in the next, or to the end of that wait when the scan overran and did not sleep. wait() is wrapped once the
+    application is running so an overrun is recorded on its own rather than merged into the following scan."""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.samples = []
+        self._last = None  # Host time the current scan started
+        self._slept = False
+        self._installed = False
+
+    def _record(self):
+        if self._last is not None:
+            self.samples.append(time.perf_counter() - self._last)
+            self._last = None
+
+    def _timed(self, wait):
+        def call():
+            self._slept = False
+            wait()
+            if not self._slept:  # Overran, no sleep marked the end of the scan
+                self._record()
+            self._last = time.perf_counter()
+        return call
+
+    def __call__(self):
+        self._slept = True
+        self._record()
+        scheduler = self.sim.app.get('scanScheduler')
+        if not self._installed and scheduler is not None:
+            scheduler.wait = self._timed(scheduler.wait)
+            self._installed = True
+
+
+class WriteTimer:
+    """Wraps the logger's SD write methods once the application is running, timing each call on the virtual clock"""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.samples = []
+        self._installed = False
+
+    def _timed(self, func):
+        def call(*args, **kwargs):
+            start = self.sim.clock.monotonic()
+            result = func(*args, **kwargs)
+            self.samples.append(self.sim.clock.monotonic() - start)
+            return result
+        return call
+
+    def __call__(self):
+        logger = self.sim.app.get('logger')
+        if not self._installed and logger is not None:
+            logger.addEntry = self._timed(logger.addEntry)
+            logger.removeLastEntry = self._timed(logger.removeLastEntry)
+            self._installed = True
+
+
+def createLog(sim, t=1.0):
+    """Script New Log -> Ins 'file' -> Save, which opens the Runtime screen on file.txt. Returns the script end time"""
+    sim.press('encoder', t)  # 'New Log' is selected at boot
+    sim.turn(t + 1.0, 3)  # Character edit -> Ins
+    sim.press('encoder', t + 2.0)  # Quick insert menu
+    sim.press('encoder', t + 3.0)  # Insert 'file'
+    sim.turn(t + 4.0, -1)  # Ins -> Save
+    sim.press('encoder', t + 5.0)
+    return t + 6.0
+
+
+def schedulePresses(sim, start, presses, interval, redEvery):
+    """Green presses every interval seconds with every redEvery'th press a red long press. Returns green press times"""
+    greens = []
+    t = start
+    for i in range(presses):
+        if redEvery and i % redEvery == redEvery - 1:
+            sim.press('red', t, duration=1.0)  # Long press removes the last entry
+        else:
+            sim.press('green', t)
+            greens.append(t)
+        t += interval
+    return greens
+
+
+def beepLatency(greens, beeps):
+    """Seconds from each green press to the first beep starting after it"""
+    latencies = []
+    starts = [start for start, duration in beeps]
+    j = 0
+    for press in greens:
+        while j < len(starts) and starts[j] < press:
+            j += 1
+        if j < len(starts):
+            latencies.append(starts[j] - press)
+            j += 1
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m sim.bench', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--presses', type=int, default=2000, help='button presses after entering Runtime')
+    parser.add_argument('--interval', type=float, default=1.5, help='seconds between presses')
+    parser.add_argument('--red-every', type=int, default=10, help='every Nth press is a red long press, 0 for none')
+    parser.add_argument('--sd-latency', type=float, default=0.005, help='modelled seconds per SD file write')
+    parser.add_argument('--nmea', help='NMEA log to replay, synthetic sentences are recorded and replayed otherwise')
+    parser.add_argument('--sd', help='host directory used as the SD card, a temporary one by default')
+    args = parser.parse_args()
+
+    sdDir = args.sd or tempfile.mkdtemp(prefix='silkstick_bench_')
+    sim = Simulator(sdDir=sdDir, sdWriteTime=args.sd_latency,
+                    adc={0: noisy(sine(fromRaw(14000), fromRaw(8000), 30.0), 0.002)})
+    if args.nmea:
+        sim.uart.source = NmeaReplay.fromFile(args.nmea)
+    else:
+        synth = NmeaSynth(sim.rtc)
+        lines = b''.join(synth.epoch(float(t)) for t in range(600)).decode().splitlines()
+        sim.uart.source = NmeaReplay(lines, perEpoch=2)
+
+    start = createLog(sim)
+    greens = schedulePresses(sim, start + 2.0, args.presses, args.interval, args.red_every)
+    duration = start + 2.0 + args.presses * args.interval + 2.0
+    scans = ScanTimer(sim)
+    writes = WriteTimer(sim)
+    sim.onScan.append(scans)
+    sim.onScan.append(writes)
+
+    tracemalloc.start()
+    sim.run(duration)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    logger = sim.app.get('logger')
+    entries = logger.entryCount if logger is not None else 0
+    recorded = len([beep for beep in sim.beeps if beep[1] < 0.2])  # Short beeps confirm an entry
+    hours = (duration - start) / 3600
+    print('\n'.join(sim.summary()))
+    print(f'Log: {logger.fileName if logger else "-"}, {entries} entries, {recorded} recorded, '
+          f'{recorded / hours:.0f} entries/hour')
+    print(f'Scan time: {msText(percentiles(scans.samples))} over {len(scans.samples)} scans')
+    print(f'Green to beep: {msText(percentiles(beepLatency(greens, sim.beeps)))} over {len(greens)} presses')
+    print(f'SD write: {msText(percentiles(writes.samples))} over {len(writes.samples)} writes')
+    print(f'Peak heap: {peak / 1024:.1f}KiB (host tracemalloc)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""Regression checks of the scanned building blocks on the simulator.
+Each check drives one block from utilities or Peripherals on a stopped virtual clock, stepping time by hand, and
+fails with the reason when its behaviour regresses. Exits with an error if any check fails.
+
+    python -m sim.checks"""
+import argparse
+import random
+import sys
+
+from . import Simulator
+from .devices import SimPin
+
+INTERVAL = 0.02  # Seconds between ADC samples, the string pot sample grid
+
+
+def samples(sim, block, values, interval=INTERVAL):
+    """Scan block once per sample of values, stepping the virtual clock. Yields (time, value) after each scan"""
+    for i, x in enumerate(values):
+        sim.clock.advance(interval)
+        block(x, i)
+        yield sim.clock.monotonic(), x
+
+
+"""------SettleDetector------"""
+
+
+def checkSettleTimeRepeats(sim):
+    """Each capture waits the full settle time, not only the first"""
+    from utilities import SettleDetector
+    detector = SettleDetector(size=16, tolerance=48, settleTime=1.0)
+    detector.enabled = True
+    values = [1000] * 150 + [3000] * 150  # Two poles, each held for 3s
+    triggers = [t for t, x in samples(sim, detector, values) if detector.trigger]
+    assert len(triggers) == 2, f'{len(triggers)} captures of 2 poles'
+    moved = 150 * INTERVAL
+    assert triggers[1] - moved >= 1.0, f'second capture {triggers[1] - moved:.2f}s after the move, settle time 1.0s'
+
+
+def checkSettleNoisyHold(sim):
+    """Noise about the tolerance on a pole that is not moving logs it once"""
+    from utilities import SettleDetector
+    detector = SettleDetector(size=16, tolerance=48, settleTime=1.0)
+    detector.enabled = True
+    noise = random.Random(1)
+    values = [1000 + int(noise.gauss(0, 45)) for _ in range(1500)]  # 30s held still
+    triggers = [t for t, x in samples(sim, detector, values) if detector.trigger]
+    assert len(triggers) == 1, f'{len(triggers)} captures of one pole'
+
+
+"""------BurstCapture------"""
+
+
+def checkBurstRepeats(sim):
+    """Back to back bursts each collect the full burst"""
+    from utilities import BurstCapture
+    burst = BurstCapture(size=15, timeout=0.5)
+    counts = []
+    for value in (1000, 2000, 3000):
+        burst.start()
+        for t, x in samples(sim, burst, [value] * 20):
+            if burst.done:
+                break
+        counts.append(burst.count)
+        assert burst.median == value, f'median {burst.median} of a burst held at {value}'
+    assert counts == [15, 15, 15], f'burst sample counts {counts}'
+
+
+def checkBurstTimeout(sim):
+    """A burst without new samples finishes at the timeout with none collected"""
+    from utilities import BurstCapture
+    burst = BurstCapture(size=15, timeout=0.5)
+    for _ in range(2):
+        burst.start()
+        waited = 0.0
+        while not burst.done and waited < 2.0:
+            sim.clock.advance(INTERVAL)
+            waited += INTERVAL
+            burst(1000, 0)  # Same sample id, the ADC is not producing samples
+        assert burst.done and burst.count == 0, f'burst done {burst.done} with {burst.count} samples'
+        assert 0.5 <= waited < 0.6, f'burst timed out after {waited:.2f}s, timeout 0.5s'
+
+
+"""------Button------"""
+
+
+class RacingCounter:
+    """countio.Counter stand-in landing each queued level on the pin just after the count is read, as an edge that
+    arrives while the scan is collecting the count"""
+
+    def __init__(self, counter, pin, clock):
+        self._counter = counter
+        self._pin = pin
+        self._clock = clock
+        self.queued = []
+
+    @property
+    def count(self):
+        count = self._counter.count
+        if self.queued:
+            self._pin.schedule(self._clock.monotonic(), self.queued.pop(0))
+        return count
+
+    def reset(self):
+        self._counter.reset()
+
+
+def scans(sim, button, duration, period=0.05):
+    """Scan the button every period for duration seconds. Returns (time, held, shortPress, longPress) per scan"""
+    states = []
+    for _ in range(round(duration / period)):
+        sim.clock.advance(period)
+        button()
+        states.append((sim.clock.monotonic(), button.held, button.shortPress, button.longPress))
+    return states
+
+
+def checkButtonEdgeDuringScan(sim):
+    """An edge arriving while the scan collects the count is taken by the next scan, not lost"""
+    from Peripherals import Button
+    from digitalio import Pull
+    button = Button('D5', pull=Pull.DOWN, counted=True)
+    pin = sim.pin('D5')
+    button._counter = RacingCounter(button._counter, pin, sim.clock)
+    scans(sim, button, 0.5)
+    pin.schedule(sim.clock.monotonic() + 0.01, True)  # Pressed before the next scan
+    button._counter.queued.append(False)  # Released while that scan reads the press
+    states = scans(sim, button, 2.0)
+    assert not states[-1][1], 'button held after it was released'
+    assert not any(state[3] for state in states), 'a tap was reported as a long press'
+    assert sum(state[2] for state in states) == 1, 'the tap was not reported as one short press'
+
+
+def checkButtonPullUp(sim):
+    """A pull up button idles high, reads released until pressed and is active low"""
+    from Peripherals import Button
+    from digitalio import Pull
+    pin = sim.pins['D6'] = SimPin(sim.clock, 'D6', level=True)
+    button = Button('D6', pull=Pull.UP, counted=True)
+    pin.schedule(1.0, False)  # Pressed
+    pin.schedule(1.2, True)
+    states = scans(sim, button, 3.0)
+    assert not any(state[1] for state in states if state[0] < 1.0), 'idle pull up button read as held'
+    assert any(state[1] for state in states if 1.0 <= state[0] < 1.2), 'pressed pull up button not held'
+    assert sum(state[2] for state in states) == 1 and not any(state[3] for state in states), \
+        'the press was not reported as one short press'
+    assert not states[-1][1], 'button held after it was released'
+
+
+def checkButtonBounceMidScan(sim):
+    """A press that chatters rise, fall, rise with a scan landing after the fall is one press"""
+    from Peripherals import Button
+    from digitalio import Pull
+    button = Button('D5', pull=Pull.DOWN, counted=True)
+    pin = sim.pin('D5')
+    scans(sim, button, 0.5)
+    t = sim.clock.monotonic()
+    pin.schedule(t + 0.010, True, bounce=3)  # Edges at +10, +11 and +12ms
+    pin.schedule(t + 0.150, False)
+    sim.clock.advance(0.0115)  # Scan between the fall and the last rise
+    button()
+    states = [(sim.clock.monotonic(), button.held, button.shortPress, button.longPress)] + scans(sim, button, 1.0)
+    shorts = sum(state[2] for state in states)
+    assert shorts == 1, f'{shorts} short presses from one bouncing press'
+
+
+def checkButtonBouncyPresses(sim):
+    """Presses chattering on both make and break, scanned at any phase, are one short press each"""
+    from Peripherals import Button
+    from digitalio import Pull
+    button = Button('D5', pull=Pull.DOWN, counted=True)
+    pin = sim.pin('D5')
+    phase = random.Random(2)
+    shorts = 0
+    for i in range(40):
+        start = sim.clock.monotonic() + phase.uniform(0.0, 0.02)  # Bounce lands anywhere in the scan period
+        pin.schedule(start, True, bounce=5)
+        pin.schedule(start + 0.15, False, bounce=5)
+        shorts += sum(state[2] for state in scans(sim, button, 0.5, period=0.02))
+    assert shorts == 40, f'{shorts} short presses from 40 bouncing presses'
+
+
+def checkButtonTapInSlowScan(sim):
+    """A clean tap entirely between two scans of a slow cycle is still one short press"""
+    from Peripherals import Button
+    from digitalio import Pull
+    button = Button('D5', pull=Pull.DOWN, counted=True)
+    pin = sim.pin('D5')
+    scans(sim, button, 0.5)
+    t = sim.clock.monotonic()
+    pin.schedule(t + 0.05, True)
+    pin.schedule(t + 0.12, False)
+    sim.clock.advance(0.2)  # Slow scan, an SD write
+    button()
+    shorts = int(button.shortPress)
+    states = scans(sim, button, 0.5)
+    shorts += sum(state[2] for state in states)
+    assert shorts == 1, f'{shorts} short presses from one tap'
+    assert not states[-1][1], 'button held after the tap'
+
+
+"""------SelectWheel------"""
+
+
+def checkWheelSoftReload(sim):
+    """A wheel started on a seesaw that kept its count through a soft reload reports no turn until it is turned"""
+    import board
+    from Peripherals import SelectWheel, InputQueue
+    sim.encoder._position = 7  # Count left over from before the reload
+    events = InputQueue(size=16)
+    wheel = SelectWheel(board.STEMMA_I2C(), events=events)
+    for _ in range(5):
+        sim.clock.advance(0.02)
+        wheel()
+    assert len(events) == 0, f'{len(events)} events from an untouched wheel'
+    sim.encoder.schedule(sim.clock.monotonic() + 0.01, 1)
+    sim.clock.advance(0.02)
+    wheel()
+    event = events.get()
+    assert event is not None and event[3] == 1, f'one detent turned, got {event}'
+
+
+def checkWheelTransactions(sim):
+    """The wheel's bus transactions reach its report, two per scan while INT is not wired"""
+    import board
+    from Peripherals import SelectWheel
+    wheel = SelectWheel(board.STEMMA_I2C())
+    reads = sim.encoder.reads
+    for _ in range(10):
+        sim.clock.advance(0.02)
+        wheel()
+    assert wheel.totalTransactions == 20, f'{wheel.totalTransactions} transactions counted in 10 polled scans'
+    assert wheel.totalTransactions >= sim.encoder.reads - reads, 'encoder reads not counted as transactions'
+    line = wheel.report()[0]
+    assert 'INT not wired' in line and 'avg 2.00/scan' in line, f'report {line!r}'
+
+
+"""------HeapMonitor------"""
+
+
+def checkHeapProbeOutsideScan(sim):
+    """The largest free block of a state change is probed in the idle slack, after any collection, not in the scan"""
+    from utilities import HeapMonitor
+    heap = HeapMonitor(probe=True)
+    probes = []
+    largestFree = heap.largestFree
+    heap.largestFree = lambda: probes.append(sim.clock.monotonic()) or largestFree()
+    heap.begin(0)
+    heap.end(10)  # State change
+    assert not probes, 'largest free block probed inside the scan'
+    heap.requestCollect()
+    heap.collect(0.01)
+    assert not probes and heap.collections == 1, 'probe ran in the same slack as a collection'
+    heap.begin(10)
+    heap.end(10)
+    heap.collect(0.01)
+    assert len(probes) == 1 and heap.largest is not None, f'{len(probes)} probes after one state change'
+    transitions = [record for record in heap.records() if record[1] == heap.TRANSITION]
+    assert transitions[-1][4] == heap.largest, f'state change logged largest {transitions[-1][4]}, probed {heap.largest}'
+    assert heap.states[0][3] == heap.largest, 'probe not kept as the smallest largest block of the state left'
+
+
+CHECKS = (checkSettleTimeRepeats, checkSettleNoisyHold, checkBurstRepeats, checkBurstTimeout,
+          checkButtonEdgeDuringScan, checkButtonPullUp, checkButtonBounceMidScan, checkButtonBouncyPresses,
+          checkButtonTapInSlowScan, checkWheelSoftReload, checkWheelTransactions, checkHeapProbeOutsideScan)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m sim.checks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('names', nargs='*', help='checks to run, all by default')
+    args = parser.parse_args()
+
+    failed = 0
+    for check in CHECKS:
+        if args.names and check.__name__ not in args.names:
+            continue
+        with Simulator() as sim:
+            sim.clock.rate = 0.0  # Time only moves when a check steps it
+            try:
+                check(sim)
+                print(f'ok    {check.__name__}')
+            except AssertionError as error:
+                failed += 1
+                print(f'FAIL  {check.__name__}: {error}')
+    if failed:
+        print(f'FAIL: {failed} check(s) failed')
+        sys.exit(1)
+    print('OK: all checks passed')
+
+
+if __name__ == '__main__':
+    main()
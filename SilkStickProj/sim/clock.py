@@ -0,0 +1,63 @@
+import time
+
+
+class SimulationDone(BaseException):
+    """Raised from the virtual clock once a simulated run reaches its end time.
+    A BaseException so the application's own except clauses never swallow it."""
+
+
+class VirtualClock:
+    """Monotonic time of the simulated board.
+    Code runs at host speed while sleeps are skipped and added to an offset, so a run only takes the CPU time of its
+    scans and durations measured inside a scan are real host timings."""
+
+    def __init__(self, start=0.0):
+        self._origin = time.perf_counter()
+        self._mark = self._origin  # Host time of the last rate change
+        self._base = 0.0  # Host seconds counted up to the mark, scaled by the rate in force before it
+        self._rate = 1.0
+        self._offset = start
+        self.end = None  # Virtual time that ends the run
+        self.slept = 0.0  # Virtual seconds skipped by sleeps
+        self.sleeps = 0
+        self.onSleep = []  # Callables run after each sleep, the end of a scan cycle
+
+    @property
+    def rate(self):
+        """Virtual seconds per host second of code, set below 1 while tracing slows the host down"""
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate):
+        now = time.perf_counter()
+        self._base += (now - self._mark) * self._rate
+        self._mark = now
+        self._rate = rate
+
+    def monotonic(self):
+        now = self._base + (time.perf_counter() - self._mark) * self._rate + self._offset
+        if self.end is not None and now >= self.end:
+            self.end = None  # Raise once, cleanup code may still read the clock
+            raise SimulationDone
+        return now
+
+    def monotonic_ns(self):
+        return int(self.monotonic() * 1000000000)
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self._offset += seconds
+            self.slept += seconds
+        self.sleeps += 1
+        for hook in self.onSleep:
+            hook()
+        self.monotonic()  # Ends the run once past the end time
+
+    def advance(self, seconds):
+        """Move virtual time forward without counting a sleep, models time spent blocked in a device"""
+        self._offset += seconds
+
+    @property
+    def hostTime(self):
+        """Host seconds since the clock was created"""
+        return time.perf_counter() - self._origin
@@ -0,0 +1,326 @@
+import math
+import random
+import time
+
+# Full scale of the simulated ADS1015 at gain 1
+ADC_RANGE = 4.096
+ADC_CODES = 2047
+
+
+"""------Waveforms------"""
+# ADC inputs are functions of virtual time returning volts
+
+
+def constant(volts):
+    return lambda t: volts
+
+
+def ramp(start, end, duration, delay=0.0):
+    """Linear ramp from start to end volts over duration seconds after delay"""
+    def wave(t):
+        if t <= delay:
+            return start
+        if t >= delay + duration:
+            return end
+        return start + (end - start) * (t - delay) / duration
+    return wave
+
+
+def sine(mean, amplitude, period):
+    return lambda t: mean + amplitude * math.sin(2 * math.pi * t / period)
+
+
+def steps(points):
+    """Piecewise constant volts from a list of (time, volts), holding each level until the next time"""
+    points = sorted(points)
+
+    def wave(t):
+        volts = points[0][1]
+        for start, level in points:
+            if t < start:
+                break
+            volts = level
+        return volts
+    return wave
+
+
+def noisy(wave, sd, seed=0):
+    """Add gaussian noise of sd volts to a waveform"""
+    rng = random.Random(seed)
+    return lambda t: wave(t) + rng.gauss(0.0, sd)
+
+
+def fromRaw(raw):
+    """Volts for a left justified 16 bit AnalogIn.value, as used by the Scaling setup"""
+    return raw * ADC_RANGE / 32767
+
+
+"""------Discrete I/O------"""
+
+
+class SimPin:
+    """Level of a board pin over virtual time.
+    Inputs follow levels scheduled by the script, outputs record the levels written by the application."""
+
+    def __init__(self, clock, name, level=False):
+        self.name = name
+        self._clock = clock
+        self._level = level
+        self._changes = []  # Scheduled (time, level), oldest first
+        self.edges = 0  # Level changes applied so far
+        self.history = []  # (time, level) written by the application
+
+    def schedule(self, t, level, bounce=1, spacing=0.001):
+        """Change to level at t. bounce > 1 chatters first, bounce edges in all spacing seconds apart (odd counts)"""
+        for i in range(bounce):
+            self._changes.append((t + i * spacing, level if i % 2 == 0 else not level))
+        self._changes.sort(key=lambda change: change[0])
+
+    @property
+    def value(self):
+        now = self._clock.monotonic()
+        while self._changes and self._changes[0][0] <= now:
+            level = self._changes.pop(0)[1]
+            if level != self._level:
+                self._level = level
+                self.edges += 1
+        return self._level
+
+    @value.setter
+    def value(self, level):
+        level = bool(level)
+        if level != self._level:
+            self._level = level
+            self.edges += 1
+            self.history.append((self._clock.monotonic(), level))
+
+
+class SimEncoder:
+    """Seesaw rotary encoder breakout, detents and the push button scheduled over virtual time"""
+
+    def __init__(self, clock):
+        self._clock = clock
+        self._turns = []  # Scheduled (time, detents)
+        self._position = 0
+        self.button = SimPin(clock, 'encoder')  # True while pressed
+        self._flagEdges = 0
+        self.reads = 0  # I2C reads of the position or button
+
+    def schedule(self, t, detents):
+        self._turns.append((t, detents))
+        self._turns.sort(key=lambda turn: turn[0])
+
+    @property
+    def position(self):
+        self.reads += 1
+        now = self._clock.monotonic()
+        while self._turns and self._turns[0][0] <= now:
+            self._position += self._turns.pop(0)[1]
+        return self._position
+
+    def buttonFlag(self):
+        """GPIO interrupt flag, set by a button change since the last read"""
+        self.button.value  # Apply scheduled levels
+        flag = self.button.edges != self._flagEdges
+        self._flagEdges = self.button.edges
+        return flag
+
+
+"""------I2C Devices------"""
+
+
+class SimADS1015:
+    """ADS1015 converting the waveform of each input at the instant it is read"""
+
+    def __init__(self, clock, waves):
+        self._clock = clock
+        self.waves = waves  # channel: function of time returning volts
+        self.reads = 0
+
+    def code(self, channel):
+        """Signed 12 bit conversion of a channel"""
+        self.reads += 1
+        wave = self.waves.get(channel)
+        volts = wave(self._clock.monotonic()) if wave is not None else 0.0
+        return max(-ADC_CODES - 1, min(ADC_CODES, int(volts / ADC_RANGE * ADC_CODES)))
+
+
+class SimRTC:
+    """PCF8523 counting from the host time at start, settable like the real clock"""
+
+    def __init__(self, clock, start=None):
+        self._clock = clock
+        self._base = (time.time() if start is None else start) - clock.monotonic()
+        self.reads = 0
+        self.writes = 0
+
+    @property
+    def datetime(self):
+        self.reads += 1
+        return time.localtime(int(self._base + self._clock.monotonic()))
+
+    @datetime.setter
+    def datetime(self, t):
+        self.writes += 1
+        self._base = time.mktime(t) - self._clock.monotonic()
+
+
+class SimSegDisplay:
+    """HT16K33 7 segment backpack, keeps the last printed text"""
+
+    def __init__(self):
+        self.text = ''
+        self.shows = 0
+
+    def print(self, text):
+        self.text = str(text)
+
+    def show(self):
+        self.shows += 1
+
+
+class HeadlessDisplay:
+    """Integral TFT, keeps the shown display group instead of drawing it"""
+
+    def __init__(self):
+        self.group = None
+        self.shows = 0
+
+    def show(self, group):
+        self.group = group
+        self.shows += 1
+
+    @property
+    def root_group(self):
+        return self.group
+
+    @root_group.setter
+    def root_group(self, group):
+        self.show(group)
+
+    def lines(self):
+        """Text of each label on the shown screen"""
+        if self.group is None:
+            return []
+        return [item.text for item in self.group if hasattr(item, 'text')]
+
+
+"""------UART------"""
+
+
+def checksum(body):
+    crc = 0
+    for char in body:
+        crc ^= ord(char)
+    return f'${body}*{crc:02X}\r\n'
+
+
+class NmeaSynth:
+    """GNGGA and GNZDA sentences once per period at a fixed position, timestamped from the simulated RTC"""
+
+    def __init__(self, rtc, lat='4043.12345', ns='N', lon='08912.54321', ew='W', fix=1, satellites=9, period=1.0):
+        self._base = rtc._base  # GPS time follows the RTC's start time, not later writes to the RTC
+        self.position = (lat, ns, lon, ew)
+        self.fix = fix
+        self.satellites = satellites
+        self.period = period
+
+    def epoch(self, t):
+        d = time.localtime(int(self._base + t))
+        utc = f'{d.tm_hour:02d}{d.tm_min:02d}{d.tm_sec:02d}.00'
+        lat, ns, lon, ew = self.position
+        return (checksum(f'GNGGA,{utc},{lat},{ns},{lon},{ew},{self.fix},{self.satellites},0.9,230.1,M,-33.5,M,,') +
+                checksum(f'GNZDA,{utc},{d.tm_mday:02d},{d.tm_mon:02d},{d.tm_year},00,00')).encode()
+
+
+class NmeaReplay:
+    """Recorded NMEA lines played back perEpoch lines per period, looping at the end"""
+
+    def __init__(self, lines, perEpoch=2, period=1.0, loop=True):
+        self.lines = [line.strip() for line in lines if line.strip().startswith('$')]
+        self.perEpoch = perEpoch
+        self.period = period
+        self.loop = loop
+        self._index = 0
+
+    @classmethod
+    def fromFile(cls, path, **kwargs):
+        with open(path) as file:
+            return cls(file.readlines(), **kwargs)
+
+    def epoch(self, t):
+        data = ''
+        for _ in range(self.perEpoch):
+            if self._index >= len(self.lines):
+                if not self.loop or not self.lines:
+                    break
+                self._index = 0
+            data += self.lines[self._index] + '\r\n'
+            self._index += 1
+        return data.encode()
+
+
+class SimUART:
+    """GPS serial port. The NMEA source emits a burst every period into a receive buffer that drops bytes when full"""
+
+    def __init__(self, clock, source=None, bufferSize=64):
+        self._clock = clock
+        self.source = source
+        self._buffer = bytearray(bufferSize)  # Fixed like the board's buffer, so reads never grow host memory
+        self._count = 0  # Bytes held
+        self._next = 0.0  # Virtual time of the next burst
+        self.received = 0
+        self.dropped = 0
+
+    @property
+    def bufferSize(self):
+        return len(self._buffer)
+
+    @bufferSize.setter
+    def bufferSize(self, size):
+        self._buffer = bytearray(size)
+        self._count = 0
+
+    def _fill(self):
+        if self.source is None:
+            return
+        now = self._clock.monotonic()
+        while self._next <= now:
+            data = self.source.epoch(self._next)
+            self._next += self.source.period
+            stored = min(len(self._buffer) - self._count, len(data))
+            self._buffer[self._count:self._count + stored] = data[:stored]
+            self._count += stored
+            self.received += stored
+            self.dropped += len(data) - stored
+
+    def _take(self, nbytes):
+        """Remove nbytes from the front of the buffer"""
+        self._buffer[:self._count - nbytes] = self._buffer[nbytes:self._count]
+        self._count -= nbytes
+
+    @property
+    def in_waiting(self):
+        self._fill()
+        return self._count
+
+    def read(self, nbytes=None):
+        self._fill()
+        if not self._count:
+            return None  # Timed out with nothing received
+        nbytes = self._count if nbytes is None else min(nbytes, self._count)
+        data = bytes(self._buffer[:nbytes])
+        self._take(nbytes)
+        return data
+
+    def readinto(self, buf):
+        self._fill()
+        if not self._count:
+            return None
+        nbytes = min(len(buf), self._count)
+        buf[:nbytes] = self._buffer[:nbytes]
+        self._take(nbytes)
+        return nbytes
+
+    def reset_input_buffer(self):
+        self._count = 0
@@ -0,0 +1,208 @@
+import builtins
+import contextlib
+import gc
+import importlib.abc
+import importlib.util
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+from . import modules
+from .clock import VirtualClock, SimulationDone
+from .devices import SimPin, SimEncoder, SimADS1015, SimRTC, SimSegDisplay, HeadlessDisplay, SimUART, NmeaSynth, \
+    constant, fromRaw
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class AliasFinder(importlib.abc.MetaPathFinder):
+    """Import a project file under the name it is copied to on the device, on first import as on the board"""
+
+    def __init__(self, aliases, projectDir):
+        self.aliases = aliases
+        self.projectDir = projectDir
+
+    def find_spec(self, fullname, path=None, target=None):
+        name = self.aliases.get(fullname)
+        if name is None:
+            return None
+        return importlib.util.spec_from_file_location(fullname, os.path.join(self.projectDir, name + '.py'))
+
+
+class Simulator:
+    """Run silk_stick.py on the host against simulated devices.
+    The CircuitPython modules and drivers are replaced by stand-ins bound to this simulator, time.monotonic/sleep run
+    on a virtual clock so scan sleeps cost nothing, and paths under /sd map to a host directory. The application's
+    globals are kept in app, and onScan callables run at the end of every scan cycle.
+
+    with-block use installs the simulated modules without running the application, run() does both."""
+    # On device the display and utility modules are copied as Menu.py and Utilities.py
+    ALIASES = {'Menu': 'Displays', 'Utilities': 'utilities'}
+    APP_MODULES = ('Displays', 'utilities', 'Peripherals', 'GPS', 'Menu', 'Utilities', 'NewLogScreen', 'ConfigScreen',
+                   'GPSScreen')
+    BUTTONS = {'green': 'A2', 'red': 'A3'}  # Board pins of the record buttons
+    BEEPER = 'A0'
+
+    def __init__(self, sdDir=None, adc=None, nmea=True, sdWriteTime=0.0, quiet=True, heapSize=2 * 1024 * 1024,
+                 projectDir=PROJECT_DIR):
+        self.clock = VirtualClock()
+        self.pins = {}
+        self.encoder = SimEncoder(self.clock)
+        # String pot mid travel unless waveforms are given, channel: function of time returning volts
+        self.adc = SimADS1015(self.clock, adc if adc is not None else {0: constant(fromRaw(12000))})
+        self.rtc = SimRTC(self.clock)
+        self.uart = SimUART(self.clock, NmeaSynth(self.rtc) if nmea is True else (nmea or None))
+        self.display = HeadlessDisplay()
+        self.segments = SimSegDisplay()
+        self.sdDir = sdDir  # Host directory mounted as /sd, None runs without an SD card
+        self.sdWriteTime = sdWriteTime  # Virtual seconds each SD file write blocks, models the SPI card latency
+        self.sdWrites = 0
+        # Bytes reported by gc.mem_free() plus gc.mem_alloc(), host objects are several times larger than on the board
+        self.heapSize = heapSize
+        self.quiet = quiet  # Capture the application's prints in output instead of the console
+        self.output = io.StringIO()
+        self.projectDir = projectDir
+        self.app = {}  # Globals of the running application
+        self.onScan = self.clock.onSleep
+        self._saved = None
+        self._allocBase = 0  # Host bytes already traced when the simulated board started
+        self._built = None  # Simulated modules, built on first install
+        self._finder = AliasFinder(self.ALIASES, projectDir)
+
+    def pin(self, name):
+        if name not in self.pins:
+            self.pins[name] = SimPin(self.clock, name)
+        return self.pins[name]
+
+    """------Script------"""
+
+    def turn(self, t, detents, rate=10.0):
+        """Turn the encoder by signed detents starting at t, one detent every 1/rate seconds. Negative is CCW"""
+        step = 1 if detents > 0 else -1
+        for i in range(abs(detents)):
+            self.encoder.schedule(t + i / rate, step)
+
+    def press(self, source, t, duration=0.1, bounce=1):
+        """Hold 'encoder', 'green' or 'red' from t for duration seconds, bounce > 1 edges of contact chatter"""
+        pin = self.encoder.button if source == 'encoder' else self.pin(self.BUTTONS[source])
+        pin.schedule(t, True, bounce)
+        pin.schedule(t + duration, False, bounce)
+
+    @property
+    def beeps(self):
+        """(start, duration) of each beep sounded"""
+        history = self.pin(self.BEEPER).history
+        return [(on[0], off[0] - on[0]) for on, off in zip(history[0::2], history[1::2]) if on[1]]
+
+    @property
+    def scans(self):
+        """Scan cycles run, including overruns that did not sleep"""
+        scheduler = self.app.get('scanScheduler')
+        return scheduler.cycles if scheduler is not None else self.clock.sleeps
+
+    @property
+    def state(self):
+        machine = self.app.get('machine')
+        return machine.state if machine is not None else None
+
+    """------Host patches------"""
+
+    def _sdPath(self, path):
+        if isinstance(path, str) and self.sdDir is not None and (path == '/sd' or path.startswith('/sd/')):
+            return os.path.join(self.sdDir, path[4:])
+        return path
+
+    def memAlloc(self):
+        """gc.mem_alloc() of the board, bytes allocated by Python since the board started or 0 when not tracing"""
+        return max(0, tracemalloc.get_traced_memory()[0] - self._allocBase) if tracemalloc.is_tracing() else 0
+
+    def __enter__(self):
+        realOpen, realListdir, realRemove, realStat, realRename = \
+            builtins.open, os.listdir, os.remove, os.stat, os.rename
+
+        def sdOpen(file, mode='r', *args, **kwargs):
+            mapped = self._sdPath(file)
+            if mapped is not file and any(flag in mode for flag in 'wax+'):
+                self.sdWrites += 1
+                self.clock.advance(self.sdWriteTime)
+            return realOpen(mapped, mode, *args, **kwargs)
+
+        self._saved = {
+            'modules': {name: sys.modules.get(name) for name in set(self._modules()) | set(self.APP_MODULES)},
+            'path': list(sys.path),
+            'builtins': realOpen,
+            'os': (realListdir, realRemove, realStat, realRename),
+            'time': (time.monotonic, time.monotonic_ns, time.sleep),
+            'gc': (getattr(gc, 'mem_free', None), getattr(gc, 'mem_alloc', None)),
+        }
+        for name in self.APP_MODULES:
+            sys.modules.pop(name, None)  # Fresh application modules for every run
+        sys.modules.update(self._modules())
+        self._allocBase = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        sys.path.insert(0, self.projectDir)
+        sys.meta_path.insert(0, self._finder)
+        builtins.open = sdOpen
+        os.listdir = lambda path='.': realListdir(self._sdPath(path))
+        os.remove = lambda path, *args, **kwargs: realRemove(self._sdPath(path), *args, **kwargs)
+        os.stat = lambda path, *args, **kwargs: realStat(self._sdPath(path), *args, **kwargs)
+        os.rename = lambda src, dst, *args, **kwargs: realRename(self._sdPath(src), self._sdPath(dst), *args, **kwargs)
+        time.monotonic, time.monotonic_ns, time.sleep = self.clock.monotonic, self.clock.monotonic_ns, self.clock.sleep
+        gc.mem_alloc = self.memAlloc  # CircuitPython only heap statistics
+        gc.mem_free = lambda: self.heapSize - self.memAlloc()
+        return self
+
+    def __exit__(self, *exc):
+        saved = self._saved
+        time.monotonic, time.monotonic_ns, time.sleep = saved['time']
+        for name, func in zip(('mem_free', 'mem_alloc'), saved['gc']):
+            if func is None:
+                delattr(gc, name)
+            else:
+                setattr(gc, name, func)
+        os.listdir, os.remove, os.stat, os.rename = saved['os']
+        builtins.open = saved['builtins']
+        sys.path[:] = saved['path']
+        sys.meta_path.remove(self._finder)
+        for name, module in saved['modules'].items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        self._saved = None
+        return False
+
+    def _modules(self):
+        if self._built is None:
+            self._built = modules.build(self)
+        return self._built
+
+    """------Run------"""
+
+    def run(self, duration, app='silk_stick.py'):
+        """Run the application for duration virtual seconds, returns the simulator"""
+        path = os.path.join(self.projectDir, app)
+        with open(path) as file:
+            code = compile(file.read(), path, 'exec')
+        self.app = {'__name__': 'silk_stick', '__file__': path, '__builtins__': builtins}
+        self.clock.end = self.clock.monotonic() + duration
+        with self:
+            redirect = contextlib.redirect_stdout(self.output) if self.quiet else contextlib.nullcontext()
+            with redirect:
+                try:
+                    exec(code, self.app)
+                except SimulationDone:
+                    pass
+        return self
+
+    def summary(self):
+        virtual = self.clock.monotonic()
+        host = self.clock.hostTime
+        return [f'Simulated {virtual:.1f}s in {host:.2f}s host time ({virtual / host if host else 0:.0f}x real time)',
+                f'Scans: {self.scans}, final state: {self.state}',
+                f'Screen: {" | ".join(text for text in self.display.lines() if text)}',
+                f'7 segment: {self.segments.text}, beeps: {len(self.beeps)}, SD writes: {self.sdWrites}',
+                f'I2C reads: encoder {self.encoder.reads}, ADC {self.adc.reads}, RTC {self.rtc.reads}',
+                f'UART: received {self.uart.received} bytes, dropped {self.uart.dropped}'] + \
+            (self.app['boot'].report()[:1] if 'boot' in self.app else [])
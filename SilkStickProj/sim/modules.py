@@ -0,0 +1,234 @@
+"""Stand-ins for the CircuitPython core modules and Adafruit drivers imported by the Silk Stick, bound to the devices
+of one Simulator. Only the parts of each API the application uses are provided."""
+import types
+
+
+class _Namespace:
+    """Attribute bag for enum like driver constants"""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def build(sim):
+    """Return {module name: module} for the simulator's devices"""
+    """------board / busio------"""
+    class I2C:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def try_lock(self):
+            return True
+
+        def unlock(self):
+            pass
+
+        def scan(self):
+            return [0x36, 0x48, 0x68, 0x70]
+
+    class SPI(I2C):
+        pass
+
+    def uart(tx=None, rx=None, baudrate=9600, timeout=1, receiver_buffer_size=64, **kwargs):
+        sim.uart.bufferSize = receiver_buffer_size
+        return sim.uart
+
+    pins = {name: name for name in ('A0', 'A1', 'A2', 'A3', 'A4', 'A5', 'TX', 'RX', 'SCK', 'MOSI', 'MISO',
+                                    'D5', 'D6', 'D9', 'D10', 'D11', 'D12', 'D13', 'BUTTON')}
+    board = _module('board', STEMMA_I2C=I2C, I2C=I2C, SPI=SPI, DISPLAY=sim.display, **pins)
+    busio = _module('busio', I2C=I2C, SPI=SPI, UART=uart)
+
+    """------digitalio / countio / analogio------"""
+    Direction = _Namespace(INPUT='INPUT', OUTPUT='OUTPUT')
+    DriveMode = _Namespace(PUSH_PULL='PUSH_PULL', OPEN_DRAIN='OPEN_DRAIN')
+    Pull = _Namespace(UP='UP', DOWN='DOWN')
+
+    class DigitalInOut:
+        def __init__(self, pin):
+            self._pin = sim.pin(pin)
+            self.direction = Direction.INPUT
+            self.pull = None
+
+        def switch_to_output(self, value=False, drive_mode=DriveMode.PUSH_PULL):
+            self.direction = Direction.OUTPUT
+            self._pin.value = value
+
+        def switch_to_input(self, pull=None):
+            self.direction = Direction.INPUT
+            self.pull = pull
+
+        @property
+        def value(self):
+            return self._pin.value
+
+        @value.setter
+        def value(self, level):
+            self._pin.value = level
+
+        def deinit(self):
+            pass
+
+    digitalio = _module('digitalio', DigitalInOut=DigitalInOut, Direction=Direction, DriveMode=DriveMode, Pull=Pull)
+
+    Edge = _Namespace(RISE='RISE', FALL='FALL', RISE_AND_FALL='RISE_AND_FALL')
+
+    class Counter:
+        def __init__(self, pin, edge=Edge.FALL, pull=None):
+            self._pin = sim.pin(pin)
+            self._pin.value  # Apply levels scheduled before the counter started
+            self._base = self._pin.edges
+
+        @property
+        def count(self):
+            self._pin.value
+            return self._pin.edges - self._base
+
+        def reset(self):
+            self._pin.value  # Edges up to now are counted in hardware before the reset clears them
+            self._base = self._pin.edges
+
+        def deinit(self):
+            pass
+
+    countio = _module('countio', Counter=Counter, Edge=Edge)
+
+    class AnalogIn:
+        def __init__(self, pin):
+            self.value = 0
+            self.reference_voltage = 3.3
+
+    analogio = _module('analogio', AnalogIn=AnalogIn)
+
+    """------displayio / terminalio / adafruit_display_text------"""
+    class Group(list):
+        def __init__(self, *args, **kwargs):
+            super().__init__()
+            self.hidden = False
+
+    class Label:
+        def __init__(self, font=None, text='', **kwargs):
+            self.font = font
+            self.text = text
+            self.__dict__.update(kwargs)
+
+    displayio = _module('displayio', Group=Group)
+    terminalio = _module('terminalio', FONT=object())
+    label = _module('adafruit_display_text.label', Label=Label)
+    scrolling_label = _module('adafruit_display_text.scrolling_label', ScrollingLabel=Label)
+    display_text = _module('adafruit_display_text', label=label, scrolling_label=scrolling_label)
+
+    """------SD card / storage------"""
+    def sdCard(spi, cs, baudrate=8000000):
+        if sim.sdDir is None:
+            raise OSError('No SD card')
+        return sim.sdDir
+
+    sdcardio = _module('sdcardio', SDCard=sdCard)
+    storage = _module('storage', VfsFat=lambda card: card, mount=lambda vfs, path, readonly=False: None,
+                      umount=lambda path: None)
+
+    """------Seesaw rotary encoder------"""
+    class Seesaw:
+        INPUT_PULLUP = 2
+
+        def __init__(self, i2c, addr=0x36):
+            self.device = sim.encoder
+
+        def pin_mode(self, pin, mode):
+            pass
+
+        def enable_encoder_interrupt(self, encoder=0):
+            pass
+
+        def set_GPIO_interrupts(self, pins, enabled):
+            pass
+
+        def get_GPIO_interrupt_flag(self):
+            return (1 << 24) if self.device.buttonFlag() else 0
+
+    class IncrementalEncoder:
+        def __init__(self, seesaw, encoder=0):
+            self._device = seesaw.device
+
+        @property
+        def position(self):
+            return self._device.position
+
+    class DigitalIO:
+        def __init__(self, seesaw, pin):
+            self._device = seesaw.device
+
+        @property
+        def value(self):
+            self._device.reads += 1
+            return not self._device.button.value  # Active low
+
+    seesawPackage = _module('adafruit_seesaw')
+    seesawPackage.seesaw = _module('adafruit_seesaw.seesaw', Seesaw=Seesaw)
+    seesawPackage.rotaryio = _module('adafruit_seesaw.rotaryio', IncrementalEncoder=IncrementalEncoder)
+    seesawPackage.digitalio = _module('adafruit_seesaw.digitalio', DigitalIO=DigitalIO)
+
+    """------HT16K33 7 segment------"""
+    ht16k33Package = _module('adafruit_ht16k33')
+    ht16k33Package.ht16k33 = _module('adafruit_ht16k33.ht16k33')
+    ht16k33Package.segments = _module('adafruit_ht16k33.segments', Seg7x4=lambda i2c, address=0x70: sim.segments)
+
+    """------ADS1015------"""
+    Mode = _Namespace(CONTINUOUS=0, SINGLE=256)
+
+    class ADS1015:
+        bits = 12
+
+        def __init__(self, i2c, gain=1, data_rate=None, mode=Mode.SINGLE, address=0x48):
+            self.gain = gain
+            self.data_rate = 1600 if data_rate is None else data_rate
+            self.mode = mode
+
+        def read(self, pin, is_differential=False):
+            return sim.adc.code(pin)
+
+    class ADSAnalogIn:
+        def __init__(self, ads, positive_pin, negative_pin=None):
+            self._ads = ads
+            self._pin = positive_pin
+
+        @property
+        def value(self):
+            return self._ads.read(self._pin) << 4
+
+        @property
+        def voltage(self):
+            return sim.adc.code(self._pin) * 4.096 / 2047
+
+    ads1015 = _module('adafruit_ads1x15.ads1015', ADS1015=ADS1015, Mode=Mode, P0=0, P1=1, P2=2, P3=3)
+    analog_in = _module('adafruit_ads1x15.analog_in', AnalogIn=ADSAnalogIn)
+    adsPackage = _module('adafruit_ads1x15', ads1015=ads1015, analog_in=analog_in)
+
+    """------RTC / fuel gauge------"""
+    pcf8523 = _module('adafruit_pcf8523', PCF8523=lambda i2c: sim.rtc)
+
+    class MAX17048:
+        def __init__(self, i2c, address=0x36):
+            self.cell_voltage = 4.0
+            self.cell_percent = 90.0
+
+    max1704x = _module('adafruit_max1704x', MAX17048=MAX17048)
+
+    return {
+        'board': board, 'busio': busio, 'digitalio': digitalio, 'countio': countio, 'analogio': analogio,
+        'displayio': displayio, 'terminalio': terminalio, 'adafruit_display_text': display_text,
+        'adafruit_display_text.label': label, 'adafruit_display_text.scrolling_label': scrolling_label,
+        'sdcardio': sdcardio, 'storage': storage,
+        'adafruit_seesaw': seesawPackage, 'adafruit_seesaw.seesaw': seesawPackage.seesaw,
+        'adafruit_seesaw.rotaryio': seesawPackage.rotaryio, 'adafruit_seesaw.digitalio': seesawPackage.digitalio,
+        'adafruit_ht16k33': ht16k33Package, 'adafruit_ht16k33.ht16k33': ht16k33Package.ht16k33,
+        'adafruit_ht16k33.segments': ht16k33Package.segments,
+        'adafruit_ads1x15': adsPackage, 'adafruit_ads1x15.ads1015': ads1015, 'adafruit_ads1x15.analog_in': analog_in,
+        'adafruit_pcf8523': pcf8523, 'adafruit_max1704x': max1704x,
+    }
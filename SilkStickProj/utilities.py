@@ -1,3 +1,5 @@
+import array
+import gc
 import os
 import time
 
@@ -8,11 +10,12 @@ def printInline(mes):
 
 
 class LogFile:
-    def __init__(self):
+    def __init__(self, extraFields=()):
         self._filepath = '/sd'
         self._fileName = ''
         self._datafields = ['yyyymmdd', 'hhmmss', 'Row', 'Rng', 'Lat', 'Lon', 'Height',
-                            'Lat_Maj', 'Lat_Min', 'Lon_Maj', 'Lon_Min']
+                            'Lat_Maj', 'Lat_Min', 'Lon_Maj', 'Lon_Min', 'Spread'] + list(extraFields)
+        self._extraFields = tuple(extraFields)  # Additional columns appended to each entry, e.g. analog channels
         self._entryCount = 0
 
     @property
@@ -54,7 +57,11 @@ class LogFile:
         try:
             logstring = info['ymd'] + ',' + info['hms'] + ',' + str(info['Row']) + ',' + str(info['Rng']) + ',' + \
                         info['Lat'] + ', ' + info['Lon'] + ', ' + info['Height'] + ', ' + info['Lat_Maj'] + \
-                        ', ' + info['Lat_Min'] + ', ' + info['Lon_Maj'] + ', ' + info['Lon_Min'] + '\n'
+                        ', ' + info['Lat_Min'] + ', ' + info['Lon_Maj'] + ', ' + info['Lon_Min'] + ', ' + \
+                        info['Spread']
+            for key in self._extraFields:
+                logstring = logstring + ', ' + info[key]
+            logstring = logstring + '\n'
             with open(self._filepath + '/' + self._fileName, 'a') as file:
                 file.write(logstring)
         except OSError as oserr:  # Most likely no SD Card
@@ -112,8 +119,8 @@ class Timer:
         self._start_time = 0.0
         self.__initialized = True
 
-    def __call__(self, *args, **kwargs):
-        self._scan(*args, **kwargs)
+    def __call__(self):
+        self._scan()
         self._EN = False  # cyclically reset EN for automatic reset
 
     def _scan(self):
@@ -171,15 +178,949 @@ class Timer:
             raise TypeError("PRE must be a float of seconds.")
 
 
+class Clock:
+    """Real time clock read over I2C about once a minute and interpolated with the monotonic clock in between.
+    Time is kept as integer seconds and nanoseconds so it holds its precision on CircuitPython's short floats."""
+
+    def __init__(self, rtc, resync=60.0):
+        self._rtc = rtc
+        self._resync = resync
+        self._due = 0.0  # Monotonic time of the next read, a float compare so the scan allocates no long integer
+        self._epoch = 0  # RTC seconds at the last read
+        self._ns = 0  # Monotonic nanoseconds at the last read
+        self._day = None
+        self._ymd = ''
+        self.reads = 0
+        self.sync()
+
+    def __call__(self):
+        self.scan()
+
+    def scan(self):
+        if time.monotonic() >= self._due:
+            self.sync()
+
+    def sync(self):
+        """Read the RTC over I2C"""
+        t = self._rtc.datetime
+        self._ns = time.monotonic_ns()
+        self._due = time.monotonic() + self._resync
+        self._epoch = int(time.mktime(t))
+        self.reads += 1
+
+    def set(self, t):
+        """Write a struct_time to the RTC and restart interpolation from it"""
+        self._rtc.datetime = t
+        self.sync()
+
+    @property
+    def seconds(self):
+        return self._epoch + (time.monotonic_ns() - self._ns) // 1000000000
+
+    @property
+    def datetime(self):
+        return time.localtime(self.seconds)
+
+    def ymd(self, secs=None):
+        secs = self.seconds if secs is None else secs
+        day = secs // 86400
+        if day != self._day:  # Date text only rebuilt on a new day
+            t = time.localtime(secs)
+            self._ymd = f'{t.tm_year}:{t.tm_mon}:{t.tm_mday}'
+            self._day = day
+        return self._ymd
+
+    def hms(self, secs=None):
+        secs = (self.seconds if secs is None else secs) % 86400
+        return f'{secs // 3600}:{secs // 60 % 60}:{secs % 60}'
+
+    def stamp(self, info):
+        """Write the 'ymd' and 'hms' fields of a log entry from a single clock reading"""
+        secs = self.seconds
+        info['ymd'] = self.ymd(secs)
+        info['hms'] = self.hms(secs)
+
+
+class StateMachine:
+    """Table driven state machine.
+    Each state registers a handler that is called every scan while the state is active and returns the next state, or
+    None to stay. Entry hooks run at the start of the first scan in a state and exit hooks as it is left. Dispatch is a
+    single dictionary lookup however many states are registered, and the latest transitions are kept in history."""
+
+    def __init__(self, initial=0, trace=False, historySize=16):
+        self._table = {}
+        self._state = initial
+        self._entered = False
+        self._historySize = historySize
+        self.history = []  # (time, from, to) of the latest transitions, oldest first
+        self.transitions = 0
+        self.trace = trace  # Print each transition
+
+    def __call__(self):
+        self.scan()
+
+    def add(self, state, handler, onEntry=None, onExit=None, takesInput=False):
+        """Register a state. takesInput marks states that monitor operator input"""
+        self._table[state] = (handler, onEntry, onExit, takesInput)
+
+    def _row(self, state):
+        try:
+            return self._table[state]
+        except KeyError:
+            raise ValueError(f'No handler registered for state {state}')
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, new):
+        if new != self._state:
+            self._transition(new)
+
+    @property
+    def takesInput(self):
+        return self._row(self._state)[3]
+
+    def scan(self):
+        handler, onEntry, onExit, takesInput = self._row(self._state)
+        if not self._entered:
+            self._entered = True
+            if onEntry is not None:
+                onEntry()
+        new = handler()
+        if new is not None and new != self._state:
+            self._transition(new)
+
+    def _transition(self, new):
+        onExit = self._row(self._state)[2]
+        if onExit is not None:
+            onExit()
+        if len(self.history) >= self._historySize:
+            self.history.pop(0)
+        self.history.append((time.monotonic(), self._state, new))
+        if self.trace:
+            print(f'State {self._state} -> {new}')
+        self._state = new
+        self._entered = False
+        self.transitions += 1
+
+
+class BusTask:
+    """A device registered with the BusScheduler and its bus time statistics"""
+
+    def __init__(self, name, poll, period, priority, budget):
+        self.name = name
+        self.poll = poll  # Callable doing the device's bus transactions
+        self.period = period  # Seconds between polls, 0 polls every scan
+        self.priority = priority  # 0 is critical and never skipped, larger numbers are skipped first
+        self.budget = budget  # Expected seconds per poll, longer polls are counted as overruns
+        self.next = 0.0
+        self.polls = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.busTime = 0.0
+        self.worst = 0.0
+
+
+class BusScheduler:
+    """Share one I2C bus between polled devices.
+    Each device registers a poll period, priority and time budget. Every scan the due devices are polled in priority
+    order, so devices with different periods interleave across scans instead of all polling every pass. Once the scan
+    has spent its budget on the bus, due devices that are not critical (priority 0) are skipped to the next scan."""
+
+    def __init__(self, budget=0.04):
+        self.budget = budget  # Bus seconds per scan before non critical devices are skipped
+        self._tasks = []
+
+    def __call__(self):
+        self.scan()
+
+    def register(self, name, poll, period=0.0, priority=1, budget=0.005):
+        task = BusTask(name, poll, period, priority, budget)
+        self._tasks.append(task)
+        self._tasks.sort(key=lambda t: t.priority)
+        return task
+
+    def scan(self):
+        start = time.monotonic()
+        for i in range(len(self._tasks)):
+            task = self._tasks[i]
+            now = time.monotonic()
+            if now < task.next:
+                continue
+            if task.priority > 0 and now - start >= self.budget:  # Over budget, defer to the next scan
+                task.skipped += 1
+                continue
+            task.poll()
+            dt = time.monotonic() - now
+            task.next = now + task.period
+            task.polls += 1
+            task.busTime += dt
+            if dt > task.worst:
+                task.worst = dt
+            if dt > task.budget:
+                task.overruns += 1
+
+    def report(self):
+        """Return a line of bus time statistics per device"""
+        lines = []
+        for task in self._tasks:
+            avg = task.busTime / task.polls if task.polls else 0.0
+            lines.append(f'{task.name}: polls {task.polls}, avg {avg * 1000:.2f}ms, worst {task.worst * 1000:.2f}ms, '
+                         f'total {task.busTime:.2f}s, skipped {task.skipped}, overruns {task.overruns}')
+        return lines
+
+
+class ScanScheduler(BusScheduler):
+    """Run the scan cycle at a fixed period.
+    Subsystems register and are polled on their own periods as with the BusScheduler. wait() is called at the end of
+    each cycle and sleeps away whatever is left of the period, so the CPU idles between scans instead of spinning.
+    Busy and idle time give the CPU utilization over each window. onIdle, when set, is called with the slack before
+    sleeping for housekeeping such as garbage collection."""
+
+    def __init__(self, period=0.02, window=5.0):
+        super().__init__(budget=period)
+        self.period = period
+        self.window = window  # Seconds of scans per utilization figure
+        self.utilization = 0.0  # Busy fraction of the last complete window
+        self.cycles = 0
+        self.overruns = 0
+        self._start = time.monotonic()  # End of the last wait, the start of the current cycle
+        self._next = self._start
+        self._windowStart = self._start
+        self._busy = 0.0
+        self._idle = 0.0
+        self.onIdle = None
+
+    def wait(self):
+        """Sleep out the rest of the scan period"""
+        now = time.monotonic()
+        self._next += self.period
+        slack = self._next - now
+        if slack > 0 and self.onIdle is not None:
+            self.onIdle(slack)
+            now = time.monotonic()  # Housekeeping counts as busy time
+            slack = self._next - now
+        self._busy += now - self._start
+        if slack > 0:
+            time.sleep(slack)  # CircuitPython idles the core while sleeping
+        else:
+            self.overruns += 1
+            if slack < -self.period:  # Fell well behind, restart the grid rather than run back to back scans
+                self._next = now
+        self._start = time.monotonic()
+        self._idle += self._start - now
+        self.cycles += 1
+        if self._start - self._windowStart >= self.window:
+            total = self._busy + self._idle
+            self.utilization = self._busy / total if total else 0.0
+            self._busy = 0.0
+            self._idle = 0.0
+            self._windowStart = self._start
+
+    def report(self):
+        lines = [f'Scan: period {self.period * 1000:.1f}ms, cpu {self.utilization * 100:.1f}%, '
+                 f'cycles {self.cycles}, overruns {self.overruns}']
+        return lines + super().report()
+
+
+class BootSequencer:
+    """Bring devices up as background steps of the scan once the interface is already running.
+    Steps are probed in the order added, one step per call, so a slow device never holds up a scan for long. A probe
+    returns True once its device is ready, False when it is not detected or None to be probed again on the next call.
+    ValueError and OSError, raised by the drivers for a device missing from its bus, count as not detected. onChange,
+    when set, is called with the step name and status on every change. Time to first interaction is measured from
+    start to the first scan the sequence takes input in."""
+    PENDING = 0
+    READY = 1
+    FAILED = 2
+    STATUS = ('Pending', 'Ready', 'Not detected')
+
+    def __init__(self, start=None):
+        self.start = time.monotonic() if start is None else start  # Boot time, before the imports when passed in
+        self.interactive = None  # Seconds from start to the first scan taking input
+        self.firstInput = None  # Seconds from start to the first input event taken
+        self.finished = None  # Seconds from start until every step had finished
+        self.onChange = None
+        self._steps = []  # [name, probe, status, seconds from start the status was reached, seconds probing]
+
+    def __call__(self):
+        self.scan()
+
+    def add(self, name, probe):
+        self._steps.append([name, probe, self.PENDING, None, 0.0])
+
+    def _step(self, name):
+        for step in self._steps:
+            if step[0] == name:
+                return step
+        raise KeyError(name)
+
+    def status(self, name):
+        return self._step(name)[2]
+
+    def ready(self, name):
+        return self._step(name)[2] == self.READY
+
+    def failed(self, name):
+        return self._step(name)[2] == self.FAILED
+
+    @property
+    def done(self):
+        for step in self._steps:
+            if step[2] == self.PENDING:
+                return False
+        return True
+
+    def retry(self, name):
+        """Probe a finished step again, it is pending until the probe decides"""
+        step = self._step(name)
+        if step[2] != self.PENDING:
+            self._set(step, self.PENDING)
+
+    def _set(self, step, status):
+        step[2] = status
+        step[3] = time.monotonic() - self.start
+        if self.finished is None and self.done:
+            self.finished = step[3]
+        if self.onChange is not None:
+            self.onChange(step[0], status)
+
+    def markInteractive(self):
+        if self.interactive is None:
+            self.interactive = time.monotonic() - self.start
+
+    def markInput(self):
+        if self.firstInput is None:
+            self.firstInput = time.monotonic() - self.start
+
+    def scan(self):
+        for step in self._steps:
+            if step[2] == self.PENDING:
+                start = time.monotonic()
+                try:
+                    result = step[1]()
+                except (ValueError, OSError) as e:
+                    print(f'{step[0]} not detected: {e}')
+                    result = False
+                step[4] += time.monotonic() - start
+                if result is not None:
+                    self._set(step, self.READY if result else self.FAILED)
+                return
+
+    def report(self):
+        """Return a line of boot timing and a line per step"""
+        def seconds(t):
+            return f'{t:.2f}s' if t is not None else '-'
+        lines = [f'Boot: interactive {seconds(self.interactive)}, first input {seconds(self.firstInput)}, '
+                 f'devices done {seconds(self.finished)}']
+        for name, probe, status, at, busy in self._steps:
+            lines.append(f'{name}: {self.STATUS[status]} at {seconds(at)}, probing {busy * 1000:.1f}ms')
+        return lines
+
+
+class HeapMonitor:
+    """Heap use per state and a garbage collection policy run in the idle slack of the scan.
+    begin() and end() bracket each scan to count the bytes it allocates from gc.mem_alloc() (scans spanning a
+    collection are skipped, counting is off where the runtime has no mem_alloc). collect() is given the slack at the end
+    of a scan and runs gc.collect() once collectAfter bytes were allocated since the last collection, free memory is
+    below lowWater or a collection was requested. State changes and collections are logged to a ring buffer of
+    preallocated arrays, so logging does not allocate either. With probe set, the largest free block after a state
+    change is found by trial allocations in a later idle slack, never inside the scan, and kept in largest."""
+    TRANSITION = 0
+    COLLECT = 1
+
+    def __init__(self, collectAfter=16384, lowWater=32768, minSlack=0.004, size=32, probe=False):
+        self.collectAfter = collectAfter  # Bytes allocated between collections
+        self.lowWater = lowWater  # Free bytes that always trigger a collection
+        self.minSlack = minSlack  # Seconds of slack needed to collect, a collection takes a few ms
+        self.probe = probe  # Measure the largest free block after each state change, allocates while probing
+        self.largest = None  # Last largest free block measured
+        self._memAlloc = getattr(gc, 'mem_alloc', None)
+        self._memFree = getattr(gc, 'mem_free', None)
+        # Ring buffer columns: time, kind, state, free bytes and largest free block (-1 when not probed)
+        self._times = array.array('f', [0.0] * size)
+        self._kinds = bytearray(size)
+        self._states = array.array('l', [0] * size)
+        self._free = array.array('l', [0] * size)
+        self._largest = array.array('l', [0] * size)
+        self._head = 0
+        self._count = 0
+        self.states = {}  # state: [scans, min free, worst bytes allocated in a scan, smallest largest block]
+        self.collections = 0
+        self.collectTime = 0.0
+        self._requested = False
+        self._state = None
+        self._start = 0
+        self._sinceCollect = 0
+        self._lastAlloc = self._memAlloc() if self._memAlloc is not None else 0
+        self._probeRecord = None  # Ring buffer index of the state change waiting for a probe
+        self._probeStats = None
+
+    def memFree(self):
+        return self._memFree() if self._memFree is not None else 0
+
+    def largestFree(self):
+        """Largest block that can be allocated, found by trial allocations"""
+        lo, hi = 0, self.memFree()
+        while hi - lo > 64:
+            mid = (lo + hi) // 2
+            try:
+                block = bytearray(mid)
+                del block
+                lo = mid
+            except MemoryError:
+                hi = mid
+        return lo
+
+    def requestCollect(self):
+        """Collect in the next scan with enough slack"""
+        self._requested = True
+
+    def _log(self, kind, state):
+        i = self._head
+        self._times[i] = time.monotonic()
+        self._kinds[i] = kind
+        self._states[i] = state if state is not None else -1
+        self._free[i] = self.memFree()
+        self._largest[i] = -1  # Filled in by a later probe
+        self._head = (i + 1) % len(self._times)
+        self._count = min(self._count + 1, len(self._times))
+
+    def begin(self, state):
+        self._state = state
+        if self._memAlloc is not None:
+            self._start = self._memAlloc()
+
+    def end(self, state):
+        """Close the scan, state is the state after it"""
+        free = self.memFree()
+        stats = self.states.get(self._state)
+        if stats is None:
+            stats = self.states[self._state] = [0, free, 0, None]
+        stats[0] += 1
+        if free < stats[1]:
+            stats[1] = free
+        if self._memAlloc is not None:
+            alloc = self._memAlloc()
+            allocated = alloc - self._start
+            if allocated >= 0:  # A collection during the scan makes the count meaningless
+                if allocated > stats[2]:
+                    stats[2] = allocated
+                self._sinceCollect += alloc - self._lastAlloc if alloc >= self._lastAlloc else alloc
+            self._lastAlloc = alloc
+        if state != self._state:
+            if self.probe:  # Trial allocations can start a collection, so they wait for the idle slack
+                self._probeRecord = self._head
+                self._probeStats = stats
+            self._log(self.TRANSITION, state)
+
+    def _probe(self):
+        """Measure the largest free block for the pending state change and fill it into its record"""
+        largest = self.largest = self.largestFree()
+        stats = self._probeStats
+        if stats[3] is None or largest < stats[3]:
+            stats[3] = largest
+        self._largest[self._probeRecord] = largest
+        self._probeRecord = None
+        self._probeStats = None
+
+    def collect(self, slack):
+        """Garbage collection policy, call with the idle seconds left in the scan. A pending probe runs in the next
+        slack that has no collection"""
+        if slack < self.minSlack:
+            return
+        if not (self._requested or self._sinceCollect >= self.collectAfter or self.memFree() < self.lowWater):
+            if self._probeRecord is not None:
+                self._probe()
+            return
+        start = time.monotonic()
+        gc.collect()
+        self.collectTime += time.monotonic() - start
+        self.collections += 1
+        self._requested = False
+        self._sinceCollect = 0
+        if self._memAlloc is not None:
+            self._lastAlloc = self._memAlloc()
+        self._log(self.COLLECT, self._state)
+
+    def records(self):
+        """Ring buffer records as (time, kind, state, free bytes, largest free block or None), oldest first"""
+        records = []
+        for n in range(self._count):
+            i = (self._head - self._count + n) % len(self._times)
+            largest = self._largest[i]
+            records.append((self._times[i], self._kinds[i], self._states[i], self._free[i],
+                            largest if largest >= 0 else None))
+        return records
+
+    def dump(self):
+        """Print the per state heap statistics and the ring buffer over serial"""
+        print(f'\nHeap: free {self.memFree()}, collections {self.collections} ({self.collectTime * 1000:.1f}ms)')
+        for state in sorted(self.states):
+            scans, low, worst, largest = self.states[state]
+            print(f'State {state}: scans {scans}, min free {low}, max alloc/scan {worst}, '
+                  f'min largest block {largest if largest is not None else "-"}')
+        for t, kind, state, free, largest in self.records():
+            print(f'{t:.2f} {"Collect" if kind == self.COLLECT else "State"} {state}: free {free}'
+                  + (f', largest {largest}' if largest is not None else ''))
+
+
+class Histogram:
+    """Durations counted into fixed buckets, with the running total, worst case and overruns of a limit"""
+    EDGES = (1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000)  # Bucket upper edges in microseconds
+
+    def __init__(self):
+        self.counts = array.array('L', [0] * (len(self.EDGES) + 1))  # Last bucket holds everything above the edges
+        self.count = 0
+        self.total = 0  # Microseconds
+        self.worst = 0
+        self.overruns = 0
+
+    def add(self, us, limit=None):
+        i = 0
+        edges = self.EDGES
+        n = len(edges)
+        while i < n and us > edges[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += us
+        if us > self.worst:
+            self.worst = us
+        if limit is not None and us > limit:
+            self.overruns += 1
+
+    @property
+    def mean(self):
+        """Mean duration in milliseconds"""
+        return self.total / self.count / 1000 if self.count else 0.0
+
+    def text(self):
+        buckets = ' '.join(f'<{edge // 1000}ms:{self.counts[i]}' for i, edge in enumerate(self.EDGES) if self.counts[i])
+        if self.counts[-1]:
+            buckets += f' >{self.EDGES[-1] // 1000}ms:{self.counts[-1]}'
+        return f'n {self.count}, avg {self.mean:.2f}ms, worst {self.worst / 1000:.2f}ms, ' \
+               f'overruns {self.overruns} | {buckets}'
+
+
+class ScanProfiler:
+    """Scan cycle instrumentation.
+    begin() starts a cycle for the active state, mark() closes each phase in turn and end() closes the cycle. Phase
+    and cycle durations go into histograms, cycles also per state, with overruns counted against the target scan
+    period. Every call returns straight away while disabled."""
+
+    def __init__(self, phases=('Inputs', 'Sequence', 'Outputs'), period=0.05, enabled=False):
+        self.phases = phases
+        self.periodUs = int(period * 1000000)
+        self._enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.cycle = Histogram()
+        self.phase = [Histogram() for _ in self.phases]
+        self.states = {}
+        self._state = None
+        self._phase = 0
+        self._t0 = 0
+        self._t = 0
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, flag):
+        if flag and not self._enabled:
+            self.reset()  # Fresh statistics on every enable
+        self._enabled = flag
+
+    def begin(self, state=None):
+        if not self._enabled:
+            return
+        self._state = state
+        self._phase = 0
+        self._t0 = self._t = time.monotonic_ns()
+
+    def mark(self):
+        """Close the current phase"""
+        if not self._enabled:
+            return
+        t = time.monotonic_ns()
+        if self._phase < len(self.phase):
+            self.phase[self._phase].add((t - self._t) // 1000)
+        self._phase += 1
+        self._t = t
+
+    def end(self):
+        """Close the cycle at the last mark"""
+        if not self._enabled:
+            return
+        us = (self._t - self._t0) // 1000
+        self.cycle.add(us, self.periodUs)
+        hist = self.states.get(self._state)
+        if hist is None:
+            hist = self.states[self._state] = Histogram()
+        hist.add(us, self.periodUs)
+
+    @property
+    def worstState(self):
+        """State with the slowest cycle"""
+        worst = None
+        for state, hist in self.states.items():
+            if worst is None or hist.worst > self.states[worst].worst:
+                worst = state
+        return worst
+
+    def report(self):
+        lines = [f'Scan: {self.cycle.text()}']
+        for name, hist in zip(self.phases, self.phase):
+            lines.append(f'{name}: {hist.text()}')
+        for state in sorted(self.states):
+            lines.append(f'State {state}: {self.states[state].text()}')
+        return lines
+
+    def dump(self):
+        """Print the report over serial"""
+        print(f'\nScan profile, target period {self.periodUs / 1000:.1f}ms')
+        for line in self.report():
+            print(line)
+
+
+class SampleBuffer:
+    """Fixed size ring buffer of timestamped integer samples, the oldest sample is overwritten when full"""
+
+    def __init__(self, size=32):
+        self._size = size
+        self._times = array.array('f', [0.0] * size)
+        self._values = array.array('l', [0] * size)
+        self.clear()
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._index = 0  # Next write position
+        self._count = 0
+        self.total = 0  # Samples appended since cleared
+
+    def append(self, t, value):
+        self.total += 1
+        self._times[self._index] = t
+        self._values[self._index] = value
+        self._index = (self._index + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def _pos(self, i):
+        # i = 0 is the oldest sample held, negative indexes count back from the newest
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('SampleBuffer index out of range')
+        return (self._index - self._count + i) % self._size
+
+    def time(self, i):
+        return self._times[self._pos(i)]
+
+    def value(self, i):
+        return self._values[self._pos(i)]
+
+
+class Filter:
+    """Digital filter over integer ADC codes backed by a fixed ring buffer, nothing is allocated per sample.
+    Modes: AVG moving average of the buffer, MEDIAN median of the buffer,
+    EMA exponential smoothing with alpha = 1 / 2^shift"""
+    AVG = 'avg'
+    MEDIAN = 'median'
+    EMA = 'ema'
+
+    def __init__(self, mode=AVG, size=8, shift=2):
+        if mode not in (self.AVG, self.MEDIAN, self.EMA):
+            raise ValueError(f'Filter mode "{mode}" is not supported.')
+        self._mode = mode
+        self._size = size
+        self._shift = shift
+        self._buffer = array.array('l', [0] * size)  # Ring buffer of samples in arrival order
+        self._sorted = array.array('l', [0] * size)  # Same samples kept in ascending order for the median
+        self.reset()
+
+    def __call__(self, x):
+        return self.update(x)
+
+    def reset(self):
+        self._index = 0
+        self._count = 0
+        self._sum = 0
+        self._ema = 0  # Fixed point, 4 fractional bits
+        self._value = 0
+
+    def update(self, x):
+        """Push a new sample and return the filtered value"""
+        old = self._buffer[self._index]
+        self._buffer[self._index] = x
+        self._index = (self._index + 1) % self._size
+        full = self._count == self._size
+        if full:
+            self._sum -= old
+        else:
+            self._count += 1
+        self._sum += x
+
+        if self._mode == self.AVG:
+            self._value = self._sum // self._count
+        elif self._mode == self.MEDIAN:
+            self._insertSorted(x, old if full else None)
+            self._value = self._sorted[self._count >> 1]
+        else:
+            if self._count == 1:
+                self._ema = x << 4  # Seed with the first sample
+            else:
+                self._ema += ((x << 4) - self._ema) >> self._shift
+            self._value = self._ema >> 4
+        return self._value
+
+    def _insertSorted(self, x, old):
+        srt = self._sorted
+        n = self._count if old is not None else self._count - 1  # Samples already held
+        if old is not None:  # Drop the sample leaving the window
+            i = 0
+            while srt[i] != old:
+                i += 1
+            while i < n - 1:
+                srt[i] = srt[i + 1]
+                i += 1
+            n -= 1
+        i = n  # Shift larger samples up and insert
+        while i > 0 and srt[i - 1] > x:
+            srt[i] = srt[i - 1]
+            i -= 1
+        srt[i] = x
+
+    @property
+    def value(self):
+        return self._value
+
+
+class SettleDetector:
+    """Detect a reading held steady for a set time, used for hands free capture.
+    Running mean and variance over a sliding window are updated in O(1) per sample. Fires a single scan
+    trigger once the window standard deviation has stayed within tolerance for settleTime, then rearms only after
+    the reading moves again: the standard deviation rising above moving, or the mean shifting more than rearm from
+    the capture. moving sits well above tolerance so noise at the edge of the tolerance can not log a pole twice."""
+
+    def __init__(self, size=16, tolerance=48, settleTime=1.0, rearm=160, moving=144):
+        self._size = size
+        self._tolerance = tolerance
+        self._moving = moving
+        self._rearm = rearm
+        self._settleTime = settleTime
+        self._buffer = array.array('l', [0] * size)
+        self._timer = Timer()
+        self._enabled = False
+        self.reset()
+
+    def __call__(self, x, sampleId):
+        self.scan(x, sampleId)
+
+    def reset(self):
+        self._index = 0
+        self._count = 0
+        self._ref = 0  # Samples are summed as offsets from a reference to keep the sums small integers
+        self._sum = 0
+        self._sumSq = 0
+        self._sampleId = None
+        self._armed = True
+        self._trigger = False
+        self._captured = 0
+        self._timer.EN = False
+        self._timer()
+
+    def _push(self, x):
+        d = x - self._ref
+        if self._count == self._size:
+            old = self._buffer[self._index] - self._ref
+            self._sum -= old
+            self._sumSq -= old * old
+        else:
+            self._count += 1
+        self._buffer[self._index] = x
+        self._sum += d
+        self._sumSq += d * d
+        self._index = (self._index + 1) % self._size
+        if self._index == 0:  # Once per window re-reference to the mean and rebuild the sums
+            self._ref = self.mean
+            self._sum = 0
+            self._sumSq = 0
+            for i in range(self._count):
+                d = self._buffer[i] - self._ref
+                self._sum += d
+                self._sumSq += d * d
+
+    def scan(self, x, sampleId):
+        """Cyclically scanned, x is only added to the window when sampleId marks it as a new sample"""
+        self._trigger = False
+        if not self._enabled:
+            return
+        if sampleId != self._sampleId:
+            self._sampleId = sampleId
+            self._push(x)
+        # Compare n^2 * variance against n^2 * tolerance^2 to stay in integer math
+        n = self._count
+        spread = self._sumSq * n - self._sum * self._sum
+        if self._armed:
+            settled = n == self._size and spread <= (self._tolerance * n) ** 2
+            if settled:
+                self._timer.PRE = self._settleTime  # A disabled timer resets PRE, set it again each time
+            self._timer.EN = settled
+            self._timer()
+            if self._timer.DN:
+                self._trigger = True
+                self._armed = False
+                self._captured = self.mean
+        elif spread > (self._moving * n) ** 2 or abs(self.mean - self._captured) > self._rearm:
+            self._armed = True
+            self._timer.EN = False
+            self._timer()
+
+    @property
+    def mean(self):
+        return self._ref + self._sum // self._count if self._count else 0
+
+    @property
+    def trigger(self):
+        """True for the single scan the reading is detected as settled"""
+        return self._trigger
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, flag):
+        if not isinstance(flag, bool):
+            raise TypeError("SettleDetector 'enabled' must be of type bool")
+        if flag != self._enabled:
+            self.reset()
+        self._enabled = flag
+
+
+class BurstCapture:
+    """Collect a burst of samples into a preallocated buffer after a start request and reduce it to the
+    median and spread (max - min). The median is found by in place selection, nothing is allocated per burst."""
+
+    def __init__(self, size=15, timeout=0.5):
+        self._size = size
+        self._buffer = array.array('l', [0] * size)
+        self._timeout = timeout  # Finish with the samples collected so far if the burst takes too long
+        self._timer = Timer()
+        self._active = False
+        self._done = False
+        self._count = 0
+        self._min = 0
+        self._max = 0
+        self._sampleId = None
+
+    def __call__(self, x, sampleId):
+        self.scan(x, sampleId)
+
+    def start(self):
+        self._timer.PRE = self._timeout  # Set again for every burst, the timer clears PRE when it is disabled
+        self._active = True
+        self._done = False
+        self._count = 0
+        self._sampleId = None
+
+    def scan(self, x, sampleId):
+        """Cyclically scanned, x is only collected when sampleId marks it as a new sample"""
+        if not self._active:
+            return
+        if sampleId != self._sampleId:
+            if self._sampleId is not None:  # Skip the sample already held when the burst started
+                if self._count == 0:
+                    self._min = self._max = x
+                self._buffer[self._count] = x
+                self._count += 1
+                self._min = min(self._min, x)
+                self._max = max(self._max, x)
+            self._sampleId = sampleId
+        self._timer.EN = True
+        self._timer()
+        if self._count == self._size or self._timer.DN:
+            self._active = False
+            self._done = True
+            self._timer.EN = False
+            self._timer()
+
+    def _select(self, k):
+        """Hoare quickselect, partially orders the buffer in place and returns the k-th smallest sample"""
+        buf = self._buffer
+        lo = 0
+        hi = self._count - 1
+        while lo < hi:
+            pivot = buf[(lo + hi) >> 1]
+            i = lo
+            j = hi
+            while i <= j:
+                while buf[i] < pivot:
+                    i += 1
+                while buf[j] > pivot:
+                    j -= 1
+                if i <= j:
+                    buf[i], buf[j] = buf[j], buf[i]
+                    i += 1
+                    j -= 1
+            if k <= j:
+                hi = j
+            elif k >= i:
+                lo = i
+            else:
+                break
+        return buf[k]
+
+    @property
+    def done(self):
+        return self._done
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def median(self):
+        return self._select(self._count >> 1) if self._count else None
+
+    @property
+    def min(self):
+        return self._min
+
+    @property
+    def max(self):
+        return self._max
+
+
 class Scaling:
     def __init__(self):
-        self._setup = {'Raw_Upr': 1000, 'Raw_Lwr': 0, 'Eng_Upr': 15, 'Eng_Lwr': 0}
+        self._setup = {'Raw_Upr': 1000, 'Raw_Lwr': 0, 'Eng_Upr': 15, 'Eng_Lwr': 0, 'Cal_Pts': [], 'Fit_Order': 0}
         self._m = None
         self._b = None
+        self._poly = None  # Least squares coefficients over the calibration table, lowest order first
+        self._residuals = None  # (rms, max) error of the polynomial fit
+        self._capturedFit = None  # PolyFit accumulated while the calibration points were captured
+        self._xs = []  # Calibration table raw breakpoints, ascending
+        self._ms = []  # Calibration table slope per segment
+        self._bs = []  # Calibration table offset per segment
+        self._tableCfg = None  # (codes, shift, text) when the lookup table is enabled
+        self._table = None  # array of engineering values indexed by raw code
+        self._tableText = None  # Preformatted display strings indexed by raw code
+        self._textCache = None  # Display string per value while the text table is built, shared between codes
+        self._built = 0  # Codes of the tables built so far
+        self._ready = False  # Tables complete for the current calibration
         self._solve()
 
-    def __call__(self, *args, **kwargs):
-        return self.scale(*args, **kwargs)
+    def __call__(self, x):
+        return self.scale(x)
 
     def scale(self, x):
         # use y= mx + b
@@ -188,9 +1129,33 @@ class Scaling:
         # m is scale/slope
         # b is eng unit offset
         # y = mx + b
+        if self._poly is not None:
+            # Horner's method over the normalized raw value
+            x = (x - PolyFit.SPAN) / PolyFit.SPAN
+            y = 0.0
+            for c in reversed(self._poly):
+                y = y * x + c
+            return y
+        if self._xs:
+            # Calibration table loaded, bisect the breakpoints for the segment holding x.
+            # End segments are extended to extrapolate outside the captured range.
+            lo = 0
+            hi = len(self._ms) - 1
+            while lo < hi:
+                mid = (lo + hi + 1) >> 1
+                if x < self._xs[mid]:
+                    hi = mid - 1
+                else:
+                    lo = mid
+            return float(self._ms[lo] * x + self._bs[lo])
+        if self._m is None:
+            raise ValueError('Scaling setup has no valid calibration.')
         return float(self._m * x + self._b)
 
     def _solve(self):
+        self._resetTable()  # Tables of the old calibration are released, buildTable() rebuilds them a slice per scan
+        self._solveTable()
+        self._solvePoly()
         try:
             # m = (y2 - y1)/(x2 - x1)
             self._m = (self._setup['Eng_Upr'] - self._setup['Eng_Lwr']) / (
@@ -199,9 +1164,123 @@ class Scaling:
             self._b = self._setup['Eng_Lwr'] - (self._m * self._setup['Raw_Lwr'])
             print(f'Scaling Block Calculations M: {self._m}, B: {self._b}')
 
-        except ZeroDivisionError or TypeError:
+        except (ZeroDivisionError, TypeError):
+            self._m = None  # No fit to fall back on, scale() raises until a valid setup is assigned
+            self._b = None
             return False
 
+    def _solveTable(self):
+        """Precompute slope and offset for each segment of the N-point calibration table"""
+        points = {}
+        for raw, eng in self._setup['Cal_Pts']:
+            points[raw] = eng  # Duplicate raw readings keep the last captured value
+        xs = sorted(points)
+        self._xs, self._ms, self._bs = [], [], []
+        if len(xs) < 2:  # Not enough points for a segment, fall back to the two point fit
+            return
+        for i in range(len(xs) - 1):
+            m = (points[xs[i + 1]] - points[xs[i]]) / (xs[i + 1] - xs[i])
+            self._ms.append(m)
+            self._bs.append(points[xs[i]] - (m * xs[i]))
+        self._xs = xs
+        print(f'Scaling Block Calibration Table: {len(xs)} points')
+
+    def _solvePoly(self):
+        """Least squares fit the calibration table when a fit order is configured"""
+        self._poly = None
+        self._residuals = None
+        fit = self._capturedFit
+        self._capturedFit = None
+        order = self._setup['Fit_Order']
+        if order < 1:
+            return
+        if fit is None:  # Table loaded from the config file rather than captured, accumulate it once
+            fit = PolyFit(order)
+            for raw, eng in self._setup['Cal_Pts']:
+                fit.addPoint(raw, eng)
+        fit.order = order
+        if fit.solve() is None:  # Too few or degenerate points, fall back to the table or two point fit
+            return
+        self._poly = fit.coefficients
+        self._residuals = fit.residuals()
+        print(f'Scaling Block Polynomial Fit: {self._poly}, RMS/Max Residual: {self._residuals}')
+
+    def useFit(self, fit):
+        """Take the PolyFit accumulated as the calibration points were captured, the next setup solves it instead of
+        accumulating the whole table again. It must hold the same points as the setup's 'Cal_Pts'."""
+        self._capturedFit = fit
+
+    @property
+    def residuals(self):
+        """(rms, max) error of the polynomial fit against the calibration table, None if no fit is active"""
+        return self._residuals
+
+    def enableTable(self, codes=2048, shift=4, text=False):
+        """Precompute the scaled value of every raw code so the scan is a single index.
+        codes is the number of distinct ADC codes, raw values are indexed as raw >> shift.
+        ADS1015 defaults: 12 bit conversion reported left justified in 16 bits by AnalogIn.value.
+        text also precomputes the '0.00' display string of every code.
+        The tables are filled by buildTable(), lookups use direct math until they are complete."""
+        self._tableCfg = (codes, shift, text)
+        self._resetTable()
+
+    def _resetTable(self):
+        self._ready = False
+        self._built = 0
+        self._table = None
+        self._tableText = None
+        self._textCache = None
+
+    def buildTable(self, steps=64):
+        """Fill the next steps codes of the lookup tables, scanned as a task so no single scan builds a whole table.
+        Returns True once the tables are complete or not enabled."""
+        if self._ready or self._tableCfg is None:
+            return True
+        if self._m is None and self._poly is None and not self._xs:  # No valid calibration to tabulate
+            return False
+        codes, shift, text = self._tableCfg
+        if self._table is None:
+            self._table = array.array('f', [0.0] * codes)
+            if text:
+                self._tableText = [''] * codes
+                self._textCache = {}
+        table = self._table
+        end = min(codes, self._built + steps)
+        for i in range(self._built, end):
+            table[i] = round(self.scale(i << shift), 2)
+            if text:
+                val = table[i]  # Stored single precision value, as looked up
+                string = self._textCache.get(val)
+                if string is None:
+                    string = f'{val:.2f}'
+                    self._textCache[val] = string
+                self._tableText[i] = string
+        self._built = end
+        if end == codes:
+            self._textCache = None
+            self._ready = True
+        return self._ready
+
+    def _index(self, x):
+        i = x >> self._tableCfg[1]
+        if i < 0:
+            return 0
+        if i >= len(self._table):
+            return len(self._table) - 1
+        return i
+
+    def lookup(self, x):
+        """Scaled value rounded to 2 decimals, served from the lookup table once it is built"""
+        if not self._ready:
+            return round(self.scale(x), 2)
+        return self._table[self._index(x)]
+
+    def lookupText(self, x):
+        """Display string of the scaled value, served from the lookup table once it is built"""
+        if not self._ready or self._tableText is None:
+            return f'{self.lookup(x):.2f}'
+        return self._tableText[self._index(x)]
+
     @property
     def setup(self):
         return self._setup
@@ -218,3 +1297,105 @@ class Scaling:
             else:
                 raise KeyError(f'Key - "{key}" does not exist the scaling configuration.')
         self._solve()  # Update scaling formula
+
+
+class PolyFit:
+    """Least squares polynomial fit of engineering units against raw units.
+    Points are accumulated into the normal equation sums as they are captured, solving is a small
+    gaussian elimination so no NumPy is needed on the device. The sums are kept up to MAX_ORDER so the
+    order can be changed without accumulating the points again, and a replaced point is subtracted back out.
+    Raw values are normalized about the AnalogIn mid scale to keep the power sums well conditioned
+    for the single precision floats in CircuitPython."""
+    SPAN = 16384  # Half of the 16 bit AnalogIn.value range
+    MAX_ORDER = 3
+
+    def __init__(self, order=2):
+        self.order = order
+        self._sx = [0.0] * (2 * self.MAX_ORDER + 1)  # Sum of x^k
+        self._sxy = [0.0] * (self.MAX_ORDER + 1)  # Sum of y * x^k
+        self._points = []  # Kept for the residuals
+        self._residuals = None  # (rms, max) of the last solve
+        self.coefficients = []  # Lowest order first
+
+    def __len__(self):
+        return len(self._points)
+
+    @property
+    def order(self):
+        return self._order
+
+    @order.setter
+    def order(self, order):
+        if not 0 <= order <= self.MAX_ORDER:
+            raise ValueError(f'Fit order must be 0 to {self.MAX_ORDER}.')
+        self._order = order
+
+    def _accumulate(self, raw, eng, sign):
+        x = (raw - self.SPAN) / self.SPAN
+        p = sign
+        for k in range(len(self._sx)):
+            self._sx[k] += p
+            if k < len(self._sxy):
+                self._sxy[k] += p * eng
+            p *= x
+
+    def addPoint(self, raw, eng):
+        self._accumulate(raw, eng, 1.0)
+        self._points.append((raw, eng))
+
+    def removePoint(self, raw, eng):
+        """Take a point added earlier back out of the sums"""
+        self._points.remove((raw, eng))
+        self._accumulate(raw, eng, -1.0)
+
+    def clear(self):
+        self.__init__(self._order)
+
+    def solve(self):
+        """Solve the normal equations, returns the coefficients or None when the points can not support the order"""
+        n = self._order + 1
+        self.coefficients = []
+        self._residuals = None
+        if len(self._points) < n:
+            return None
+        # Augmented matrix of the normal equations [A | b], A[i][j] = sum(x^(i+j)), b[i] = sum(y * x^i)
+        a = [[self._sx[i + j] for j in range(n)] + [self._sxy[i]] for i in range(n)]
+        for col in range(n):
+            pivot = col  # Partial pivoting
+            for r in range(col + 1, n):
+                if abs(a[r][col]) > abs(a[pivot][col]):
+                    pivot = r
+            if abs(a[pivot][col]) < 1e-9:  # Singular, not enough distinct raw values
+                return None
+            a[col], a[pivot] = a[pivot], a[col]
+            for r in range(col + 1, n):
+                f = a[r][col] / a[col][col]
+                for c in range(col, n + 1):
+                    a[r][c] -= f * a[col][c]
+        coefficients = [0.0] * n
+        for r in range(n - 1, -1, -1):
+            acc = a[r][n]
+            for k in range(r + 1, n):
+                acc -= a[r][k] * coefficients[k]
+            coefficients[r] = acc / a[r][r]
+        self.coefficients = coefficients
+        # Residuals from the errors of each point, expanding them from the power sums cancels badly in single precision
+        total = 0.0
+        worst = 0.0
+        for raw, eng in self._points:
+            err = abs(self.evaluate(raw) - eng)
+            total += err * err
+            worst = max(worst, err)
+        self._residuals = ((total / len(self._points)) ** 0.5, worst)
+        return coefficients
+
+    def evaluate(self, raw):
+        x = (raw - self.SPAN) / self.SPAN
+        y = 0.0
+        for c in reversed(self.coefficients):  # Horner's method
+            y = y * x + c
+        return y
+
+    def residuals(self):
+        """Return the (rms, max) absolute error of the last solve over the captured points, None before a solve"""
+        return self._residuals